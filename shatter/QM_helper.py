@@ -2,22 +2,56 @@
 
 """Defines Quine McCluskey helper methods"""
 
+import itertools
+
 from shatter import qm
+from shatter import espresso
 from shatter.rules import Rules
 from shatter.util import helpers as h
-from shatter.code_generator import translate_to_python_expression
+from shatter.util import stats as st
+from shatter.util.truth_table import DONT_CARE, get_cubes
+from shatter.code_generator import translate_to_python_expression, get_literals
 
 __author__ = 'juan pablo isaza'
 
+# Boolean functions with more inputs are minimized with the espresso heuristic instead of the exact QM.
+MAX_EXACT_INPUTS = 16
+
+# Same, for functions with don't cares: the exact QM has to merge every don't care combination.
+MAX_EXACT_DC_INPUTS = 10
+
+# Term representation used by the exact QM, see qm.ENGINES.
+ENGINE = qm.BITMASK_ENGINE
+
+
+def get_settings():
+    """
+    :return: list with the minimizer settings, read when called. Part of the solution cache keys, as other settings can
+    give other expressions for the same rules.
+    """
+    return [MAX_EXACT_INPUTS, MAX_EXACT_DC_INPUTS, ENGINE, qm.MAX_COVER_NODES, qm.MAX_SEARCH_ROWS]
+
+
+def from_bool_to_term_bit(element):
+    """
+    Same as helpers.from_bool_to_bit() but keeps the unspecified inputs of cubes.
+    :param element: True, False or DONT_CARE.
+    :return: '1', '0' or '-'
+    """
+    if element is DONT_CARE:
+        return '-'
+    return h.from_bool_to_bit(element)
+
 
 def from_table_to_ones(table):
     """
-    Gets the ones as a list of strings from a truth table like set, containing tuples.
+    Gets the ones as a list of strings from a truth table like set, containing tuples. The rows of a TruthTable are
+    not expanded: their DONT_CARE inputs are '-'.
     :param table: truth table
     :return: list containing bits.
     """
     ones = []
-    for row in table:
+    for row in get_cubes(table):
 
         # case 1: when the output is explicit.
         if Rules.is_explicit(row):
@@ -25,27 +59,95 @@ def from_table_to_ones(table):
                 ones.append(''.join(list(map(h.from_bool_to_bit, list(row[0])))))
 
         else:  # case 2: The output is an implicit True, inputs are in the row.
-            ones.append(''.join(list(map(h.from_bool_to_bit, list(row)))))
+            ones.append(''.join(list(map(from_bool_to_term_bit, list(row)))))
 
     return ones
 
 
-def execute_qm_algorithm(ones):
+def expand_terms(terms):
+    """
+    Expands the terms with '-' to all the combinations they cover, in the same order as the rows of a TruthTable.
+    :param terms: list of strings made of '0', '1' and '-'.
+    :return: list of strings made of '0' and '1'.
+    """
+    result = []
+    for term in terms:
+        positions = [i for i, c in enumerate(term) if c == '-']
+        if not positions:
+            result.append(term)
+            continue
+
+        bits = list(term)
+        for values in itertools.product('10', repeat=len(positions)):
+            for position, value in zip(reversed(positions), values):
+                bits[position] = value
+            result.append(''.join(bits))
+
+    return result
+
+
+def get_dont_cares(ones, off):
+    """
+    All the input combinations that are neither ones nor in the off-set.
+    :param ones: input combinations for which output is true
+    :param off: input combinations for which output is false
+    :return: list containing bits.
+    """
+    n_bits = len(next(iter(ones)))
+    specified = set(ones) | set(off)
+    combinations = (format(i, '0{}b'.format(n_bits)) for i in range(2 ** n_bits))
+    return [c for c in combinations if c not in specified]
+
+
+def execute_qm_algorithm(ones, engine=None, workers=1, max_exact_inputs=None, off=None, stats=None):
     """
     Quine McCluskey algorithm.
-    outputs the minimal boolean expression. Assumes that all none ones have a False output.
+    outputs the minimal boolean expression. The ones (and off) can be cubes, with '-' on the unspecified inputs: they
+    are only expanded for the exact algorithm, espresso works on them directly. Assumes that all none ones have a False output, unless the off-set is
+    given: then the combinations missing from both are don't cares.
+    Functions with more than max_exact_inputs inputs (MAX_EXACT_DC_INPUTS with an off-set) get a close to minimal
+    expression from espresso instead.
     :param ones: input combinations for which output is true
+    :param engine: term representation used by the algorithm, see qm.ENGINES. Defaults to ENGINE.
+    :param workers: number of processes for the merge rounds, only for qm.BITMASK_ENGINE.
+    :param max_exact_inputs: defaults to MAX_EXACT_INPUTS.
+    :param off: input combinations for which output is false, or None.
+    :param stats: optional Stats object, gets the implicants, comparisons and terms counts.
     :return: set containing lists of boolean expressions encoded as strings.
     Where: '1' = boolean ,'0' = not(boolean), '-' = don't care, '^^' = boolean0 ^ boolean1
     Example: set('1-','-0') = bit0 or not bit1
     """
     # TODO: cannot solve ones = ['00'] or a not(or(b0,b1))
     # TODO: change to True, add XOR logic
-    qm_obj = qm.QuineMcCluskey(use_xor=False)
-    return qm_obj.simplify_los(ones)
+    if max_exact_inputs is None:
+        max_exact_inputs = MAX_EXACT_INPUTS if off is None else MAX_EXACT_DC_INPUTS
+    if engine is None:
+        engine = ENGINE
+
+    if len(ones) > 0 and len(next(iter(ones))) > max_exact_inputs:
+        result = espresso.espresso_los(ones, off=off)
+    else:
+        ones = expand_terms(ones)
+        if off is not None:
+            off = expand_terms(off)
+
+        qm_obj = qm.QuineMcCluskey(use_xor=False, engine=engine, max_nodes=qm.MAX_COVER_NODES, workers=workers)
+        if off is None or len(ones) == 0:
+            result = qm_obj.simplify_los(ones)
+        else:
+            result = qm_obj.simplify_los(ones, dc=get_dont_cares(ones, off))
+
+        if stats is not None:
+            stats.add(st.IMPLICANTS, qm_obj.profile_primes)
+            stats.add(st.COMPARISONS, qm_obj.profile_cmp)
+
+    if stats is not None and result is not None:
+        stats.add(st.TERMS, len(result))
 
+    return result
 
-def get_boolean_expression(table, inputs, the_output):
+
+def get_boolean_expression(table, inputs, the_output, off_table=None, stats=None, workers=1):
     """
     Get boolean expression. Can return empty string.
     solution provided by Quine-McCluskey algorithm.
@@ -53,11 +155,16 @@ def get_boolean_expression(table, inputs, the_output):
     :param inputs: Function explicit inputs or implicit added rules.
     :param table: truth table.
     :param the_output: function output
+    :param off_table: optional truth table with the rows that must not return the_output, any row missing from
+    both tables is a don't care. If None all rows missing from table must not return the_output.
+    :param stats: optional Stats object, see execute_qm_algorithm().
+    :param workers: number of processes, see execute_qm_algorithm().
     :return: string with boolean expression.
     """
     ones = from_table_to_ones(table)
     if len(ones) > 0:
-        qm_output = execute_qm_algorithm(ones)
+        off = None if off_table is None else from_table_to_ones(off_table)
+        qm_output = execute_qm_algorithm(ones, workers=workers, off=off, stats=stats)
         expression = translate_to_python_expression(inputs, qm_output)
     else:
         expression = ''
@@ -66,3 +173,22 @@ def get_boolean_expression(table, inputs, the_output):
         return '{}'.format(the_output)  # This happens when regardless of the input the output is the same
     else:
         return expression
+
+
+def get_products(table, inputs, off_table=None, stats=None, workers=1):
+    """
+    Same as get_boolean_expression(), but the expression is a list of products (ORed), each being a tuple of
+    literals (ANDed).
+    :param table: truth table.
+    :param inputs: Function explicit inputs or implicit added rules.
+    :param off_table: see get_boolean_expression().
+    :param stats: optional Stats object, see execute_qm_algorithm().
+    :param workers: number of processes, see execute_qm_algorithm().
+    :return: list with tuples. eg: [('a', 'not b'), ('c',)] is 'a and not b or c'.
+    """
+    ones = from_table_to_ones(table)
+    if len(ones) == 0:
+        return []
+
+    off = None if off_table is None else from_table_to_ones(off_table)
+    return [get_literals(inputs, term) for term in execute_qm_algorithm(ones, workers=workers, off=off, stats=stats)]
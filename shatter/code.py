@@ -15,18 +15,33 @@ NOT_IMPLEMENTED = 3
 current_id = 1
 
 
+def get_operand_key(operand):
+    """
+    :param operand: Code or any other object on an equation.
+    :return: hashable, equal for equal operands. Other objects are compared by their printed value.
+    """
+    if isinstance(operand, Code):
+        return operand.get_key()
+    return str(operand)
+
+
 class Code:
     """
     Holds all code that the user enters for evaluation. Is a holder for meta-code.
     """
 
-    def __init__(self, rho=None, lho=None, super_method=None, code_str=None):
+    # no __dict__, big rules hold an instance per variable and comparison.
+    __slots__ = ('id', 'rho', 'lho', 'operator', 'code_str', 'key', 'hash_value', 'name')
+
+    def __init__(self, rho=None, lho=None, super_method=None, code_str=None, name=None):
         """
         Code can either be specified as string with code_str or with the 3 parameters rho, super_method and lho.
         :param rho: right hand operand.
         :param lho: left hand operand.
         :param super_method: When rho == lho then super_method = __eq__.
         :param code_str: alternatively code can be entered as a string.
+        :param name: name of a single variable, eg: Code(name='a'). If None it is searched on the stack the first time
+        the variable is printed.
         """
 
         # gets the global id and adds 1 to generate a unique identifier for all objects running anywhere.
@@ -43,39 +58,54 @@ class Code:
             self.operator = None
 
         self.code_str = code_str
+        self.key = None  # see get_key()
+        self.hash_value = None  # see __hash__()
+        self.name = name
 
-    # explicit hash definition when overriding __eq__, otherwise hash = None.
-    __hash__ = object.__hash__
-
-    def equation_case_equals(self, other):
-        """code prints its operands and tries a match on them. They need to match their address location.
-        :param other: any object to compare can be Code or another stuff
-        :return: boolean indicating strict equality"""
-
-        if isinstance(other, Code):
-            non_commutative = str(self.rho) == str(other.rho) and str(self.lho) == str(other.lho)
-            return non_commutative and self.operator == other.operator
-        else:
-            return False
+    def __hash__(self):
+        """
+        Hash of the content, consistent with _equals(). Computed once, a Code is not changed after its creation. Codes
+        without a content key (see get_key()) are hashed by identity, as they are only equal to themselves.
+        :return: int
+        """
+        if self.hash_value is None:
+            try:
+                self.hash_value = hash(self.get_key())
+            except NotImplementedError:
+                self.hash_value = object.__hash__(self)
+        return self.hash_value
+
+    def get_key(self):
+        """
+        Canonical content of the code, computed once. Uses cases strategy to differentiate between different init
+        cases, same as in __str__ method:
+        - equations are equal when their operator and operands are, operands are not commutative.
+        - code strings are equal when their code_str is.
+        - single variables are only equal to themselves.
+        :return: hashable tuple.
+        """
+        if self.key is None:
+            case = self.get_use_case()
+            if case == EQUATION:
+                self.key = (EQUATION, self.operator.symbol, get_operand_key(self.rho), get_operand_key(self.lho))
+            elif case == CODE_STRING:
+                self.key = (CODE_STRING, self.code_str)
+            elif case == SINGLE_VARIABLE:
+                self.key = (SINGLE_VARIABLE, self.get_id(self))
+            elif case == NOT_IMPLEMENTED:
+                raise NotImplementedError
+            else:
+                raise SystemError("unknown value for case")
+
+        return self.key
 
     def _equals(self, other):
         """
-        Uses cases strategy to differentiate between different init cases. Same as in __str__ method.
+        Content equality, see get_key().
         :param other: any other stuff
         :return: boolean
         """
-        case = self.get_use_case()
-        if case == EQUATION:
-            return self.equation_case_equals(other)
-        elif case == CODE_STRING:
-            # for this case, equality is defined only if other is of type Code and their code_str is equal.
-            return isinstance(other, Code) and self.code_str == other.code_str
-        elif case == SINGLE_VARIABLE:
-            return self.get_id(self) == self.get_id(other)
-        elif case == NOT_IMPLEMENTED:
-            raise NotImplementedError
-        else:
-            raise SystemError("unknown value for case")
+        return isinstance(other, Code) and self.get_key() == other.get_key()
 
     def __eq__(self, other):
         """
@@ -180,7 +210,9 @@ class Code:
         elif case == CODE_STRING:
             return self.code_str
         elif case == SINGLE_VARIABLE:
-            return h.retrieve_name(self)
+            if self.name is None:  # the stack is only walked once.
+                self.name = h.retrieve_name(self)
+            return self.name
         elif case == NOT_IMPLEMENTED:
             raise NotImplementedError
         else:
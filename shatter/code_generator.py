@@ -173,3 +173,109 @@ def translate_to_python_expression(all_inputs, qm_output):
         final_expression += factor
 
     return final_expression
+
+
+def get_literals(all_inputs, str_bits):
+    """
+    Converts a single term of the algorithm output to its literals, in the order of the inputs.
+    :param all_inputs: tuple with the names of the boolean inputs.
+    :param str_bits: string with bits. see "execute_qm_algorithm" for details. eg: '1-0'
+    :return: tuple with strings. eg: ('a', 'not c')
+    """
+    literals = []
+    for character, the_input in zip(str_bits, all_inputs):
+        if character == '1':
+            literals.append(str(the_input))
+
+        if character == '0':
+            literals.append('not ' + str(the_input))
+
+    return tuple(literals)
+
+
+def get_shared_products(products):
+    """
+    Finds the conjunctions of literals that are part of several products, so that they are evaluated only once.
+    Only prefixes are shared, this way the evaluation order (and short circuiting) inside each product is kept.
+    :param products: list with all the products of all outputs, each product is a tuple of literals.
+    :return: list with the shared prefixes, shortest first.
+    """
+    counts = dict()
+    for product in products:
+        for i in range(2, len(product) + 1):
+            counts[product[:i]] = counts.get(product[:i], 0) + 1
+
+    # each product uses its longest prefix that is shared.
+    shared = []
+    for product in products:
+        for i in range(len(product), 1, -1):
+            if counts[product[:i]] > 1:
+                if product[:i] not in shared:
+                    shared.append(product[:i])
+                break
+
+    return sorted(shared, key=len)
+
+
+def print_product(product, shared_names):
+    """
+    Prints a conjunction of literals, using the longest shared prefix available.
+    :param product: tuple with literals.
+    :param shared_names: dict where keys are shared prefixes and values are the names of their local variables.
+    :return: string
+    """
+    for i in range(len(product), 1, -1):
+        if product[:i] in shared_names:
+            return ' and '.join((shared_names[product[:i]],) + product[i:])
+
+    return ' and '.join(product)
+
+
+def print_products(products, shared_names):
+    """
+    Same as translate_to_python_expression() but with products of literals, which can use shared variables.
+    :param products: list with tuples of literals.
+    :param shared_names: dict where keys are shared prefixes and values are the names of their local variables.
+    :return: python boolean expression
+    """
+    return ' or '.join(print_product(product, shared_names) for product in products)
+
+
+def get_shared_code(shared, definition):
+    """
+    Assigns each shared product to a local variable. Longer products reuse the shorter ones.
+    :param shared: list of shared products, see get_shared_products().
+    :param definition: function definition.
+    :return: tuple with the code as a list and a dict where keys are the products and values their variable names.
+    """
+    indent = helpers.get_indent_from_definition(definition)
+
+    code = []
+    shared_names = dict()
+    for i, product in enumerate(shared):
+        name = SHARED_VARIABLE.format(i)
+        code.append(indent + '    ' + name + ' = ' + print_product(product, shared_names))
+        shared_names[product] = name
+
+    return code, shared_names
+
+
+def get_pending_shared_code(products, shared, shared_code, assigned):
+    """
+    Gets the assignments used by the products that were not done yet, so that each shared product is evaluated just
+    before its first use and not on the calls that return before.
+    :param products: list with tuples of literals.
+    :param shared: list of shared products, see get_shared_products().
+    :param shared_code: the assignment of each shared product, see get_shared_code().
+    :param assigned: set with the shared products already assigned, it is updated.
+    :return: list with the code. Shorter products go first, as the longer ones use them.
+    """
+    used = {product[:i] for product in products for i in range(2, len(product) + 1)}
+
+    code = []
+    for product, line in zip(shared, shared_code):
+        if product in used and product not in assigned:
+            assigned.add(product)
+            code.append(line)
+
+    return code
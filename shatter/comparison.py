@@ -8,6 +8,8 @@ __author__ = 'juan pablo isaza'
 class Comparison:
     """In charged of comparing variables and numbers."""
 
+    __slots__ = ('a', 'b', 'operator')
+
     def __init__(self, a, b, operator):
         self.a = a  # number 1
         self.b = b  # number 2
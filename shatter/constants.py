@@ -9,6 +9,8 @@ __author__ = 'juan pablo isaza'
 PACKAGE_NAME = 'shatter'
 INTERNAL_CODE = 'internal_code'
 INTERNAL_PARAMETERS = 'internal_parameters'
+IN_MEMORY = 'in_memory'
+RULES = 'rules'
 
 COMMENT_PATTERN = re.compile(r"\s*(#.*)?$")
 INDENT = re.compile(r"^\s*")
@@ -34,6 +36,12 @@ PARTICULAR_DEFINITION = re.compile(ABSTRACT_DEFINITION.pattern.format(indent=IND
                                                                       function=PARTICULAR_FUNCTION.pattern,
                                                                       comment=COMMENT_PATTERN.pattern))
 
+# stamp on the definition of written functions, with the first characters of solver.get_cache_key() and of the hash
+# of the written body, see solver.get_body_fingerprint().
+FINGERPRINT_LENGTH = 16
+FINGERPRINT_COMMENT = '  # shatter: {fingerprint}-{body}'
+FINGERPRINT_PATTERN = re.compile(r"\s*# shatter: (?P<fingerprint>[0-9a-f]+)(-(?P<body>[0-9a-f]+))?\s*$")
+
 SOLVE_DECORATOR_PATTERN\
     = re.compile(r"{indent}@\s*({name}\.)?\s*solve\s*\(\){comment}".format(name=NAME.pattern,
                                                                            indent=INDENT.pattern,
@@ -49,3 +57,6 @@ KEYWORDS = {DEFAULT: 'default',
             OUTPUT_ARGS: 'output_args'}
 
 POSITIONAL_ARGS_RULE = "positional_args_rule_"
+
+# local variables holding sub expressions shared by several outputs.
+SHARED_VARIABLE = "_shared_{}"
@@ -8,6 +8,8 @@ __author__ = 'juan pablo isaza'
 
 class CustomOperator:
 
+    __slots__ = ('method', 'symbol')
+
     OPERATORS = {'__eq__': '==',  # COMPARISON
                 '__ne__': '!=',
                 '__lt__': '<',
@@ -0,0 +1,376 @@
+#!/usr/bin/env python
+
+"""Espresso like heuristic minimizer, for boolean functions too big for the exact Quine McCluskey."""
+
+from shatter.qm import str2cube, cube2str, cube_minterms, covered_minterms, popcount, cube_intersect, cube_sharp, \
+    cube_covered
+from shatter.util.inverse_tree_set import InverseTreeSet
+
+__author__ = 'juan pablo isaza'
+
+# Maximum number of REDUCE, EXPAND, IRREDUNDANT loops after the first cover.
+MAX_ITERATIONS = 10
+
+
+def cube_size(cube, n_bits):
+    """
+    Number of minterms of a cube.
+    :param cube: (value, mask) tuple of integers.
+    :param n_bits: number of inputs.
+    :return: int
+    """
+    return 1 << (n_bits - popcount(cube[1]))
+
+
+def supercube(minterms, n_bits):
+    """
+    Smallest cube containing all the minterms.
+    :param minterms: non empty list of integers.
+    :param n_bits: number of inputs.
+    :return: (value, mask) tuple of integers.
+    """
+    ones_and = (1 << n_bits) - 1
+    ones_or = 0
+    for m in minterms:
+        ones_and &= m
+        ones_or |= m
+    mask = ~(ones_and ^ ones_or) & ((1 << n_bits) - 1)
+    return ones_and & mask, mask
+
+
+def supercube_of_cubes(cubes):
+    """
+    Smallest cube containing all the cubes.
+    :param cubes: non empty list of (value, mask) tuples.
+    :return: (value, mask) tuple of integers.
+    """
+    value = cubes[0][0]
+    mask = cubes[0][1]
+    for v, m in cubes[1:]:
+        mask &= m & ~(v ^ value)
+    return value & mask, mask
+
+
+def get_cost(cover):
+    """
+    Cost of a cover: first the number of cubes then the number of literals.
+    :param cover: list of cubes
+    :return: tuple, to be compared.
+    """
+    return len(cover), sum(popcount(mask) for _, mask in cover)
+
+
+class Function:
+    """
+    The boolean function being minimized: its on-set and how to tell if a cube is an implicant.
+    When there is no off-set, the function is False for every minterm that is not in the on-set,
+    otherwise every minterm that is in neither of them is a don't care.
+    """
+
+    def __init__(self, ones, n_bits, off=None):
+        """
+        :param ones: list of integers, minterms where the function is True.
+        :param n_bits: number of inputs.
+        :param off: list of integers where the function is False, or None.
+        """
+        self.n_bits = n_bits
+        self.ones = sorted(set(ones))
+        self.on_set = set(self.ones)
+        self.off = None if off is None else sorted(set(off))
+
+    def is_implicant(self, cube):
+        """
+        Whether the cube is free of the off-set.
+        :param cube: (value, mask) tuple of integers.
+        :return: boolean
+        """
+        value, mask = cube
+        if self.off is None:
+            return all(m in self.on_set for m in cube_minterms(cube, self.n_bits))
+        return not any((m ^ value) & mask == 0 for m in self.off)
+
+    def get_ones(self, cube):
+        """
+        Minterms of the on-set covered by the cube, without enumerating big cubes.
+        :param cube: (value, mask) tuple of integers.
+        :return: list of integers.
+        """
+        return covered_minterms(cube, self.n_bits, self.on_set)
+
+
+class CubeFunction:
+    """
+    Same as Function, but the on-set and off-set are cubes, which are never expanded to minterms: rules that leave
+    inputs unspecified are a single cube no matter how many minterms they have.
+    """
+
+    def __init__(self, ones, n_bits, off=None):
+        """
+        :param ones: list of (value, mask) cubes where the function is True.
+        :param n_bits: number of inputs.
+        :param off: list of cubes where the function is False, or None.
+        """
+        self.n_bits = n_bits
+        self.ones = sorted(set(ones))
+        self.off = None if off is None else sorted(set(off))
+
+    def is_implicant(self, cube):
+        """
+        Whether the cube is free of the off-set.
+        :param cube: (value, mask) tuple of integers.
+        :return: boolean
+        """
+        if self.off is None:
+            return cube_covered(cube, self.ones)
+        return all(cube_intersect(cube, c) is None for c in self.off)
+
+    def get_ones(self, cube):
+        """
+        Parts of the on-set covered by the cube.
+        :param cube: (value, mask) tuple of integers.
+        :return: list of cubes, they can overlap.
+        """
+        parts = (cube_intersect(cube, c) for c in self.ones)
+        return [part for part in parts if part is not None]
+
+    def is_covered(self, cube, cover):
+        """
+        Whether the ones of the cube are all covered by the cover.
+        :param cube: (value, mask) tuple of integers.
+        :param cover: list of cubes.
+        :return: boolean
+        """
+        return all(cube_covered(part, cover) for part in self.get_ones(cube))
+
+
+def expand(function, cover):
+    """
+    EXPAND step: raises the literals of each cube as long as it stays an implicant. Cubes whose ones are already
+    covered by the expanded cubes are dropped.
+    :param function: Function obj.
+    :param cover: list of cubes.
+    :return: list of cubes.
+    """
+    n_bits = function.n_bits
+    bits = [1 << k for k in range(n_bits - 1, -1, -1)]
+
+    # raise first the literals that most cubes do not have, to grow towards the other cubes.
+    free_count = dict((bit, sum(1 for _, mask in cover if not mask & bit)) for bit in bits)
+    bits.sort(key=lambda b: -free_count[b])
+
+    covered = set()
+    expanded = []
+    for cube in sorted(cover, key=lambda c: -cube_size(c, n_bits)):
+        ones = function.get_ones(cube)
+        if all(m in covered for m in ones):
+            continue
+
+        value, mask = cube
+        for bit in bits:
+            # only the half added by raising the bit has to be checked.
+            if mask & bit and function.is_implicant((value ^ bit, mask)):
+                value &= ~bit
+                mask &= ~bit
+
+        cube = value, mask
+        expanded.append(cube)
+        covered.update(function.get_ones(cube))
+
+    return expanded
+
+
+def get_counts(function, cover):
+    """
+    :param function: Function obj.
+    :param cover: list of cubes.
+    :return: dict with the number of cubes covering each one of the function.
+    """
+    counts = dict()
+    for cube in cover:
+        for m in function.get_ones(cube):
+            counts[m] = counts.get(m, 0) + 1
+    return counts
+
+
+def irredundant(function, cover):
+    """
+    IRREDUNDANT step: removes, smallest first, the cubes whose ones are all covered by other cubes.
+    :param function: Function obj.
+    :param cover: list of cubes.
+    :return: list of cubes.
+    """
+    counts = get_counts(function, cover)
+    result = []
+    for cube in sorted(cover, key=lambda c: cube_size(c, function.n_bits)):
+        ones = function.get_ones(cube)
+        if all(counts[m] > 1 for m in ones):
+            for m in ones:
+                counts[m] -= 1
+        else:
+            result.append(cube)
+    return result
+
+
+def reduce(function, cover):
+    """
+    REDUCE step: shrinks, largest first, each cube to the smallest cube containing the ones covered only by it, so
+    that the next EXPAND can take another direction.
+    :param function: Function obj.
+    :param cover: list of cubes.
+    :return: list of cubes.
+    """
+    counts = get_counts(function, cover)
+    result = []
+    for cube in sorted(cover, key=lambda c: -cube_size(c, function.n_bits)):
+        ones = function.get_ones(cube)
+        unique = [m for m in ones if counts[m] == 1]
+        for m in ones:
+            counts[m] -= 1
+
+        if unique:
+            cube = supercube(unique, function.n_bits)
+            result.append(cube)
+            for m in function.get_ones(cube):
+                counts[m] += 1
+    return result
+
+
+def expand_cubes(function, cover):
+    """
+    Same as expand() for a CubeFunction.
+    :param function: CubeFunction obj.
+    :param cover: list of cubes.
+    :return: list of cubes.
+    """
+    n_bits = function.n_bits
+    bits = [1 << k for k in range(n_bits - 1, -1, -1)]
+
+    free_count = dict((bit, sum(1 for _, mask in cover if not mask & bit)) for bit in bits)
+    bits.sort(key=lambda b: -free_count[b])
+
+    expanded = []
+    for cube in sorted(cover, key=lambda c: -cube_size(c, n_bits)):
+        if function.is_covered(cube, expanded):
+            continue
+
+        value, mask = cube
+        for bit in bits:
+            if mask & bit and function.is_implicant((value ^ bit, mask)):
+                value &= ~bit
+                mask &= ~bit
+
+        expanded.append((value, mask))
+
+    return expanded
+
+
+def irredundant_cubes(function, cover):
+    """
+    Same as irredundant() for a CubeFunction.
+    :param function: CubeFunction obj.
+    :param cover: list of cubes.
+    :return: list of cubes.
+    """
+    pending = sorted(cover, key=lambda c: cube_size(c, function.n_bits))
+    result = []
+    for i, cube in enumerate(pending):
+        if not function.is_covered(cube, result + pending[i + 1:]):
+            result.append(cube)
+    return result
+
+
+def reduce_cubes(function, cover):
+    """
+    Same as reduce() for a CubeFunction: the ones covered only by the cube are found with the sharp operation.
+    :param function: CubeFunction obj.
+    :param cover: list of cubes.
+    :return: list of cubes.
+    """
+    pending = sorted(cover, key=lambda c: -cube_size(c, function.n_bits))
+    result = []
+    for i, cube in enumerate(pending):
+        unique = function.get_ones(cube)
+        for other in result + pending[i + 1:]:
+            unique = [rest for part in unique for rest in cube_sharp(part, other)]
+
+        if unique:
+            result.append(supercube_of_cubes(unique))
+    return result
+
+
+def espresso_cubes(ones, n_bits, off=None, max_iterations=MAX_ITERATIONS):
+    """
+    Same as espresso(), for an on-set (and off-set) made of cubes.
+    :param ones: list of (value, mask) cubes where the function is True.
+    :param n_bits: number of inputs.
+    :param off: list of cubes where the function is False. If None everything that is not covered by ones.
+    :param max_iterations: maximum number of REDUCE loops.
+    :return: list of (value, mask) cubes.
+    """
+    function = CubeFunction(ones, n_bits, off)
+    cover = irredundant_cubes(function, expand_cubes(function, function.ones))
+    cost = get_cost(cover)
+
+    for _ in range(max_iterations):
+        new_cover = irredundant_cubes(function, expand_cubes(function, reduce_cubes(function, cover)))
+        new_cost = get_cost(new_cover)
+        if new_cost >= cost:
+            break
+        cover, cost = new_cover, new_cost
+
+    return cover
+
+
+def espresso(ones, n_bits, off=None, max_iterations=MAX_ITERATIONS):
+    """
+    Heuristic two level minimization with EXPAND, IRREDUNDANT and REDUCE loops, as the Espresso algorithm.
+    The result covers all the ones, is free of the off-set and is usually close to the minimum, but it is not
+    guaranteed to be.
+    :param ones: list of integers, minterms where the function is True.
+    :param n_bits: number of inputs.
+    :param off: list of integers where the function is False. If None every minterm that is not a one.
+    :param max_iterations: maximum number of REDUCE loops.
+    :return: list of (value, mask) cubes.
+    """
+    function = Function(ones, n_bits, off)
+    cover = [(m, (1 << n_bits) - 1) for m in function.ones]
+    cover = irredundant(function, expand(function, cover))
+    cost = get_cost(cover)
+
+    for _ in range(max_iterations):
+        new_cover = irredundant(function, expand(function, reduce(function, cover)))
+        new_cost = get_cost(new_cover)
+        if new_cost >= cost:
+            break
+        cover, cost = new_cover, new_cost
+
+    return cover
+
+
+def espresso_los(terms, off=None, max_iterations=MAX_ITERATIONS):
+    """
+    Same as espresso() for string-encoded inputs, gives the same output format as QuineMcCluskey.simplify_los.
+    :param terms: list of strings, e.g. ['0001', '0010']. Can have '-', e.g. ['00-1'], then espresso_cubes() is used.
+    :param off: list of strings where the function is False. If None every input that is not in terms.
+    :param max_iterations: maximum number of REDUCE loops.
+    :return: InverseTreeSet with strings, made of '0', '1' and '-'. None for empty or inconsistent terms.
+    """
+    if len(terms) == 0:
+        return None
+
+    n_bits = max(len(t) for t in terms)
+    if n_bits != min(len(t) for t in terms):
+        return None
+
+    if any('-' in t for t in terms) or (off is not None and any('-' in t for t in off)):
+        ones = [str2cube(t) for t in terms]
+        if off is not None:
+            off = [str2cube(t) for t in off]
+        cover = espresso_cubes(ones, n_bits, off, max_iterations)
+    else:
+        ones = [str2cube(t)[0] for t in terms]
+        if off is not None:
+            off = [str2cube(t)[0] for t in off]
+        cover = espresso(ones, n_bits, off, max_iterations)
+
+    return InverseTreeSet([cube2str(cube, n_bits) for cube in cover])
@@ -11,6 +11,9 @@ class Output:
     """
     Contains any output properties.
     """
+
+    __slots__ = ('function', 'arguments')
+
     @staticmethod
     def has_all_function_arguments(function, arguments):
         """
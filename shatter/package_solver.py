@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+
+"""Solves all the functions of whole packages, on a pool of processes."""
+
+import importlib
+import os
+import pkgutil
+import sys
+import types
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from shatter import solver
+from shatter.constants import *
+from shatter.rules import Rules
+from shatter.util import helpers as h
+from shatter.util import stats as st
+
+__author__ = 'juan pablo isaza'
+
+
+def get_module_name(path):
+    """
+    :param path: path of a python file.
+    :return: dotted name to import it, from the longest entry of sys.path containing it.
+    """
+    path = os.path.splitext(os.path.abspath(path))[0]
+    roots = sorted((os.path.abspath(entry or os.curdir) for entry in sys.path), key=len, reverse=True)
+    for root in roots:
+        if path.startswith(root + os.sep):
+            name = os.path.relpath(path, root).replace(os.sep, '.')
+            return name[:-len('.__init__')] if name.endswith('.__init__') else name
+
+    raise ValueError('{} is not inside any sys.path entry, it cannot be imported.'.format(path))
+
+
+def get_module_names(package_or_paths):
+    """
+    :param package_or_paths: a module, a dotted module name, a path (file or directory) or a list of them. Packages and
+    directories include all their modules.
+    :return: list with the dotted names of the modules.
+    """
+    if isinstance(package_or_paths, (str, types.ModuleType)):
+        package_or_paths = [package_or_paths]
+
+    names = []
+    for item in package_or_paths:
+        if isinstance(item, str) and os.path.isdir(item):
+            for directory, _, files in sorted(os.walk(item)):
+                names += [get_module_name(os.path.join(directory, file)) for file in sorted(files)
+                          if file.endswith('.py')]
+            continue
+
+        if isinstance(item, str) and os.path.isfile(item):
+            item = get_module_name(item)
+
+        module = importlib.import_module(item) if isinstance(item, str) else item
+        names.append(module.__name__)
+        if hasattr(module, '__path__'):  # a package.
+            names += [name for _, name, _ in pkgutil.walk_packages(module.__path__, module.__name__ + '.')]
+
+    return list(OrderedDict.fromkeys(names))
+
+
+def get_rules(f):
+    """
+    :param f: function decorated with solver.solve().
+    :return: the rules given to the decorator.
+    """
+    rules = getattr(f, RULES)
+    return rules() if callable(rules) and not isinstance(rules, Rules) else rules
+
+
+def get_solvable_functions(module_name):
+    """
+    :param module_name: dotted name.
+    :return: list with the names of the functions of the module decorated with rules, see solver.solve().
+    """
+    module = importlib.import_module(module_name)
+    return [name for name, value in vars(module).items()
+            if callable(value) and getattr(value, RULES, None) is not None
+            and getattr(value, '__module__', None) == module_name]
+
+
+@h.internal_mode()
+def solve_function(module_name, function_name, previous, dont_cares, multi_output, cache):
+    """
+    Runs on the worker processes: imports the function, solves it and tests it.
+    :param module_name: dotted name of the module.
+    :param function_name: name of the function on the module.
+    :param previous: list with the lines of the written function.
+    :param dont_cares: see solver.return_solution().
+    :param multi_output: see solver.return_solution().
+    :param cache: path of a SolutionCache or None, see solver.return_solution().
+    :return: tuple with the implementation to write (list of lines, with its fingerprint) and the Stats of the solve.
+    """
+    f = getattr(importlib.import_module(module_name), function_name)
+    definition = solver.remove_fingerprint(previous[0])
+    solution = solver.get_solution(f, get_rules(f), definition, None, dont_cares, multi_output, cache, previous)
+    return solver.add_fingerprint(solution.implementation, solution.fingerprint), solution.stats
+
+
+def solve_all(package_or_paths, workers=None, dont_cares=False, multi_output=False, cache=None):
+    """
+    Solves all the functions decorated with rules, eg: @solve(rules=Rules(a=True, b=True)), of packages, modules or
+    paths. Functions are solved and tested independently on a pool of processes, then each source file is written once
+    with all its functions. Functions decorated with in_memory=True are loaded on this process instead.
+    :param package_or_paths: a module, a dotted module name, a path (file or directory) or a list of them.
+    :param workers: number of processes, if None one per cpu. With 1 everything runs on this process.
+    :param dont_cares: optional, if True input combinations that no rule mentions can return anything.
+    :param multi_output: optional, if True sub expressions shared by the outputs are computed once.
+    :param cache: optional, path of a SolutionCache (an object cannot be sent to the processes).
+    :return: OrderedDict with the Stats of each solved function, by 'module.function' name. Their FILE_REWRITE_PHASE
+    time is the time of the single write of their file. Functions whose fingerprint did not change are not written,
+    see the UNCHANGED counter.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # reads each file once, finding the definition of all its functions.
+    jobs = []  # (module_name, function_name, f_path, f_line)
+    file_codes = OrderedDict()
+    for module_name in get_module_names(package_or_paths):
+        for function_name in get_solvable_functions(module_name):
+            f = getattr(sys.modules[module_name], function_name)
+            f_path = h.get_function_path(f)
+            if f_path not in file_codes:
+                file_codes[f_path] = h.read_file(f_path)
+
+            f_line = h.get_function_line_number(f, file_codes[f_path], f_path)
+            if f_line >= 0:
+                jobs.append((module_name, function_name, f_path, f_line))
+
+    arguments = [(module_name, function_name, h.get_function_code(f_line, file_codes[f_path], f_path), dont_cares,
+                  multi_output, cache) for module_name, function_name, f_path, f_line in jobs]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(solve_function, *zip(*arguments)))
+    else:
+        results = [solve_function(*job_arguments) for job_arguments in arguments]
+
+    report = OrderedDict()
+    implementations = OrderedDict((f_path, dict()) for f_path in file_codes)
+    for (module_name, function_name, f_path, f_line), (implementation, stats) in zip(jobs, results):
+        report['{}.{}'.format(module_name, function_name)] = stats
+        f = getattr(sys.modules[module_name], function_name)
+        if getattr(f, IN_MEMORY, False):
+            solver.load_implementation(f, implementation)
+        elif not stats.counters[st.UNCHANGED]:
+            implementations[f_path][f_line] = (implementation, stats)
+
+    for f_path, file_implementations in implementations.items():
+        if file_implementations:
+            write_stats = st.Stats()
+            with write_stats.phase(st.FILE_REWRITE_PHASE):
+                file_code = solver.splice_implementations(file_codes[f_path],
+                                                          {line: implementation for line, (implementation, _)
+                                                           in file_implementations.items()},
+                                                          f_path)
+                h.rewrite_file(f_path, file_code)
+
+            for _, stats in file_implementations.values():
+                stats.times[st.FILE_REWRITE_PHASE] += write_stats.times[st.FILE_REWRITE_PHASE]
+
+    return report
@@ -31,11 +31,25 @@ class ProcessedRules:
 
     In this case 1 and 2 are the outputs while (True, Code('1==3')), (False, False) are the rows of the truth table
     , ie the cases where 1 should be returned.
+
+    Tables built from a Rules object are TruthTable objects: iterating them gives the rows above, but inputs that a
+    rule leaves unspecified are kept as DONT_CARE on their cubes attribute, so the minimizer and the tester do not
+    have to expand them.
+
+    When 'dont_cares' is True, the input combinations that are in no table are don't cares: the solution can return
+    anything for them.
+
+    When 'multi_output' is True, the tables are solved together and the products shared among them are computed once.
+
+    'workers' is the number of processes used by the minimization of each table.
     """
 
-    def __init__(self, tables=FrozenDict(), default=False):
+    def __init__(self, tables=FrozenDict(), default=False, dont_cares=False, multi_output=False, workers=1):
         self.tables = tables
         self.default = default
+        self.dont_cares = dont_cares
+        self.multi_output = multi_output
+        self.workers = workers
 
 
 def get_default_output(rules):
@@ -54,11 +68,24 @@ def get_default_output(rules):
         return False
 
 
-def get_processed_rules(rules, function_args):
+def has_default_output(rules):
+    """
+    :param rules: a Rules obj or a table.
+    :return: True if a row has the default keyword.
+    """
+    return isinstance(rules, Rules) and any(KEYWORDS[DEFAULT] in row for row in rules)
+
+
+def get_processed_rules(rules, function_args, dont_cares=False, multi_output=False, workers=1):
     """
     :param rules:
     :param function_args: args
+    :param dont_cares: whether combinations missing from the rules are don't cares. They never are when there is a
+    default output, as those combinations have to return it.
+    :param multi_output: whether to share products among outputs.
+    :param workers: number of processes of the minimization.
     :return: processedRules instance
     """
     tables = get_truth_tables(rules, function_args)
-    return ProcessedRules(tables, get_default_output(rules))
+    dont_cares = dont_cares and not has_default_output(rules)
+    return ProcessedRules(tables, get_default_output(rules), dont_cares, multi_output, workers)
@@ -40,11 +40,528 @@ terms of complexity of the output.
 
 from __future__ import print_function
 
+import contextlib
+import heapq
 import math
+from concurrent.futures import ProcessPoolExecutor
 
 from shatter.util.ordered_set import OrderedSet
 from shatter.util.inverse_tree_set import InverseTreeSet
 
+# Term representations, see QuineMcCluskey.__init__.
+STRING_ENGINE = 'string'
+BITMASK_ENGINE = 'bitmask'
+NUMPY_ENGINE = 'numpy'
+ENGINES = (STRING_ENGINE, BITMASK_ENGINE, NUMPY_ENGINE)
+
+# Widest input that fits the uint64 arrays of the NUMPY_ENGINE. NumPy is only
+# imported by the functions of that engine.
+NUMPY_MAX_BITS = 64
+
+# Merge rounds with fewer terms are not worth sending to the process pool.
+MIN_PARALLEL_TERMS = 5000
+
+# Maximum number of branch and bound nodes visited by minimum_cover().
+MAX_COVER_NODES = 1000
+
+# Independent parts of the prime implicant chart with more rows are covered
+# greedily, they also skip the (quadratic) dominance checks.
+MAX_SEARCH_ROWS = 100
+
+
+def str2cube(term):
+    """Convert a string term to a cube.
+
+    Args:
+        term (str): a term made of '0', '1' and '-' characters.
+
+    Returns:
+        A (value, mask) tuple of integers. Bit i of the mask is set when the
+        bit i of the term is fixed; the value holds the fixed bits and is 0 at
+        the don't care positions. Character 0 of the term is the most
+        significant bit.
+
+    Example:
+        str2cube('1-0') == (0b100, 0b101)
+    """
+    value = 0
+    mask = 0
+    for c in term:
+        value <<= 1
+        mask <<= 1
+        if c == '1':
+            value |= 1
+            mask |= 1
+        elif c == '0':
+            mask |= 1
+    return value, mask
+
+
+def cube2str(cube, n_bits):
+    """Convert a cube back to its string term, the inverse of str2cube.
+
+    Args:
+        cube (tuple): (value, mask) tuple of integers.
+        n_bits (int): length of the output string.
+
+    Returns:
+        A string made of '0', '1' and '-' characters.
+    """
+    value, mask = cube
+    x = []
+    for k in range(n_bits - 1, -1, -1):
+        bit = 1 << k
+        if not mask & bit:
+            x.append('-')
+        elif value & bit:
+            x.append('1')
+        else:
+            x.append('0')
+    return "".join(x)
+
+
+def popcount(i):
+    """Number of bits set in the integer i."""
+    return bin(i).count('1')
+
+
+def cube_contains(cube1, cube2):
+    """Whether cube1 covers every minterm of cube2.
+
+    cube1 contains cube2 if every bit fixed on cube1 is also fixed on cube2
+    with the same value.
+    """
+    value1, mask1 = cube1
+    value2, mask2 = cube2
+    return mask1 & mask2 == mask1 and value2 & mask1 == value1
+
+
+def cube_minterms(cube, n_bits):
+    """Iterator over the minterms (integers) covered by a cube.
+
+    Args:
+        cube (tuple): (value, mask) tuple of integers.
+        n_bits (int): number of bits of the cube.
+    """
+    value, mask = cube
+    free = ~mask & ((1 << n_bits) - 1)
+    sub = free
+    while True:
+        yield value | sub
+        if sub == 0:
+            break
+        sub = (sub - 1) & free
+
+
+def covered_minterms(cube, n_bits, minterms):
+    """The minterms of a collection that are covered by a cube.
+
+    Args:
+        cube (tuple): (value, mask) tuple of integers.
+        n_bits (int): number of bits of the cube.
+        minterms (set or dict of int): the collection.
+
+    Returns:
+        A list of integers. Either the cube or the collection is enumerated,
+        whichever is smaller, so wide cubes are never expanded.
+    """
+    value, mask = cube
+    if 1 << (n_bits - popcount(mask)) <= len(minterms):
+        return [m for m in cube_minterms(cube, n_bits) if m in minterms]
+    return [m for m in minterms if m & mask == value]
+
+
+def cube_intersect(cube1, cube2):
+    """Intersection of two cubes.
+
+    Returns:
+        The (value, mask) cube with the minterms common to cube1 and cube2,
+        or None if the cubes are disjoint.
+    """
+    value1, mask1 = cube1
+    value2, mask2 = cube2
+    if (value1 ^ value2) & mask1 & mask2:
+        return None
+    return value1 | value2, mask1 | mask2
+
+
+def cube_sharp(cube1, cube2):
+    """The sharp operation cube1 # cube2: the minterms of cube1 not in cube2.
+
+    Returns:
+        A list of pairwise disjoint cubes whose union is cube1 minus cube2.
+        There is at most one cube per bit fixed on cube2 and free on cube1.
+    """
+    value1, mask1 = cube1
+    value2, mask2 = cube2
+    if (value1 ^ value2) & mask1 & mask2:
+        return [cube1]
+
+    result = []
+    free = mask2 & ~mask1
+    while free:
+        bit = free & -free
+        free &= ~bit
+        # leave cube2 on this bit, agree with it on the bits already done.
+        result.append((value1 | (~value2 & bit), mask1 | bit))
+        value1 |= value2 & bit
+        mask1 |= bit
+    return result
+
+
+def cube_covered(cube, cubes):
+    """Whether the union of cubes covers every minterm of cube.
+
+    The minterms are never enumerated: cube is sharped with each cube of the
+    cover, and it is covered when nothing remains.
+    """
+    cubes = [c for c in cubes if cube_intersect(cube, c) is not None]
+    if any(cube_contains(c, cube) for c in cubes):
+        return True
+
+    remaining = [cube]
+    for c in cubes:
+        remaining = [r for rest in remaining for r in cube_sharp(rest, c)]
+        if not remaining:
+            return True
+    return False
+
+
+def pack_cube(cube, n_bits):
+    """A (value, mask) cube as a single int: the mask on top of the value."""
+    return (cube[1] << n_bits) | cube[0]
+
+
+def unpack_cube(packed, n_bits):
+    """Inverse of pack_cube."""
+    return packed & ((1 << n_bits) - 1), packed >> n_bits
+
+
+def merge_groups(group, group_next, n_bits):
+    """One merge step of Quine McCluskey between two adjacent groups.
+
+    This is the unit of work of the process pool, so terms travel as packed
+    ints (see pack_cube).
+
+    Args:
+        group (list of int): terms with k ones.
+        group_next (list of int): terms with k + 1 ones.
+        n_bits (int): number of bits of the terms.
+
+    Returns:
+        A (merged, used, n_cmp) tuple with the merged terms in order, the
+        terms of both groups that were merged and the number of comparisons.
+    """
+    group_next = set(group_next)
+    bits = [1 << k for k in range(n_bits - 1, -1, -1)]
+    merged = []
+    used = []
+    n_cmp = 0
+    for t1 in group:
+        # the fixed '0's of t1: in its mask (top half) but not in its value.
+        zeros = (t1 >> n_bits) & ~t1
+        for bit in bits:
+            if zeros & bit:
+                n_cmp += 1
+                t2 = t1 | bit
+                if t2 in group_next:
+                    used.append(t1)
+                    used.append(t2)
+                    merged.append(t1 & ~(bit << n_bits))
+    return merged, used, n_cmp
+
+
+def popcount_array(x):
+    """Number of bits set in each element of a uint64 array."""
+    import numpy as np
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0f0f0f0f0f0f0f0f)
+    return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def cube_keys(values, masks, n_bits):
+    """Each (value, mask) pair of two uint64 arrays as a single sortable key.
+
+    Up to 32 bits both halves are packed in one uint64, wider cubes use a
+    16 byte key, which is much slower to sort. Either way np.unique and
+    np.isin work on whole cubes.
+    """
+    import numpy as np
+    if n_bits <= 32:
+        return (masks << np.uint64(32)) | values
+    pairs = np.ascontiguousarray(np.column_stack((values, masks)), dtype=np.uint64)
+    return pairs.view(np.dtype((np.void, pairs.dtype.itemsize * 2))).ravel()
+
+
+def unique_in_order(values, masks, n_bits):
+    """Drop the repeated cubes of two uint64 arrays, keeping first occurrences in order."""
+    import numpy as np
+    _, index = np.unique(cube_keys(values, masks, n_bits), return_index=True)
+    index.sort()
+    return values[index], masks[index]
+
+
+def bits_of(x):
+    """Iterator over the indexes of the bits set in the integer x, lowest first."""
+    # scanning the binary string is linear, shifting a wide integer bit by bit is quadratic.
+    digits = bin(x)[:1:-1]
+    i = digits.find('1')
+    while i >= 0:
+        yield i
+        i = digits.find('1', i + 1)
+
+
+def reduce_cover(covers, costs, uncovered, cols):
+    """Simplify a covering problem with essential columns and dominance.
+
+    Args:
+        covers (list of int): covers[c] is the bitset of rows covered by column c.
+        costs (list of int): costs[c] is the cost of choosing column c.
+        uncovered (int): bitset of rows that still have to be covered.
+        cols (list of int): columns that can still be chosen.
+
+    Returns:
+        A (uncovered, cols, forced, row_cols) tuple, where forced are the
+        columns that must be part of any minimum cover and row_cols maps each
+        uncovered row to the list of cols covering it. None if some row
+        cannot be covered with cols.
+
+    The reductions are the classic ones from the prime implicant chart:
+        - a row covered by a single column makes that column essential.
+        - a row whose columns are a subset of another row's columns, makes
+          the latter redundant: covering the first covers both.
+        - a column covering a subset of the rows of another column that is
+          not more expensive can be dropped.
+    """
+    forced = []
+    while True:
+        cols = [c for c in cols if covers[c] & uncovered]
+        row_cols = dict((r, []) for r in bits_of(uncovered))
+        for c in cols:
+            for r in bits_of(covers[c] & uncovered):
+                row_cols[r].append(c)
+        if not all(row_cols.values()):
+            return None
+
+        # essential columns.
+        essential = set(v[0] for v in row_cols.values() if len(v) == 1)
+        if essential:
+            for c in sorted(essential):
+                forced.append(c)
+                uncovered &= ~covers[c]
+            continue
+
+        if len(row_cols) > MAX_SEARCH_ROWS:
+            break
+        changed = False
+
+        # row dominance, with the columns of each row as a bitset.
+        row_bits = dict((r, sum(1 << c for c in v)) for r, v in row_cols.items())
+        kept = []
+        for r in sorted(row_bits, key=lambda k: len(row_cols[k])):
+            if any(row_bits[k] & ~row_bits[r] == 0 for k in kept):
+                uncovered &= ~(1 << r)
+                changed = True
+            else:
+                kept.append(r)
+
+        # column dominance.
+        kept = []
+        for c in sorted(cols, key=lambda k: (-popcount(covers[k] & uncovered), costs[k])):
+            cover = covers[c] & uncovered
+            if any(cover & ~covers[k] == 0 and costs[k] <= costs[c] for k in kept):
+                changed = True
+            else:
+                kept.append(c)
+        cols = kept
+
+        if not changed:
+            break
+
+    return uncovered, cols, forced, row_cols
+
+
+def cover_lower_bound(costs, row_cols):
+    """Lower bound of the cost needed to cover the rows of row_cols.
+
+    Rows that do not share any column need different columns, so the
+    cheapest column of each row in such a set adds to the bound.
+    """
+    bound = 0
+    used = set()
+    for r in sorted(row_cols, key=lambda k: len(row_cols[k])):
+        if used.isdisjoint(row_cols[r]):
+            used.update(row_cols[r])
+            bound += min(costs[c] for c in row_cols[r])
+    return bound
+
+
+def greedy_cover(covers, costs):
+    """Cover by repeatedly choosing the column with most new rows per cost.
+
+    Gains only decrease as rows get covered, so a column popped from the heap
+    with an up to date gain is the best one (lazy greedy).
+    """
+    uncovered = 0
+    for cover in covers:
+        uncovered |= cover
+
+    heap = [(-popcount(cover) / costs[c], c) for c, cover in enumerate(covers)]
+    heapq.heapify(heap)
+
+    chosen = []
+    while uncovered:
+        gain, c = heapq.heappop(heap)
+        new_gain = -popcount(covers[c] & uncovered) / costs[c]
+        if new_gain > gain:
+            heapq.heappush(heap, (new_gain, c))
+        else:
+            chosen.append(c)
+            uncovered &= ~covers[c]
+    return chosen
+
+
+def cover_components(covers, uncovered, cols):
+    """Split a covering problem into independent problems.
+
+    Args:
+        covers (list of int): covers[c] is the bitset of rows covered by column c.
+        uncovered (int): bitset of rows that have to be covered.
+        cols (list of int): columns that can be chosen.
+
+    Returns:
+        A list of (rows, cols) tuples, rows being sorted lists. Rows of
+        different components never share a column.
+    """
+    parent = dict((r, r) for r in bits_of(uncovered))
+
+    def find(r):
+        while parent[r] != r:
+            parent[r] = parent[parent[r]]
+            r = parent[r]
+        return r
+
+    col_rows = dict()
+    for c in cols:
+        col_rows[c] = list(bits_of(covers[c] & uncovered))
+        root = find(col_rows[c][0])
+        for r in col_rows[c][1:]:
+            parent[find(r)] = root
+
+    components = dict()
+    for r in parent:
+        components.setdefault(find(r), ([], []))[0].append(r)
+    for c in cols:
+        components[find(col_rows[c][0])][1].append(c)
+
+    return [(sorted(rows), component_cols) for rows, component_cols in components.values()]
+
+
+def branch_and_bound(covers, costs, max_nodes):
+    """Depth first search of a minimum cost cover.
+
+    Args:
+        covers (list of int): covers[c] is the bitset of rows covered by column c.
+        costs (list of int): costs[c] is the cost of choosing column c.
+        max_nodes (int): maximum number of search nodes.
+
+    Returns:
+        A (cover, optimal, nodes) tuple, with the number of visited nodes.
+    """
+    rows = 0
+    for cover in covers:
+        rows |= cover
+
+    best = greedy_cover(covers, costs)
+    best_cost = sum(costs[c] for c in best)
+
+    stack = [(rows, list(range(len(covers))), 0, [])]
+    nodes = 0
+    while stack:
+        if nodes == max_nodes:
+            return best, False, nodes
+        nodes += 1
+
+        uncovered, cols, cost, chosen = stack.pop()
+
+        reduced = reduce_cover(covers, costs, uncovered, cols)
+        if reduced is None:
+            continue
+        uncovered, cols, forced, row_cols = reduced
+        cost += sum(costs[c] for c in forced)
+        chosen = chosen + forced
+
+        if cost >= best_cost:
+            continue
+        if uncovered == 0:
+            best_cost = cost
+            best = chosen
+            continue
+        if cost + cover_lower_bound(costs, row_cols) >= best_cost:
+            continue
+
+        # branch on the row with fewest columns, trying cheap and wide columns first. Each branch excludes the
+        # columns of the previous ones, so no cover is visited twice.
+        row = min(row_cols, key=lambda r: len(row_cols[r]))
+        candidates = sorted(row_cols[row], key=lambda c: (costs[c], -popcount(covers[c] & uncovered)))
+        children = []
+        for i, c in enumerate(candidates):
+            excluded = set(candidates[:i + 1])
+            rest = [k for k in cols if k not in excluded]
+            children.append((uncovered & ~covers[c], rest, cost + costs[c], chosen + [c]))
+        stack.extend(reversed(children))
+
+    return best, True, nodes
+
+
+def minimum_cover(covers, costs, incumbent, max_nodes=MAX_COVER_NODES):
+    """Exact minimum cost cover (Petrick's problem) with branch and bound.
+
+    Args:
+        covers (list of int): covers[c] is the bitset of rows covered by column c.
+        costs (list of int): costs[c] is the cost of choosing column c.
+        incumbent (list of int): columns of a known cover, usually a greedy one.
+
+    Kwargs:
+        max_nodes (int): maximum number of search nodes.
+
+    Returns:
+        A (cover, optimal) tuple. cover is a sorted list of columns, optimal
+        is True if the search finished, which proves cover is a minimum.
+
+    The chart is first reduced (see reduce_cover) and split into independent
+    components, each one is searched on its own. Components bigger than
+    MAX_SEARCH_ROWS and the ones left once max_nodes is reached are covered
+    greedily. The incumbent is only replaced by strictly cheaper covers.
+    """
+    rows = 0
+    for cover in covers:
+        rows |= cover
+
+    uncovered, cols, chosen, _ = reduce_cover(covers, costs, rows, list(range(len(covers))))
+
+    optimal = True
+    nodes_left = max_nodes
+    for component_rows, component_cols in cover_components(covers, uncovered, cols):
+        # re-index the component so its bitsets are small.
+        position = dict((r, i) for i, r in enumerate(component_rows))
+        local_covers = [sum(1 << position[r] for r in bits_of(covers[c] & uncovered)) for c in component_cols]
+        local_costs = [costs[c] for c in component_cols]
+
+        if len(component_rows) > MAX_SEARCH_ROWS:
+            cover = greedy_cover(local_covers, local_costs)
+            optimal = False
+        else:
+            cover, component_optimal, nodes = branch_and_bound(local_covers, local_costs, nodes_left)
+            nodes_left -= nodes
+            optimal = optimal and component_optimal
+        chosen += [component_cols[c] for c in cover]
+
+    if sum(costs[c] for c in chosen) < sum(costs[c] for c in incumbent):
+        return sorted(chosen), optimal
+    return sorted(incumbent), optimal
+
 
 class QuineMcCluskey:
     """The Quine McCluskey class.
@@ -57,14 +574,49 @@ class QuineMcCluskey:
     """
     __version__ = "0.2"
 
-    def __init__(self, use_xor=False):
+    def __init__(self, use_xor=False, engine=STRING_ENGINE, exact=True, max_nodes=MAX_COVER_NODES, workers=1):
         """The class constructor.
 
         Kwargs:
             use_xor (bool): if True, try to use XOR and XNOR operations to give
             a more compact return.
+
+            engine (str): internal representation of the terms. With
+            STRING_ENGINE terms are strings of '0', '1', '-', '^' and '~'.
+            With BITMASK_ENGINE terms are (value, mask) integer cubes, which
+            is much faster for wide inputs but does not support XOR terms.
+            NUMPY_ENGINE keeps the cubes of each merge round in uint64
+            arrays, it pays off for tens of thousands of ones; inputs wider
+            than NUMPY_MAX_BITS use the BITMASK_ENGINE. All engines give
+            exactly the same result.
+
+            exact (bool): if True, solve the prime implicant chart exactly
+            (see minimum_cover) instead of keeping the greedy cover.
+
+            max_nodes (int): search budget of the exact step.
+
+            workers (int): number of processes for the merge rounds of the
+            BITMASK_ENGINE. Each pair of adjacent groups is merged on a
+            worker, rounds with less than MIN_PARALLEL_TERMS terms run in
+            this process.
+
+        Raises:
+            ValueError: for an unknown engine, an engine that cannot handle
+            use_xor or workers on another engine than BITMASK_ENGINE.
         """
+        if engine not in ENGINES:
+            raise ValueError("unknown engine '{}', use one of {}".format(engine, ENGINES))
+        if use_xor and engine != STRING_ENGINE:
+            raise ValueError("XOR terms are only supported by the '{}' engine".format(STRING_ENGINE))
+        if workers > 1 and engine != BITMASK_ENGINE:
+            raise ValueError("workers are only supported by the '{}' engine".format(BITMASK_ENGINE))
+
         self.use_xor = use_xor  # Whether or not to use XOR and XNOR operations.
+        self.engine = engine
+        self.exact = exact
+        self.max_nodes = max_nodes
+        self.workers = workers
+        self.optimal = False    # whether the last result is a proven minimum.
         self.n_bits = 0         # number of bits (i.e. self.n_bits == len(ones[i]) for every i).
 
     def __num2str(self, i):
@@ -117,12 +669,12 @@ class QuineMcCluskey:
         self.n_bits = int(math.ceil(math.log(max(terms) + 1, 2)))
 
         # Generate the sets of ones and dontcares
-        ones = set(self.__num2str(i) for i in ones)
-        dc = set(self.__num2str(i) for i in dc)
+        ones = OrderedSet(self.__num2str(i) for i in ones)
+        dc = OrderedSet(self.__num2str(i) for i in dc)
 
         return self.simplify_los(ones, dc)
 
-    def simplify_los(self, terms):
+    def simplify_los(self, terms, dc=None):
 
         """The simplification algorithm for a list of string-encoded inputs.
 
@@ -132,7 +684,8 @@ class QuineMcCluskey:
 
         Kwargs:
             dc: (list of str)set of strings that define the don't care
-            combinations.
+            combinations. They are merged with the terms to get bigger prime
+            implicants, but they do not need to be covered.
 
         Returns:
             Returns a set of strings which represent the reduced minterms.  The
@@ -165,6 +718,7 @@ class QuineMcCluskey:
         self.profile_cmp = 0    # number of comparisons (for profiling)
         self.profile_xor = 0    # number of comparisons (for profiling)
         self.profile_xnor = 0   # number of comparisons (for profiling)
+        self.profile_primes = 0  # number of prime implicants (for profiling)
 
         if len(terms) == 0:
             return None
@@ -174,16 +728,80 @@ class QuineMcCluskey:
         if self.n_bits != min(len(i) for i in terms):
             return None
 
-        # First step of Quine-McCluskey method.
-        prime_implicants = self.__get_prime_implicants(terms)
+        self.optimal = False
+        ones = sorted(set(int(t, 2) for t in terms))
 
-        # Remove essential terms.
-        essential_implicants = self.__get_essential_implicants(prime_implicants)
-        # Insert here the Quine McCluskey step 2: prime implicant chart.
-        # Insert here Petrick's Method.
+        # With don't cares the essential terms only have to cover the ones.
+        # OrderedSets keep the result independent of the hash seed.
+        dc = OrderedSet(dc or []) - OrderedSet(terms)
+        if any(len(t) != self.n_bits for t in dc):
+            return None
+        if dc:
+            terms = OrderedSet(terms) | dc
+            dc_ones = set(ones)
+        else:
+            dc_ones = None
+
+        if self.engine == NUMPY_ENGINE and self.n_bits <= NUMPY_MAX_BITS:
+            prime_cubes = self.__get_prime_arrays([str2cube(t) for t in terms])
+            essential_cubes = self.__get_essential_cubes(prime_cubes, dc_ones)
+            prime_implicants = [cube2str(c, self.n_bits) for c in prime_cubes]
+            essential_implicants = InverseTreeSet([cube2str(c, self.n_bits) for c in essential_cubes])
+        elif self.engine != STRING_ENGINE:
+            prime_cubes = self.__get_prime_cubes([str2cube(t) for t in terms])
+            essential_cubes = self.__get_essential_cubes(prime_cubes, dc_ones)
+            prime_implicants = [cube2str(c, self.n_bits) for c in prime_cubes]
+            essential_implicants = InverseTreeSet([cube2str(c, self.n_bits) for c in essential_cubes])
+        else:
+            # First step of Quine-McCluskey method.
+            prime_implicants = list(self.__get_prime_implicants(terms))
+
+            # Remove essential terms.
+            essential_implicants = self.__get_essential_implicants(prime_implicants, dc_ones)
+
+        self.profile_primes = len(prime_implicants)
+
+        # Quine McCluskey step 2: prime implicant chart.
+        if self.exact:
+            essential_implicants = self.__get_minimum_cover(ones, prime_implicants, essential_implicants)
 
         return essential_implicants
 
+    def __get_minimum_cover(self, ones, terms, greedy_cover):
+        """Solve the prime implicant chart with minimum_cover().
+
+        Args:
+            ones (list of int): minterms that have to be covered.
+            terms (list of str): prime implicants.
+            greedy_cover (set of str): a cover of ones made of terms.
+
+        Returns:
+            An InverseTreeSet with the minimum cover. Sets self.optimal.
+
+        A term costs more than all the literals of the chart together, so
+        covers with fewer terms always win and the literal count breaks ties.
+        """
+        row_index = dict((m, i) for i, m in enumerate(ones))
+        covers = []
+        for t in terms:
+            if '^' in t or '~' in t:
+                minterms = (int(p, 2) for p in self.permutations(t))
+            else:
+                minterms = covered_minterms(str2cube(t), self.n_bits, row_index)
+            cover = 0
+            for m in minterms:
+                if m in row_index:
+                    cover |= 1 << row_index[m]
+            covers.append(cover)
+
+        term_cost = self.n_bits * len(terms) + 1
+        costs = [term_cost + self.n_bits - t.count('-') for t in terms]
+        position = dict((t, i) for i, t in enumerate(terms))  # prime implicants are distinct.
+        incumbent = [position[t] for t in greedy_cover]
+
+        cover, self.optimal = minimum_cover(covers, costs, incumbent, self.max_nodes)
+        return InverseTreeSet([terms[c] for c in cover])
+
     def __reduce_simple_xor_terms(self, t1, t2):
         """Try to reduce two terms t1 and t2, by combining them as XOR terms.
 
@@ -373,13 +991,205 @@ class QuineMcCluskey:
             pi |= g
         return pi
 
-    def __get_essential_implicants(self, terms):
+    def __get_prime_cubes(self, terms):
+        """Same as __get_prime_implicants, for terms represented as cubes.
+
+        Args:
+            terms (list of tuple): (value, mask) cubes of the minterms.
+
+        Returns:
+            An OrderedSet with the prime implicants as cubes.
+
+        Terms are grouped by the number of ones of their value, two terms
+        are merged when they have the same mask and their values differ in
+        exactly one bit.
+        """
+        bits = [1 << k for k in range(self.n_bits - 1, -1, -1)]
+        # the workers are shut down even if a round raises.
+        with contextlib.ExitStack() as stack:
+            pool = stack.enter_context(ProcessPoolExecutor(self.workers)) if self.workers > 1 else None
+
+            # dicts are used as ordered sets, they are much faster than OrderedSet.
+            marked = dict()
+            groups = dict()
+
+            done = False
+            while not done:
+                groups = dict()
+                n_terms = 0
+                for t in terms:
+                    key = popcount(t[0])
+                    if key not in groups:
+                        groups[key] = dict()
+                    groups[key][t] = None
+                    n_terms += 1
+
+                if pool is not None and n_terms >= MIN_PARALLEL_TERMS:
+                    terms, used = self.__merge_in_pool(pool, groups)
+                else:
+                    terms = dict()      # The set of new created terms
+                    used = set()        # The set of used terms
+
+                    for key in groups:
+                        if key + 1 in groups:
+                            group_next = groups[key + 1]
+                            for t1 in groups[key]:
+                                value, mask = t1
+                                # Same optimisation as on the string engine: flip
+                                # each fixed '0' to '1' and look the result up.
+                                zeros = mask & ~value
+                                for bit in bits:
+                                    if zeros & bit:
+                                        self.profile_cmp += 1
+                                        t2 = (value | bit, mask)
+                                        if t2 in group_next:
+                                            used.add(t1)
+                                            used.add(t2)
+                                            terms[(value, mask & ~bit)] = None
+
+                # Add the unused terms to the list of marked terms
+                for g in groups.values():
+                    for t in g:
+                        if t not in used:
+                            marked[t] = None
+
+                if len(used) == 0:
+                    done = True
+
+        pi = OrderedSet(marked)
+        for g in groups.values():
+            pi |= g
+        return pi
+
+    def __merge_in_pool(self, pool, groups):
+        """Merge round of __get_prime_cubes with each pair of adjacent groups on a worker.
+
+        Args:
+            pool (ProcessPoolExecutor): the workers.
+            groups (dict): groups of cubes, keyed by their number of ones.
+
+        Returns:
+            A (terms, used) tuple, as the round of __get_prime_cubes: terms is
+            a dict with the new cubes in order and used a set of cubes.
+        """
+        n_bits = self.n_bits
+        keys = [key for key in groups if key + 1 in groups]
+        futures = [pool.submit(merge_groups,
+                               [pack_cube(t, n_bits) for t in groups[key]],
+                               [pack_cube(t, n_bits) for t in groups[key + 1]],
+                               n_bits) for key in keys]
+
+        terms = dict()
+        used = set()
+        for future in futures:
+            merged, merged_used, n_cmp = future.result()
+            self.profile_cmp += n_cmp
+            for t in merged:
+                terms[unpack_cube(t, n_bits)] = None
+            used.update(unpack_cube(t, n_bits) for t in merged_used)
+        return terms, used
+
+    def __get_prime_arrays(self, terms):
+        """Same as __get_prime_cubes, with each merge round as NumPy arrays.
+
+        Args:
+            terms (list of tuple): (value, mask) cubes of the minterms.
+
+        Returns:
+            A list with the prime implicants as cubes, in the same order as
+            __get_prime_cubes.
+
+        A round sorts the terms into the group order of __get_prime_cubes,
+        builds every candidate partner (a fixed '0' flipped to '1') and looks
+        all of them up at once with a sort join (np.isin on cube_keys).
+        """
+        import numpy as np
+        bits = np.array([1 << k for k in range(self.n_bits - 1, -1, -1)], dtype=np.uint64)
+        values = np.array([t[0] for t in terms], dtype=np.uint64)
+        masks = np.array([t[1] for t in terms], dtype=np.uint64)
+
+        marked_values = []
+        marked_masks = []
+        while len(values) > 0:
+            values, masks = unique_in_order(values, masks, self.n_bits)
+
+            # groups are visited in order of first appearance of their key.
+            keys = popcount_array(values)
+            _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            group_rank = np.argsort(np.argsort(first))[inverse]
+            order = np.argsort(group_rank, kind='mergesort')
+            values = values[order]
+            masks = masks[order]
+            term_keys = cube_keys(values, masks, self.n_bits)
+
+            # candidates in (term, bit) order, bits from the most significant.
+            zeros = masks & ~values
+            candidates = (zeros[:, np.newaxis] & bits) != 0
+            self.profile_cmp += int(candidates.sum())
+            t1, bit = np.nonzero(candidates)
+            found = np.isin(cube_keys(values[t1] | bits[bit], masks[t1], self.n_bits), term_keys)
+            t1 = t1[found]
+            bit = bits[bit[found]]
+
+            used = np.zeros(len(values), dtype=bool)
+            used[t1] = True
+            used |= np.isin(term_keys, cube_keys(values[t1] | bit, masks[t1], self.n_bits))
+
+            marked_values.append(values[~used])
+            marked_masks.append(masks[~used])
+
+            values = values[t1]
+            masks = masks[t1] & ~bit
+
+        values, masks = unique_in_order(np.concatenate(marked_values), np.concatenate(marked_masks), self.n_bits)
+        return list(zip(values.tolist(), masks.tolist()))
+
+    def __get_essential_cubes(self, terms, ones=None):
+        """Same as __get_essential_implicants, for terms represented as cubes.
+
+        Args:
+            terms (set of tuple): prime implicants as (value, mask) cubes.
+
+        Kwargs:
+            ones (set of int): if given, only these minterms have to be
+            covered, the rest of the terms are don't cares.
+
+        Returns:
+            A list of cubes covering all the terms.
+        """
+        groups = dict()
+        for t in terms:
+            n_dc = self.n_bits - popcount(t[1])
+            n = 4 * 2 ** n_dc + 8 * n_dc + popcount(t[0])
+            if n not in groups:
+                groups[n] = []
+            groups[n].append(t)
+
+        ei = []
+        covered = set()
+        for n in sorted(list(groups.keys()), reverse=True):
+            for g in groups[n]:
+                if ones is None:
+                    if not cube_covered(g, ei):
+                        ei.append(g)
+                else:
+                    g_ones = covered_minterms(g, self.n_bits, ones)
+                    if not covered.issuperset(g_ones):
+                        ei.append(g)
+                        covered.update(g_ones)
+        return ei
+
+    def __get_essential_implicants(self, terms, ones=None):
         """Simplify the set 'terms'.
 
         Args:
             terms (set of str): set of strings representing the minterms of
             ones and dontcares.
 
+        Kwargs:
+            ones (set of int): if given, only these minterms have to be
+            covered, the rest of the terms are don't cares.
+
         Returns:
             A list of prime implicants. These are the minterms that cannot be
             reduced with step 1 of the Quine McCluskey method.
@@ -391,28 +1201,61 @@ class QuineMcCluskey:
         least one other term in the list.
         """
 
-        # Create all permutations for each term in terms.
-        perms = {}
-        for t in terms:
-            perms[t] = set(p for p in self.permutations(t))
+        # Each term as a list of cubes, instead of all its minterms.
+        cubes = dict((t, self.__get_term_cubes(t)) for t in terms)
 
         # Now group the remaining terms and see if any term can be covered
         # by a combination of terms.
-        ei_range = OrderedSet()
+        ei_cubes = []
+        covered = set()
         ei = InverseTreeSet([])
         groups = dict()
         for t in terms:
-            n = self.__get_term_rank(t, len(perms[t]))
+            n = self.__get_term_rank(t, self.__get_term_size(t))
             if n not in groups:
                 groups[n] = OrderedSet()
             groups[n].add(t)
         for t in sorted(list(groups.keys()), reverse=True):
             for g in groups[t]:
-                if not perms[g] <= ei_range:
-                    ei.add(g)
-                    ei_range |= perms[g]
+                if ones is None:
+                    if not all(cube_covered(c, ei_cubes) for c in cubes[g]):
+                        ei.add(g)
+                        ei_cubes += cubes[g]
+                else:
+                    g_ones = [m for c in cubes[g] for m in covered_minterms(c, self.n_bits, ones)]
+                    if not covered.issuperset(g_ones):
+                        ei.add(g)
+                        covered.update(g_ones)
         return ei
 
+    def __get_term_cubes(self, term):
+        """Split a term into cubes.
+
+        Args:
+            term (str): one single term in string format.
+
+        Returns:
+            A list of disjoint (value, mask) cubes covering the same minterms
+            as the term. Terms without XOR or XNOR bits are a single cube,
+            otherwise the XOR positions are expanded with permutations().
+        """
+        xor_positions = [i for i, c in enumerate(term) if c in '^~']
+        if not xor_positions:
+            return [str2cube(term)]
+
+        cubes = []
+        for p in self.permutations("".join(term[i] for i in xor_positions)):
+            t = list(term)
+            for i, c in zip(xor_positions, p):
+                t[i] = c
+            cubes.append(str2cube("".join(t)))
+        return cubes
+
+    def __get_term_size(self, term):
+        """Number of minterms covered by a term, without generating them."""
+        n_xor = term.count('^') + term.count('~')
+        return 2 ** (term.count('-') + max(n_xor - 1, 0))
+
     def __get_term_rank(self, term, term_range):
         """Calculate the "rank" of a term.
 
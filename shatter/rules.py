@@ -2,23 +2,136 @@
 
 """Defines a more user friendly way of entering data."""
 
+import sys
 import warnings
-import pandas as pd
+from collections.abc import MutableSequence
 
 from shatter.constants import *
+from shatter.code import Code
 from shatter.output import Output
 from shatter.util import helpers
 from shatter.util.ordered_set import OrderedSet
 from shatter.util.code_dict import CodeDict
+from shatter.util.rule_store import RuleStore
+from shatter.util.truth_table import TruthTable, DONT_CARE
 from shatter import solver
 from shatter.util import helpers as h
 
 __author__ = 'juan pablo isaza'
 
 
-class Rules(list):
+def is_table(arg):
+    """
+    :param arg: positional arg of Rules() or Rules.add().
+    :return: True for a pandas DataFrame or a numpy structured array, whose rows are rules. Does not import pandas
+    nor numpy: if they were not imported there cannot be such objects.
+    """
+    pd = sys.modules.get('pandas')
+    np = sys.modules.get('numpy')
+    return (pd is not None and isinstance(arg, pd.DataFrame)) or \
+        (np is not None and isinstance(arg, np.ndarray) and arg.dtype.names is not None)
+
+
+# keys of rows that are not variables.
+KEYWORD_KEYS = frozenset(KEYWORDS.values())
+
+# value of Rules.output_keys when they cannot be cached.
+UNHASHABLE_OUTPUTS = 'unhashable_outputs'
+
+# types that are hashable and compared by value.
+PLAIN_TYPES = (bool, int, float, str)
+
+
+def is_hashable(value):
+    """
+    :param value: anything
+    :return: boolean
+    """
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def get_distinct_values(column):
+    """
+    :param column: list
+    :return: the distinct values of the column in order of appearance, or all of them if they are not hashable.
+    """
+    try:
+        return list(dict.fromkeys(column))
+    except TypeError:
+        return column
+
+
+class RuleRow(dict):
+    """
+    Row of a Rules object, as given when the rules are iterated or indexed. It is a dict that writes its changes back
+    to its position on the rules, so rules[i]['a'] = x works as on a list of dicts. Copies and pickles are plain dicts.
+    """
+
+    __slots__ = ('rules', 'index')
+
+    def __init__(self, rules, index, row):
+        """
+        :param rules: Rules object.
+        :param index: position of the row on the rules.
+        :param row: dict with the row.
+        """
+        dict.__init__(self, row)
+        self.rules = rules
+        self.index = index
+
+    def write_back(self):
+        self.rules[self.index] = dict(self)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self.write_back()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.write_back()
+
+    def clear(self):
+        dict.clear(self)
+        self.write_back()
+
+    def pop(self, *args):
+        value = dict.pop(self, *args)
+        self.write_back()
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self.write_back()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = dict.setdefault(self, key, default)
+        self.write_back()
+        return value
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self.write_back()
+
+    def copy(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class Rules(MutableSequence):
     """
     It is a list that contains rules, each being a dictionary with the inputs.
+    The rows are kept on a RuleStore, with a typed column per key, and are built as dictionaries (RuleRow) when the
+    object is iterated or indexed. Scans by output (get_input_keys, get_input_values) only read the output column.
+    Adding rows at the end takes O(1), any other change of the rows (insert, delete, sort, etc.) rebuilds the store.
+    It is a MutableSequence, not a list subclass: isinstance(rules, list) is False and json.dumps() needs list(rules).
+    rules + a_list and a_list + rules give lists.
     """
 
     @staticmethod
@@ -45,29 +158,83 @@ class Rules(list):
 
     def get_max_positional_arg(self):
         """
-        Gets the index for the next positional argument to start.
+        Gets the index for the next positional argument to start. Kept up to date by index_keys(), so it is O(1).
         :return: int.
         """
-        max_arg = 0
-        for d in self:
-            candidate = self.gets_start_positional_idx(d)
-            if candidate > max_arg:
-                max_arg = candidate
-
-        return max_arg
+        self.update_indexes()
+        return self.next_positional_arg
 
     def search_repeating_variable(self, value):
         """Tries to find if variable was already declared. If so outputs the original key else outputs None. Will
         exclude reserved words, as they are not variable declarations.
+        Looks up the values indexed by index_value(): a dict lookup for hashable values and Code objects (by content,
+        see CodeDict), a scan of the declared unhashable values otherwise.
         :param value: a variable value. For example a Code object.
         :return : key of possible repeating variable or None
         """
-        for d in self:
-            for key in set(d.keys()) - set(KEYWORDS.values()):
-                if d[key] == value:
-                     return key
+        self.update_indexes()
+        if isinstance(value, Code):
+            return self.code_value_keys.get(value)
+        if is_hashable(value):
+            return self.value_keys.get(value)
+
+        for declared, key in self.other_value_keys:
+            if declared == value:
+                return key
         return None
 
+    def reset_indexes(self):
+        """
+        Empties the indexes of the rows, see index_keys() and index_value().
+        """
+        self.outdated_indexes = False
+        self.next_positional_arg = 0
+        self.indexed_keys = set()
+        self.value_keys = dict()
+        self.code_value_keys = CodeDict()
+        self.other_value_keys = []
+        self.other_value_ids = set()
+
+    def update_indexes(self):
+        """
+        Indexes all the rows again, after rows were replaced in place (see __setitem__()): replaced values could be
+        the first declaration of a variable.
+        """
+        if self.outdated_indexes:
+            self.reset_indexes()
+            for block, start, stop in self.store.get_runs():
+                self.index_keys(block.keys)
+                for row in block.get_rows(start, stop):
+                    for key, value in row.items():
+                        self.index_value(key, value)
+
+    def index_keys(self, keys):
+        """
+        Updates the next positional argument index with the keys of a new row.
+        :param keys: iterable with keys.
+        """
+        keys = tuple(keys)
+        if keys not in self.indexed_keys:  # rows usually repeat the same keys.
+            self.indexed_keys.add(keys)
+            self.next_positional_arg = max(self.next_positional_arg, self.gets_start_positional_idx(keys))
+
+    def index_value(self, key, value):
+        """
+        Records the first key declaring a value, see search_repeating_variable().
+        :param key: key of a new row.
+        :param value: its value.
+        """
+        if key in KEYWORD_KEYS:
+            return
+
+        if type(value) in PLAIN_TYPES or not isinstance(value, Code) and is_hashable(value):
+            self.value_keys.setdefault(value, key)
+        elif isinstance(value, Code):
+            self.code_value_keys.setdefault(value, key)
+        elif id(value) not in self.other_value_ids:
+            self.other_value_ids.add(id(value))
+            self.other_value_keys.append((value, key))
+
     def get_dicts(self, args, kwargs):
         """
         Big issue solved here. Adds args, to have positional args always in the same order as the user inputs.
@@ -82,27 +249,11 @@ class Rules(list):
         start_idx = self.get_max_positional_arg()
         for idx, e in enumerate(args):
 
-            if isinstance(e, pd.DataFrame):
-                # TODO: implement
-
-                list_of_dicts = []
-
-                variables = list(e.columns.values)
-                for index, row in e.iterrows():
-                    new_dict = dict()
-                    for var in variables:
-                        new_dict[var] = row[var]
-
-                    list_of_dicts.append(new_dict)
-
-                return list_of_dicts
-            else:
-
-                repeating_var = self.search_repeating_variable(e)
-                if repeating_var is None:  # first time: declares new value.
-                    a_dict[POSITIONAL_ARGS_RULE + str(start_idx + idx)] = e
-                else:  # has been previously declared.
-                    a_dict[repeating_var] = e
+            repeating_var = self.search_repeating_variable(e)
+            if repeating_var is None:  # first time: declares new value.
+                a_dict[POSITIONAL_ARGS_RULE + str(start_idx + idx)] = e
+            else:  # has been previously declared.
+                a_dict[repeating_var] = e
 
         # Adds kwargs
         for k in kwargs.keys():
@@ -116,12 +267,14 @@ class Rules(list):
         :param kwargs:
         :return:
         """
+        self.store = RuleStore()
 
-        # TODO: add comment: what is this? Can still pass all tests without this.
-        list.__init__(list())
+        # indexes of the rows, to add rows in O(1).
+        self.clear_caches()
+        self.reset_indexes()
 
         if len(args) + len(kwargs) > 0:
-            self += self.get_dicts(args, kwargs)
+            self.add_rows(args, kwargs)
 
     def add(self, *args, **kwargs):
         """
@@ -130,36 +283,237 @@ class Rules(list):
         :return: void
         """
         if len(args) + len(kwargs) > 0:
-            self += (self.get_dicts(args, kwargs))
+            self.add_rows(args, kwargs)
         else:
             warnings.warn('To add condition at least 1 argument should be provided', UserWarning)
 
+    def add_rows(self, args, kwargs):
+        """
+        Adds each table in args (see is_table()) with add_table(), then the rest of args and kwargs as a single row.
+        :param args: positional args.
+        :param kwargs: a common dict
+        :return: void
+        """
+        other_args = []
+        for e in args:
+            if is_table(e):
+                self.add_table(e)
+            else:
+                other_args.append(e)
+
+        if len(other_args) + len(kwargs) > 0:
+            self += self.get_dicts(other_args, kwargs)
+
+    def add_table(self, table):
+        """
+        Adds a row per distinct row of the table, where the column names are the keys. The columns are converted in
+        one shot and duplicated rows are found with pandas vectorized hashing, no row is visited in python.
+        :param table: pandas DataFrame or numpy structured array.
+        :return: void
+        """
+        import pandas as pd
+        if not isinstance(table, pd.DataFrame):
+            table = pd.DataFrame(table)
+
+        table = table[~table.duplicated()]
+        keys = list(table.columns.values)
+        columns = [table[k].values.tolist() for k in keys]
+        self.update_indexes()
+        self.store.add_columns(keys, columns)
+        self.clear_caches()
+
+        self.index_keys(keys)
+        for key, column in zip(keys, columns):
+            for value in get_distinct_values(column):
+                self.index_value(key, value)
+
+    def append(self, row):
+        """
+        :param row: dict
+        """
+        self.update_indexes()
+        self.store.append(row)
+        self.clear_caches()
+
+        self.index_keys(row.keys())
+        for key, value in row.items():
+            self.index_value(key, value)
+
+    def extend(self, rows):
+        """
+        Adds many rows at once. Takes linear time: the positional args and the declared values are kept on indexes
+        updated row by row, nothing is rescanned.
+        :param rows: iterable, where each row is either a dict, same as add(**row), or a tuple, same as add(*row).
+        """
+        for row in rows:
+            if isinstance(row, dict):
+                self.append(row)
+            else:
+                self.extend(self.get_dicts(row, {}))
+
+    def set_rows(self, rows):
+        """
+        Replaces all the rows, rebuilding the store and the indexes. Takes linear time.
+        :param rows: iterable, same as extend().
+        """
+        rows = list(rows)
+        self.store = RuleStore()
+        self.clear_caches()
+        self.reset_indexes()
+        self.extend(rows)
+
+    def insert(self, index, row):
+        """
+        :param index: int, same as list.insert().
+        :param row: dict or tuple, see extend().
+        """
+        if index >= len(self):
+            self.extend([row])
+        else:
+            rows = list(self.store)
+            rows.insert(index, row)
+            self.set_rows(rows)
+
+    def pop(self, index=-1):
+        """
+        :param index: int, same as list.pop().
+        :return: dict with the removed row.
+        """
+        rows = list(self.store)
+        row = rows.pop(index)
+        self.set_rows(rows)
+        return row
+
+    def clear(self):
+        self.set_rows([])
+
+    def reverse(self):
+        self.set_rows(reversed(list(self.store)))
+
+    def sort(self, key=None, reverse=False):
+        self.set_rows(sorted(self.store, key=key, reverse=reverse))
+
+    def copy(self):
+        """
+        :return: a new Rules object with the same rows.
+        """
+        rules = type(self)()
+        rules.extend(self.store)
+        return rules
+
+    def __iadd__(self, rows):
+        self.extend(rows)
+        return self
+
+    def __add__(self, other):
+        if isinstance(other, (list, Rules)):
+            return list(self) + list(other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, list):
+            return other + list(self)
+        return NotImplemented
+
+    def __mul__(self, times):
+        return list(self) * times
+
+    __rmul__ = __mul__
+
+    def __iter__(self):
+        for index, row in enumerate(self.store):
+            yield RuleRow(self, index, row)
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        row = self.store.get_row(index)
+        return RuleRow(self, index % len(self), row)
+
+    def __setitem__(self, index, row):
+        """
+        A row with the same keys as the row it replaces is replaced in place, then the indexes are updated when next
+        needed. Otherwise the store is rebuilt.
+        :param index: int or slice.
+        :param row: dict (or tuple, see extend()), an iterable of them for a slice.
+        """
+        if isinstance(index, slice) or not isinstance(row, dict) or not self.store.set_row(index, row):
+            rows = list(self.store)
+            rows[index] = row
+            self.set_rows(rows)
+        else:
+            self.clear_caches()
+            self.outdated_indexes = True
+
+    def __delitem__(self, index):
+        rows = list(self.store)
+        del rows[index]
+        self.set_rows(rows)
+
+    def __contains__(self, row):
+        return any(row == r for r in self.store)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, Rules)):
+            return list(self.store) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, (list, Rules)):
+            return list(self.store) != list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self.store))
+
     @staticmethod
-    def validate(function, rules):
+    def validate(function, rules, in_memory=None):
         """
         Validates the entries, for solver()
         :param function: callable
         :param rules: rules object or table.
+        :param in_memory: if True the function source file is not needed. If None uses the value given to the solve()
+        decorator.
         """
         # if invalid raises exception.
         h.valid_function(function) and valid_rules(rules)
 
+        if in_memory is None:
+            in_memory = getattr(function, IN_MEMORY, False)
+        if in_memory:
+            return
+
         f_path = h.get_function_path(function)
 
         if not h.os.path.exists(f_path):
             raise NotImplementedError("Function path {} not found.".format(f_path))
 
-    def solve(self, function, unittest=None):
+    def solve(self, function, unittest=None, dont_cares=False, multi_output=False, cache=None, in_memory=None,
+              workers=1):
         """
         Solves puzzle given the restrains added. This is a method wrapper of solver.execute().
         :param function: the function to be coded.
         :param unittest: optional, the current test being run eg: 'self'.
+        :param dont_cares: optional, if True input combinations that no rule mentions can return anything.
+        :param multi_output: optional, if True sub expressions shared by the outputs are computed once.
+        :param cache: optional, a SolutionCache or a path to one, where solutions are stored and looked up.
+        :param in_memory: optional, if True the function is compiled and loaded without touching its source file. If
+        None uses the value given to the solve() decorator.
+        :param workers: optional, number of processes used to minimize big tables.
         :return: Solution object.
         """
-        self.validate(function, self)
+        self.validate(function, self, in_memory)
         return solver.return_solution(f=function,
                                       rules=self,
-                                      unittest=unittest)
+                                      unittest=unittest,
+                                      dont_cares=dont_cares,
+                                      multi_output=multi_output,
+                                      cache=cache,
+                                      in_memory=in_memory,
+                                      workers=workers)
 
     def get_input_values(self, f_inputs, output):
         """
@@ -172,14 +526,64 @@ class Rules(list):
 
         f_inputs = list(f_inputs)
         input_values = []
-        for row in self:
-            if KEYWORDS[OUTPUT] in row and row[KEYWORDS[OUTPUT]] == output:
-                keys = helpers.remove_list_from_list(row.keys(), f_inputs)
-                keys = helpers.remove_list_from_list(keys, remove_elements)
-                input_values += [row[k] for k in keys]
+        for block, rows in self.get_output_rows(output):
+            keys = helpers.remove_list_from_list(block.keys, f_inputs)
+            keys = helpers.remove_list_from_list(keys, remove_elements)
+            columns = [block.get_column(k) for k in keys]
+            for index in rows:
+                input_values += [column[index] for column in columns]
 
         return f_inputs + input_values
 
+    def get_output_rows(self, output):
+        """
+        Finds the rows with the output, looking at the output column of each block only.
+        :param output: the output of the rows.
+        :return: list with (Block, list with the indexes of the rows inside the block), in order of the rows.
+        """
+        result = []
+        for block, start, stop in self.store.get_runs():
+            if KEYWORDS[OUTPUT] in block.keys:
+                values = block.get_column(KEYWORDS[OUTPUT]).get_values(start, stop)
+                rows = [start + i for i, value in enumerate(values) if value == output]
+                if rows:
+                    result.append((block, rows))
+
+        return result
+
+    def clear_caches(self):
+        """
+        Called when a row is added.
+        """
+        self.output_keys = None  # see get_output_keys().
+        self.input_keys = dict()  # see get_input_keys().
+
+    def get_output_keys(self):
+        """
+        Keys of the rows of each output, in order of appearance. Built in a single pass over the output columns, then
+        cached until a row is added.
+        :return: CodeDict where keys are outputs and values are OrderedSets with keys, or None if an output is not
+        hashable.
+        """
+        if self.output_keys is None:
+            output_keys = CodeDict()
+            try:
+                for block, start, stop in self.store.get_runs():
+                    if KEYWORDS[OUTPUT] in block.keys:
+                        for value in get_distinct_values(block.get_column(KEYWORDS[OUTPUT]).get_values(start, stop)):
+                            if value in output_keys:
+                                output_keys[value] |= OrderedSet(block.keys)
+                            else:
+                                output_keys[value] = OrderedSet(block.keys)
+            except TypeError:
+                output_keys = UNHASHABLE_OUTPUTS
+
+            self.output_keys = output_keys
+
+        if self.output_keys is UNHASHABLE_OUTPUTS:
+            return None
+        return self.output_keys
+
     def get_input_keys(self, f_inputs, output):
         """
         Scans the whole rules object looking for input keys. Will add inputs (such as code pieces), that are not
@@ -202,58 +606,47 @@ class Rules(list):
 
         :param f_inputs: function inputs.
         :param output: the output of the row.
-        :return: All possible inputs that are not keywords.
+        :return: All possible inputs that are not keywords. Cached until a row is added, do not modify it.
         """
         # TODO: missing optional args(kwargs) of the input function.
+        cache_key = (tuple(f_inputs), output)
+        try:
+            return self.input_keys[cache_key]
+        except (KeyError, TypeError):
+            pass
+
         f_inputs = OrderedSet(f_inputs)
         new_inputs = OrderedSet()
 
-        for row in self:
-            if KEYWORDS[OUTPUT] in row and row[KEYWORDS[OUTPUT]] == output:
-                new_inputs |= OrderedSet(row.keys()) - f_inputs  # adds inputs who are not already args.
+        output_keys = self.get_output_keys()
+        if output_keys is not None:
+            new_inputs |= output_keys.get(output, OrderedSet()) - f_inputs  # adds inputs who are not already args.
+        else:
+            for block, _ in self.get_output_rows(output):
+                new_inputs |= OrderedSet(block.keys) - f_inputs
 
         all_elements = f_inputs | new_inputs
+        input_keys = all_elements - KEYWORDS.values()
 
-        return all_elements - KEYWORDS.values()
+        try:
+            self.input_keys[cache_key] = input_keys
+        except TypeError:  # output is not hashable.
+            pass
 
-    @staticmethod
-    def add_element_to_tuples(tuples_set, new_element):
-        """
-        Adds additional element to a tuple list.
-        :param tuples_set: a set containing tuples.
-        :param new_element: any element to add in last position.
-        :return: tuple set
-        """
-        new_tuples = list()
-        for tuple_element in tuples_set:
-            new_tuples.append(tuple_element + (new_element,))
-
-        return new_tuples
+        return input_keys
 
     def get_tuples_from_args(self, row, function_args, output):
         """
-        Get a list containing tuples (with implicit or explicit rows).
+        Get the truth table of a row: a single cube, where the undetermined variables are DONT_CARE. It has all the
+        possible outcomes of those variables (True and False) once expanded.
         :param row: dict with index as key and value as input value.
         :param function_args: function
         :param output: the output of the row.
-        :return: set containing tuples.
+        :return: TruthTable with 1 cube.
         """
-
-        # starts with 1 tuple
-        tuples = [()]
-        for variable in self.get_input_keys(function_args, output):
-
-            if variable in row:
-                tuples = self.add_element_to_tuples(tuples, row[variable])
-            else:
-
-                # All possible outcomes for undetermined boolean variable: duplicates number of tuples.
-                true_tuples = self.add_element_to_tuples(tuples, True)
-                false_tuples = self.add_element_to_tuples(tuples, False)
-                tuples = true_tuples + false_tuples
-
-        # add explicit output to tuples, if necessary.
-        return tuples
+        cube = tuple(row[variable] if variable in row else DONT_CARE
+                     for variable in self.get_input_keys(function_args, output))
+        return TruthTable([cube])
 
     @staticmethod
     def is_explicit(row):
@@ -321,10 +714,9 @@ class Rules(list):
         if output in truth_tables:  # uses existing table.
             truth_table = truth_tables[output]
         else:  # adds new truth table
-            truth_table = list()
+            truth_table = TruthTable()
 
-        condition_rows = self.get_tuples_from_args(row, function_args, output)
-        truth_table = truth_table + condition_rows  # concat lists.
+        truth_table += self.get_tuples_from_args(row, function_args, output)  # appends the rows, in place.
 
         truth_tables[output] = truth_table  # add to tables dict.
 
@@ -335,15 +727,17 @@ class Rules(list):
         Factor Truth tables by output.
         This is the 'private' version.
         :param function_args: variables.
-        :return: CodeDict(), where key=output and value=implicit truth table.
+        :return: CodeDict(), where key=output and value=implicit truth table (TruthTable).
         """
 
         # dict where outputs are the keys, values are the rows.
         truth_tables = CodeDict()
 
-        for row in self:
-            if self.row_has_no_keyword_keys(row):
-                truth_tables = self.add_truth_table(truth_tables, row, function_args)
+        # rows of a block have the same keys.
+        for block, start, stop in self.store.get_runs():
+            if self.row_has_no_keyword_keys(dict.fromkeys(block.keys)):
+                for row in block.get_rows(start, stop):
+                    truth_tables = self.add_truth_table(truth_tables, row, function_args)
 
         return truth_tables
 
@@ -365,7 +759,8 @@ def add_to_dict_table(table, key, value):
     return table
 
 
-def solve(function, rules, unittest=None):
+def solve(function, rules, unittest=None, dont_cares=False, multi_output=False, cache=None, in_memory=None,
+          workers=1):
     """
     This is the static version of rules.solve()
     :param function: the function to be coded.
@@ -386,12 +781,46 @@ def solve(function, rules, unittest=None):
         Note: this representation is limited to outputs that are boolean, if not use Representation 1.
 
     :param unittest: optional, the current test being run eg: 'self'.
+    :param dont_cares: optional, if True input combinations that no row mentions can return anything.
+    :param multi_output: optional, if True sub expressions shared by the outputs are computed once.
+    :param cache: optional, a SolutionCache or a path to one, where solutions are stored and looked up.
+    :param in_memory: optional, if True the function is compiled and loaded without touching its source file. If None
+    uses the value given to the solve() decorator.
+    :param workers: optional, number of processes used to minimize big tables.
     :return: Solution object.
     """
-    Rules.validate(function, rules)
+    Rules.validate(function, rules, in_memory)
     return solver.return_solution(f=function,
                                   rules=rules,
-                                  unittest=unittest)
+                                  unittest=unittest,
+                                  dont_cares=dont_cares,
+                                  multi_output=multi_output,
+                                  cache=cache,
+                                  in_memory=in_memory,
+                                  workers=workers)
+
+
+def solve_many(problems, unittest=None, dont_cares=False, multi_output=False, cache=None, workers=1):
+    """
+    Solves many functions at once, eg: all the functions of a module. Each source file is read and written only once.
+    :param problems: iterable with (function, rules) tuples, rules as on solve().
+    :param unittest: optional, the current test being run eg: 'self'.
+    :param dont_cares: optional, if True input combinations that no row mentions can return anything.
+    :param multi_output: optional, if True sub expressions shared by the outputs are computed once.
+    :param cache: optional, a SolutionCache or a path to one, where solutions are stored and looked up.
+    :param workers: optional, number of processes used to minimize big tables.
+    :return: list with a Solution object per problem.
+    """
+    problems = list(problems)
+    for function, rules in problems:
+        Rules.validate(function, rules)
+
+    return solver.return_solutions(problems=problems,
+                                   unittest=unittest,
+                                   dont_cares=dont_cares,
+                                   multi_output=multi_output,
+                                   cache=cache,
+                                   workers=workers)
 
 
 def from_raw_list_to_dict_table(rules):
@@ -446,7 +875,7 @@ def get_truth_tables(rules, function_args):
 
 def valid_rules(rules):
     """
-    Valid rules objects must be lists, inherit from list or be a Rules object.
+    Valid rules objects must be lists or Rules objects.
     - list case:  When the input is a raw table. If rules is a list then all rows have to be tuples or inherit
     from tuple.
     - Rules case: When the input is a Rules object.
@@ -457,9 +886,8 @@ def valid_rules(rules):
     if not isinstance(rules, list) and not isinstance(rules, Rules):
         raise RulesTypeError(rules, TYPE_ERROR)
 
-    # only for list. Explicitly forbids Rules class as Rules class inherits from list and would be easily mistaken for a
-    # standard list.
-    if isinstance(rules, list) and not isinstance(rules, Rules):
+    # only for raw lists.
+    if isinstance(rules, list):
         for row in rules:
             if not isinstance(row, tuple):
                 raise RulesTypeError(row, ROW_ERROR)
@@ -4,6 +4,8 @@
 
 import ast
 
+from shatter.util.stats import Stats
+
 
 __author__ = 'juan pablo isaza'
 
@@ -12,12 +14,14 @@ class Solution:
     """
     Contains the data describing the solution to the puzzle.
     """
-    def __init__(self, function, rules, processed_rules, implementation=[]):
+    def __init__(self, function, rules, processed_rules, implementation=[], stats=None, fingerprint=None):
         """
         :param function: a callable.
         :param rules: object of type rules.
         :param processed_rules: object of time processed rules.
         :param implementation:  List containing each line of code.
+        :param stats: Stats object with the timings and sizes of the solve, if None an empty one.
+        :param fingerprint: string that changes when the rules or the solver change, stamped on the written function.
         :arg ast: abstract syntax tree of Code.
         :return: Solution object.
         """
@@ -26,3 +30,12 @@ class Solution:
         self.rules = rules
         self.processed_rules = processed_rules
         self.ast = ast.parse("\n".join(implementation))
+        self.stats = Stats() if stats is None else stats
+        self.fingerprint = fingerprint
+
+    @property
+    def source(self):
+        """
+        :return: string with the source code of the implementation.
+        """
+        return '\n'.join(self.implementation) + '\n'
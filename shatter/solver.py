@@ -1,16 +1,21 @@
 #!/usr/bin/env python
 
 """This is the main file. Calls QM algorithm and code generation functions."""
+import hashlib
 import inspect
+import json
+from collections import OrderedDict
 
 #from shatter import qm
 from shatter.code_generator import *
-from shatter.machine_learning import learner
 from shatter.processed_rules import *
 from shatter.solution import Solution
 from shatter.tester import test_implementation, SolvableWithMLImplementation
 from shatter.util import helpers as h
-from shatter.float_input import get_float_classification
+from shatter.util.code_dict import get_store_key
+from shatter.util.solution_cache import get_cache, CACHE_VERSION
+from shatter.util import stats as st
+from shatter.util.truth_table import TruthTable, DONT_CARE, get_cubes
 from shatter import QM_helper
 
 # TODO: from shatter import solver as production_solver: ie use the production shatter to speed up development of
@@ -37,9 +42,13 @@ __author__ = 'juan pablo isaza'
 # TODO: missing a better tester test for table combination of arguments and Code objects
 
 
-def solve():
+def solve(in_memory=False, rules=None):
     """
     This defines a Decorator, that will wrap the generated functions.
+    :param in_memory: if True the function is solved in memory by default, its source file is never rewritten, see
+    return_solution().
+    :param rules: optional, the rules of the function (or a callable without arguments returning them), so that
+    package_solver.solve_all() can find them.
     :return: boolean value of generated function.
     """
     def wrap(f):
@@ -61,6 +70,9 @@ def solve():
         wrapped_f.__name__ = f.__name__
         wrapped_f.__module__ = f.__module__
         wrapped_f.internal_code = f.__code__
+        wrapped_f.__wrapped__ = f
+        wrapped_f.in_memory = in_memory
+        wrapped_f.rules = rules
 
         sig = inspect.signature(f)
         wrapped_f.internal_parameters = tuple(sig.parameters.keys())
@@ -136,10 +148,24 @@ def alter_file(line_number, input_file_list, implementation, input_path):
     :param input_path: source file path.
     :return: void
     """
-    source = h.get_function_code(line_number, input_file_list)
+    h.rewrite_file(input_path, splice_implementations(input_file_list, {line_number: implementation}, input_path))
 
-    input_file_list = input_file_list[:line_number] + implementation + input_file_list[line_number + len(source):]
-    h.rewrite_file(input_path, input_file_list)
+
+def splice_implementations(input_file_list, implementations, input_path=None):
+    """
+    Replaces functions of a source file. Goes from the bottom up, so the line numbers of the functions above do not
+    change.
+    :param input_file_list: contains all lines of source.
+    :param implementations: dict with the line number of each function and its new implementation.
+    :param input_path: optional, source file path, to find the functions on its index.
+    :return: list with the new lines of source.
+    """
+    for line_number in sorted(implementations, reverse=True):
+        source = h.get_function_code(line_number, input_file_list, input_path)
+        input_file_list = input_file_list[:line_number] + implementations[line_number] + \
+            input_file_list[line_number + len(source):]
+
+    return input_file_list
 
 
 def get_empty_solution(function, rules):
@@ -203,15 +229,35 @@ def all_input_are_boolean(tables):
     :return: boolean
     """
     for _, table in tables.items():
-        for the_tuple in table:
+        for the_tuple in get_cubes(table):
             for e in the_tuple:
-                if e not in (False, True) and not isinstance(e, Code):
+                if e is not DONT_CARE and e not in (False, True) and not isinstance(e, Code):
                     return False  # found non boolean element
 
     return True
 
 
-def get_expression(table, rules, function_args, the_output):
+def get_off_table(tables, rules, function_args, the_output):
+    """
+    Gets the rows of all other outputs, which must not return the_output.
+    :param tables: dict where keys are outputs and values are truth tables.
+    :param rules: Rules obj or truth table.
+    :param function_args: collection of function inputs.
+    :param the_output: any output
+    :return: TruthTable or None when another table has different inputs, so that its rows cannot be compared.
+    """
+    inputs = get_input_values(rules, function_args, the_output)
+    off_table = TruthTable()
+    for output, table in tables.items():
+        if get_store_key(output) != get_store_key(the_output):  # equal outputs are the same table, see CodeDict.
+            if not get_input_values(rules, function_args, output) == inputs:
+                return None
+            off_table += table
+
+    return off_table
+
+
+def get_expression(table, rules, function_args, the_output, off_table=None, stats=None, workers=1):
     """
     returns a expression solving the problem.
     :param table: inputs
@@ -219,14 +265,73 @@ def get_expression(table, rules, function_args, the_output):
     :param function_args: collection of function inputs.
     :param the_output: any output
     ei. a function from {0,1} -> {0,1}
+    :param off_table: rows that must not return the_output, when the rest are don't cares. See get_off_table.
+    :param stats: optional Stats object, gets the sizes of the minimization.
+    :param workers: number of processes of the minimization.
     :return: string with an expression.
     """
 
     all_inputs = get_input_values(rules, function_args, the_output)
-    return QM_helper.get_boolean_expression(table, all_inputs, the_output)
+    if stats is not None:
+        stats.set_max(st.INPUTS, len(all_inputs))
+    return QM_helper.get_boolean_expression(table, all_inputs, the_output, off_table, stats, workers)
 
 
-def find_candidate_solution(f, definition, rules, processed_rules, function_args):
+def add_multi_output_code(implementation, definition, processed_rules, rules, function_args, stats):
+    """
+    Same as the boolean case of find_candidate_solution(), but the products shared by several outputs (or terms) are
+    assigned once to local variables, just before the first if that uses them: they are evaluated at most once per
+    call, and not at all when the function returns before.
+    :param implementation: current code.
+    :param definition: function definition.
+    :param processed_rules: obj containing dict with tables.
+    :param rules: condition or object or partial truth table (explicit, implicit or mix).
+    :param function_args: arguments to the function object.
+    :param stats: Stats object.
+    :return: string list with implementation.
+    """
+    tables = processed_rules.tables
+
+    outputs = []
+    for the_output, table in tables.items():
+
+        # same as the single output case: False outputs are not solved.
+        if the_output or not isinstance(the_output, bool):
+
+            with stats.phase(st.MINIMIZATION_PHASE):
+                if processed_rules.dont_cares:
+                    off_table = get_off_table(tables, rules, function_args, the_output)
+                else:
+                    off_table = None
+
+                all_inputs = get_input_values(rules, function_args, the_output)
+                stats.set_max(st.INPUTS, len(all_inputs))
+                outputs.append((the_output, QM_helper.get_products(table, all_inputs, off_table, stats,
+                                                                   processed_rules.workers)))
+
+    with stats.phase(st.CODE_GENERATION_PHASE):
+        shared = get_shared_products([product for _, products in outputs for product in products])
+        shared_code, shared_names = get_shared_code(shared, definition)
+
+        assigned = set()
+        for the_output, products in outputs:
+            expression = print_products(products, shared_names)
+            if expression == '':
+                expression = '{}'.format(the_output)  # as in QM_helper.get_boolean_expression()
+
+            start = len(implementation)
+            implementation = add_code_to_implementation(current_implementation=implementation,
+                                                        bool_expression=expression,
+                                                        definition=definition,
+                                                        the_output=the_output)
+            if len(implementation) > start:  # the assignments go right before the new statement.
+                start += implementation[start] == ''
+                implementation[start:start] = get_pending_shared_code(products, shared, shared_code, assigned)
+
+    return implementation
+
+
+def find_candidate_solution(f, definition, rules, processed_rules, function_args, stats=None):
     """
     Finds a possible solution with the Quine-McCluskey algorithm.
     :param f: function object.
@@ -234,25 +339,41 @@ def find_candidate_solution(f, definition, rules, processed_rules, function_args
     :param rules: condition or object or partial truth table (explicit, implicit or mix).
     :param processed_rules: obj containing dict with tables.
     :param function_args: arguments to the function object.
+    :param stats: Stats object that gets the minimization and code generation timings, if None a new one.
     :return: Solution object. Can be the optimal solution or not.
     """
+    if stats is None:
+        stats = st.Stats()
+
     implementation = get_initial_implementation(definition)
 
     tables = processed_rules.tables
 
-    if all_input_are_boolean(tables):
+    if all_input_are_boolean(tables) and processed_rules.multi_output:
+        implementation = add_multi_output_code(implementation, definition, processed_rules, rules, function_args,
+                                               stats)
+
+    elif all_input_are_boolean(tables):
         for the_output, table in tables.items():
 
             # will not solve anything when the output is False, as with True values is enough to specify an output
             if the_output or not isinstance(the_output, bool):
 
-                expression = get_expression(table, rules, function_args, the_output)
+                with stats.phase(st.MINIMIZATION_PHASE):
+                    if processed_rules.dont_cares:
+                        off_table = get_off_table(tables, rules, function_args, the_output)
+                    else:
+                        off_table = None
+
+                    expression = get_expression(table, rules, function_args, the_output, off_table, stats,
+                                                processed_rules.workers)
 
                 if len(expression) > 0:
-                    implementation = add_code_to_implementation(current_implementation=implementation,
-                                                                bool_expression=expression,
-                                                                definition=definition,
-                                                                the_output=the_output)
+                    with stats.phase(st.CODE_GENERATION_PHASE):
+                        implementation = add_code_to_implementation(current_implementation=implementation,
+                                                                    bool_expression=expression,
+                                                                    definition=definition,
+                                                                    the_output=the_output)
 
     else:  # float case
         all_inputs = get_input_values(rules, function_args, True)
@@ -263,69 +384,384 @@ def find_candidate_solution(f, definition, rules, processed_rules, function_args
         # tables with True and False outcomes only.
         binary_table = {True: tables[True], False: tables[False]}
 
-        expression = get_float_classification(binary_table, all_inputs)
+        stats.set_max(st.INPUTS, len(all_inputs))
+        with stats.phase(st.MINIMIZATION_PHASE):
+            from shatter.float_input import get_float_classification  # loads sympy, pyeda and pandas.
+            expression = get_float_classification(binary_table, all_inputs)
 
         if len(expression) > 0:
-            implementation = add_code_to_implementation(current_implementation=implementation,
-                                                        bool_expression=expression,
-                                                        definition=definition,
-                                                        the_output=True)  # TODO: is it right?
+            with stats.phase(st.CODE_GENERATION_PHASE):
+                implementation = add_code_to_implementation(current_implementation=implementation,
+                                                            bool_expression=expression,
+                                                            definition=definition,
+                                                            the_output=True)  # TODO: is it right?
+
+    with stats.phase(st.CODE_GENERATION_PHASE):
+        implementation = add_default_return(definition, processed_rules, implementation)
 
-    implementation = add_default_return(definition, processed_rules, implementation)
     solution = Solution(implementation=implementation,
                         function=f,
                         rules=rules,
-                        processed_rules=processed_rules)
+                        processed_rules=processed_rules,
+                        stats=stats)
 
     return solution
 
 
-def return_solution(f, rules, unittest):
+def print_canonical(instance):
     """
-    Solves the riddle, Writes it and tests it.
-    :param unittest: the unittest object that is passed to test stuff
-    :param f: any function object.
+    Prints an object as code together with its type, so that eg: 1 and True are different.
+    :param instance: anything on a truth table.
+    :return: string
+    """
+    return type(instance).__name__ + ':' + print_object(instance)
+
+
+def get_cache_key(definition, processed_rules, rules, function_args):
+    """
+    Content hash of everything the implementation depends on: the definition, the tables with their inputs and
+    outputs, the default output, the solve options and the minimizer settings.
+    :param definition: function definition.
+    :param processed_rules: obj containing dict with tables.
     :param rules: condition or object or partial truth table (explicit, implicit or mix).
-    :return: True for successful operation, False if not.
+    :param function_args: arguments to the function object.
+    :return: string with a sha256 hex digest.
     """
-    f_path = h.get_function_path(f)
-    file_code = h.read_file(f_path)
-    f_line = h.get_function_line_number(f, file_code)
+    tables = []
+    for the_output, table in processed_rules.tables.items():
+        inputs = get_input_values(rules, function_args, the_output)
+        tables.append([print_canonical(the_output),
+                       [print_canonical(e) for e in inputs],
+                       [[print_canonical(e) for e in row] for row in get_cubes(table)]])
 
-    # enters only if the function source code was found and has a signature.
-    if f_line >= 0 and get_signature_from_definition(file_code[f_line]):
+    content = [CACHE_VERSION,
+               definition,
+               tables,
+               print_canonical(processed_rules.default),
+               processed_rules.dont_cares,
+               processed_rules.multi_output,
+               QM_helper.get_settings()]
 
-        definition = file_code[f_line]
-        function_args = h.get_function_inputs(f)
+    return hashlib.sha256(json.dumps(content).encode('utf-8')).hexdigest()
 
-        processed_rules = get_processed_rules(rules, function_args)
+
+def get_tested_solution(f, definition, rules, processed_rules, function_args, unittest, stats=None):
+    """
+    Finds a solution and tests it, if there are contradictions corrects the tables with machine learning and tries
+    again.
+    :param f: function object.
+    :param definition: function definition.
+    :param rules: condition or object or partial truth table (explicit, implicit or mix).
+    :param processed_rules: obj containing dict with tables.
+    :param function_args: arguments to the function object.
+    :param unittest: the unittest object that is passed to test stuff
+    :param stats: Stats object that gets the timings, if None a new one.
+    :return: Solution object.
+    """
+    if stats is None:
+        stats = st.Stats()
+
+    solution = find_candidate_solution(f=f,
+                                       definition=definition,
+                                       rules=rules,
+                                       processed_rules=processed_rules,
+                                       function_args=function_args,
+                                       stats=stats)
+
+    try:
+        with stats.phase(st.TESTING_PHASE):
+            test_implementation(unittest, solution)
+    except SolvableWithMLImplementation:
+        # A contradiction was detected, if it is a boolean problem will use the non_deterministic module
+        # to clean the contradiction and output a table object free of contradictions.
+
+        with stats.phase(st.ML_CORRECTION_PHASE):
+            from shatter.machine_learning import learner  # loads numpy.
+            tables = solution.rules.get_truth_tables(function_args)
+            new_tables = learner.correct_truth_table(tables)
+
+        processed_rules.tables = new_tables
         solution = find_candidate_solution(f=f,
                                            definition=definition,
                                            rules=rules,
                                            processed_rules=processed_rules,
-                                           function_args=function_args)
+                                           function_args=function_args,
+                                           stats=stats)
 
-        try:
+        # Final test if not passes something really wrong is happening
+        with stats.phase(st.TESTING_PHASE):
             test_implementation(unittest, solution)
-        except SolvableWithMLImplementation:
-            # A contradiction was detected, if it is a boolean problem will use the non_deterministic module
-            # to clean the contradiction and output a table object free of contradictions.
 
-            tables = solution.rules.get_truth_tables(function_args)
-            new_tables = learner.correct_truth_table(tables)
+    return solution
 
-            processed_rules.tables = new_tables
-            solution = find_candidate_solution(f=f,
-                                               definition=definition,
-                                               rules=rules,
-                                               processed_rules=processed_rules,
-                                               function_args=function_args)
 
-            # Final test if not passes something really wrong is happening
-            test_implementation(unittest, solution)
+def find_solution(f, rules, file_code, unittest, dont_cares=False, multi_output=False, cache=None, f_path=None,
+                  workers=1):
+    """
+    Solves the riddle and tests it, without writing it.
+    :param f: any function object.
+    :param rules: condition or object or partial truth table (explicit, implicit or mix).
+    :param file_code: list with the lines of the source file of f.
+    :param unittest: the unittest object that is passed to test stuff
+    :param dont_cares: see return_solution().
+    :param multi_output: see return_solution().
+    :param cache: see return_solution().
+    :param f_path: optional, path of the source file, to find the function on its index.
+    :param workers: see return_solution().
+    :return: tuple with the Solution and the line number of the function definition on file_code. If the function source
+    code was not found the line number is -1 and the solution is empty.
+    """
+    f_line = h.get_function_line_number(f, file_code, f_path)
+
+    # enters only if the function source code was found and has a signature.
+    if f_line >= 0 and get_signature_from_definition(file_code[f_line]):
+        previous = h.get_function_code(f_line, file_code, f_path)
+        solution = get_solution(f, rules, remove_fingerprint(file_code[f_line]), unittest, dont_cares, multi_output,
+                                cache, previous, workers)
+        return solution, f_line
+
+    return get_empty_solution(f, rules), -1
+
+
+def get_body_fingerprint(body):
+    """
+    :param body: list with the lines of a function after its definition, as written or as read from its file.
+    :return: string, first characters of the hash of the body, without trailing blanks nor blank lines at the end.
+    """
+    lines = [line.rstrip() for line in '\n'.join(body).split('\n')]
+    while lines and not lines[-1]:
+        lines.pop()
+    return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def is_stamped(previous, fingerprint):
+    """
+    :param previous: list with the lines of a written function.
+    :param fingerprint: fingerprint of the rules.
+    :return: True when previous is stamped with the fingerprint and its body was not changed since it was written.
+    """
+    stamp = re.search(FINGERPRINT_PATTERN, previous[0])
+    return stamp is not None and stamp.group('fingerprint') == fingerprint \
+        and stamp.group('body') == get_body_fingerprint(previous[1:])
+
+
+def remove_fingerprint(definition):
+    """
+    :param definition: first line of a function.
+    :return: the definition without the fingerprint.
+    """
+    return re.sub(FINGERPRINT_PATTERN, '', definition)
+
+
+def add_fingerprint(implementation, fingerprint):
+    """
+    :param implementation: list with the lines of a function.
+    :param fingerprint: string or None.
+    :return: the implementation to write, with the fingerprint and the fingerprint of its body stamped on its
+    definition.
+    """
+    if fingerprint is None:
+        return implementation
+    stamp = FINGERPRINT_COMMENT.format(fingerprint=fingerprint, body=get_body_fingerprint(implementation[1:]))
+    return [implementation[0] + stamp] + implementation[1:]
+
+
+def is_unchanged(solution):
+    """
+    :param solution: Solution object.
+    :return: boolean, True when the written function already has the same fingerprint, so it is not written again.
+    """
+    return solution.stats.counters[st.UNCHANGED] > 0
+
+
+def get_solution(f, rules, definition, unittest, dont_cares=False, multi_output=False, cache=None, previous=None,
+                 workers=1):
+    """
+    Solves the riddle and tests it, from the definition of the function.
+    :param f: any function object.
+    :param rules: condition or object or partial truth table (explicit, implicit or mix).
+    :param definition: first line of the function without fingerprint, eg: 'def f(a, b):'.
+    :param unittest: the unittest object that is passed to test stuff
+    :param dont_cares: see return_solution().
+    :param multi_output: see return_solution().
+    :param cache: see return_solution().
+    :param previous: optional, list with the lines of the written function. When the fingerprint stamped on it is the
+    fingerprint of the rules and its body was not edited, see is_stamped(), it is kept without minimizing nor testing
+    and the UNCHANGED counter is set.
+    :param workers: see return_solution().
+    :return: Solution object, with the fingerprint of the rules.
+    """
+    function_args = h.get_function_inputs(f)
+
+    stats = st.Stats()
+    with stats.phase(st.RULES_PHASE):
+        processed_rules = get_processed_rules(rules, function_args, dont_cares, multi_output, workers)
+
+    stats.add(st.ROWS, sum(len(table) for table in processed_rules.tables.values()))
+    stats.add(st.OUTPUTS, len(processed_rules.tables))
+
+    key = get_cache_key(definition, processed_rules, rules, function_args)
+    fingerprint = key[:FINGERPRINT_LENGTH]
 
-        alter_file(f_line, file_code, solution.implementation, f_path)
-        print("Solved and tested " + f.__name__)
+    if previous is not None and is_stamped(previous, fingerprint):
+        stats.add(st.UNCHANGED)
+        print("Unchanged " + f.__name__)
+        return Solution(implementation=[definition] + previous[1:],
+                        function=f,
+                        rules=rules,
+                        processed_rules=processed_rules,
+                        stats=stats,
+                        fingerprint=fingerprint)
+
+    solution_cache = get_cache(cache)
+    implementation = solution_cache.get(key) if solution_cache is not None else None
+
+    if implementation is not None:
+        solution = Solution(implementation=implementation,
+                            function=f,
+                            rules=rules,
+                            processed_rules=processed_rules,
+                            stats=stats)
+        stats.add(st.CACHE_HITS)
+        message = "Found cached solution for "
+    else:
+        solution = get_tested_solution(f, definition, rules, processed_rules, function_args, unittest, stats)
+        if solution_cache is not None:
+            solution_cache.put(key, solution.implementation)
+        message = "Solved and tested "
+
+    solution.fingerprint = fingerprint
+    print(message + f.__name__)
+    return solution
+
+
+def check_in_memory(f):
+    """
+    Raises ValueError, before solving, when the function cannot be solved in memory:
+    - closures (nested functions using variables of the enclosing function): their code cannot be swapped by code
+    without the same free variables, see load_implementation().
+    - *args, keyword-only args and **kwargs: definitions only have plain args, see FUNCTION_PATTERN.
+    :param f: function object.
+    """
+    target = getattr(f, '__wrapped__', f)
+    if target.__code__.co_freevars:
+        raise ValueError('{} uses the variables {} of its enclosing function, it cannot be solved in memory.'
+                         .format(target.__qualname__, ', '.join(target.__code__.co_freevars)))
+
+    parameters = inspect.signature(target, follow_wrapped=False).parameters.values()
+    if any(p.kind not in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in parameters):
+        raise ValueError('{} has *args, keyword-only args or **kwargs, it cannot be solved in memory.'
+                         .format(target.__qualname__))
+
+
+def get_in_memory_definition(f):
+    """
+    :param f: function object, see check_in_memory().
+    :return: definition of the function without reading its source, eg: 'def f(a, b):'. Default values are not
+    needed, they stay on the function object.
+    """
+    check_in_memory(f)
+    target = getattr(f, '__wrapped__', f)
+    parameters = inspect.signature(target, follow_wrapped=False).parameters
+    return 'def {}({}):'.format(target.__name__, ', '.join(parameters))
+
+
+def load_implementation(f, implementation):
+    """
+    Compiles the implementation and swaps its code into the function (the inner function when decorated), so that the
+    function runs the new code without rewriting its source file. The function keeps its module globals and defaults.
+    :param f: function object, not a closure, see check_in_memory().
+    :param implementation: list with the lines of a function with the same name of f.
+    :return: the function whose code was replaced.
+    """
+    check_in_memory(f)
+    target = getattr(f, '__wrapped__', f)
+    namespace = dict(target.__globals__)  # the module of the function is not touched.
+    exec(compile('\n'.join(implementation), target.__code__.co_filename, 'exec'), namespace)
+    target.__code__ = namespace[target.__name__].__code__
+    return target
+
+
+@h.internal_mode()  # every comparison made while solving is private.
+def return_solution(f, rules, unittest, dont_cares=False, multi_output=False, cache=None, in_memory=None,
+                    workers=1):
+    """
+    Solves the riddle, Writes it and tests it.
+    :param unittest: the unittest object that is passed to test stuff
+    :param f: any function object.
+    :param rules: condition or object or partial truth table (explicit, implicit or mix).
+    :param dont_cares: if True input combinations missing from the rules can return anything, which gives shorter
+    code. Ignored when the rules have a default output.
+    :param multi_output: if True the sub expressions shared by several outputs are computed once, on local variables.
+    :param cache: SolutionCache or path to one, see solution_cache.get_cache(). On a hit the stored implementation is
+    written without minimizing nor testing.
+    :param in_memory: if True the source file is neither read nor rewritten: the implementation is compiled and loaded
+    on the function, see load_implementation(). If None uses the value given to the solve() decorator, False when the
+    function is not decorated.
+    :param workers: number of processes used to find the prime implicants of big tables, see qm.QuineMcCluskey.
+    :return: Solution object, with the timings and sizes of each phase on its stats attribute.
+    """
+    if in_memory is None:
+        in_memory = getattr(f, IN_MEMORY, False)
+
+    if in_memory:
+        solution = get_solution(f, rules, get_in_memory_definition(f), unittest, dont_cares, multi_output, cache,
+                                workers=workers)
+        load_implementation(f, solution.implementation)
         return solution
 
-    return get_empty_solution(f, rules)
+    f_path = h.get_function_path(f)
+    file_code = h.read_file(f_path)
+    solution, f_line = find_solution(f, rules, file_code, unittest, dont_cares, multi_output, cache, f_path, workers)
+
+    if f_line >= 0 and not is_unchanged(solution):
+        with solution.stats.phase(st.FILE_REWRITE_PHASE):
+            alter_file(f_line, file_code, add_fingerprint(solution.implementation, solution.fingerprint), f_path)
+
+    return solution
+
+
+@h.internal_mode()
+def return_solutions(problems, unittest, dont_cares=False, multi_output=False, cache=None, workers=1):
+    """
+    Batch version of return_solution(): solves many functions, reading each source file once and writing it once
+    with all its new functions.
+    :param problems: iterable with (function, rules) tuples.
+    :param unittest: the unittest object that is passed to test stuff
+    :param dont_cares: see return_solution(), applies to all the functions.
+    :param multi_output: see return_solution(), applies to all the functions.
+    :param cache: see return_solution().
+    :param workers: see return_solution().
+    :return: list with a Solution per problem, on the same order. The file rewrite time of each solution is the time
+    of the single write of its file.
+    """
+    problems = list(problems)
+    solutions = [None] * len(problems)
+
+    problems_by_path = OrderedDict()
+    for index, (f, _) in enumerate(problems):
+        problems_by_path.setdefault(h.get_function_path(f), []).append(index)
+
+    for f_path, indexes in problems_by_path.items():
+        file_code = h.read_file(f_path)
+
+        implementations = dict()
+        written = []
+        for index in indexes:
+            f, rules = problems[index]
+            solution, f_line = find_solution(f, rules, file_code, unittest, dont_cares, multi_output, cache, f_path,
+                                             workers)
+            solutions[index] = solution
+            if f_line >= 0 and not is_unchanged(solution):
+                implementations[f_line] = add_fingerprint(solution.implementation, solution.fingerprint)
+                written.append(solution)
+
+        if implementations:
+            stats = st.Stats()
+            with stats.phase(st.FILE_REWRITE_PHASE):
+                h.rewrite_file(f_path, splice_implementations(file_code, implementations, f_path))
+
+            for solution in written:
+                solution.stats.times[st.FILE_REWRITE_PHASE] += stats.times[st.FILE_REWRITE_PHASE]
+
+    return solutions
@@ -4,11 +4,17 @@
 import traceback
 import unittest
 
+from shatter import qm
 from shatter.code import Code
 from shatter.util.helpers import *
+from shatter.util.truth_table import DONT_CARE, expand_cube, get_cubes
 
 __author__ = 'juan pablo isaza'
 
+# cubes with more unspecified inputs are tested on a few of their rows and on the cubes they share with other outputs,
+# instead of on all their 2^n rows.
+MAX_EXPANDED_DONT_CARES = 3
+
 
 def get_eval_code(args_str, function):
     """
@@ -50,21 +56,38 @@ def print_inputs_of_tuple(a_tuple):
     return result[:-2]
 
 
-def run_single_test(test_class, a_tuple, solution, expected_value):
+def get_namespace(solution):
+    """
+    Runs the implementation once, so that all the tests can call it.
+    :param solution: obj
+    :return: dict with the globals of this module and the implemented function, or None if it cannot be run.
+    """
+    namespace = dict(globals())
+    try:
+        exec("\n".join(solution.implementation), namespace)
+    except:
+        return None
+    return namespace
+
+
+def run_single_test(test_class, a_tuple, solution, expected_value, namespace=None):
     """
     Test for a single input values.
     :param test_class: the unittest instance
     :param a_tuple: either dict() or tuple with inputs.
     :param solution: obj
     :param expected_value: the value that should have the result to pass the test.
+    :param namespace: optional, see get_namespace(). If None the implementation is run for this test only.
     :return: passes, not passes, or cannot be tested by lack of context :(
     """
 
     function_call_code = get_eval_code(print_inputs_of_tuple(a_tuple), solution.function)
 
     try:
-        exec("\n".join(solution.implementation))
-        returned = eval(function_call_code)
+        if namespace is None:
+            namespace = dict(globals())
+            exec("\n".join(solution.implementation), namespace)
+        returned = eval(function_call_code, namespace)
     except:
         w_str = "Cannot test function, probably lack of context, exception is: "
         warnings.warn(w_str, UserWarning)
@@ -73,6 +96,56 @@ def run_single_test(test_class, a_tuple, solution, expected_value):
         test_class.assertEqual(returned, expected_value)
 
 
+def get_bitmask_cube(cube):
+    """
+    :param cube: tuple with boolean inputs, some can be DONT_CARE.
+    :return: the (value, mask) cube of qm.py.
+    """
+    return qm.str2cube(''.join('-' if e is DONT_CARE else ('1' if e else '0') for e in cube))
+
+
+def get_tuple_cube(bitmask_cube, n_inputs):
+    """
+    Inverse of get_bitmask_cube().
+    :param bitmask_cube: (value, mask) tuple of integers.
+    :param n_inputs: length of the tuple.
+    :return: tuple with booleans and DONT_CARE.
+    """
+    return tuple(DONT_CARE if c == '-' else c == '1' for c in qm.cube2str(bitmask_cube, n_inputs))
+
+
+def get_test_rows(cube, other_cubes=()):
+    """
+    Rows where a cube of a truth table is tested. Testing all the rows of a cube takes exponential time on its
+    unspecified inputs, while the minimizer works on whole cubes: a cube left out by the implementation fails on its
+    extreme rows. Rows shared with another output are contradictions, so the intersection with each cube of the other
+    outputs is tested as well: both outputs test the same rows there and one of them has to fail.
+    :param cube: tuple with inputs, some can be DONT_CARE.
+    :param other_cubes: (value, mask) cubes of the other outputs, see get_bitmask_cube().
+    :return: list with all the rows of the cube when it has up to MAX_EXPANDED_DONT_CARES unspecified inputs,
+    otherwise 4 of them: the unspecified inputs all True, all False and alternating both ways; followed by the rows of
+    its intersections with other_cubes.
+    """
+    positions = [i for i, e in enumerate(cube) if e is DONT_CARE]
+    if len(positions) <= MAX_EXPANDED_DONT_CARES:
+        return list(expand_cube(cube))
+
+    rows = []
+    for values in [(True, True), (False, False), (True, False), (False, True)]:
+        row = list(cube)
+        for i, position in enumerate(positions):
+            row[position] = values[i % 2]
+        rows.append(tuple(row))
+
+    bitmask_cube = get_bitmask_cube(cube)
+    for other_cube in other_cubes:
+        intersection = qm.cube_intersect(bitmask_cube, other_cube)
+        if intersection is not None:
+            rows += get_test_rows(get_tuple_cube(intersection, len(cube)))
+
+    return rows
+
+
 def has_code_args(tables):
     """
     Returns True if any argument in the tables is a Code obj.
@@ -80,7 +153,7 @@ def has_code_args(tables):
     :return: bool
     """
     for k, v_set in tables.items():
-        for a_tuple in v_set:
+        for a_tuple in get_cubes(v_set):
             for e in a_tuple:
                 if isinstance(e, Code):
                     return True
@@ -144,13 +217,19 @@ def test_implementation(test_class, solution):
         warnings.warn("Cannot test function, it has added code", UserWarning)
         return False
     else:
+        namespace = get_namespace(solution)
+        # outputs can be Code objects, so they are told apart by position.
+        bitmask_cubes = [[get_bitmask_cube(cube) for cube in get_cubes(v)] for v in tables.values()]
         try:
-            for expected_value, tuple_set in tables.items():
-                for a_tuple in tuple_set:
-                    run_single_test(test_class=test_class,
-                                    a_tuple=a_tuple,
-                                    solution=solution,
-                                    expected_value=expected_value)
+            for i, (expected_value, tuple_set) in enumerate(tables.items()):
+                other_cubes = [c for j, cubes in enumerate(bitmask_cubes) if j != i for c in cubes]
+                for cube in get_cubes(tuple_set):
+                    for a_tuple in get_test_rows(cube, other_cubes):
+                        run_single_test(test_class=test_class,
+                                        a_tuple=a_tuple,
+                                        solution=solution,
+                                        expected_value=expected_value,
+                                        namespace=namespace)
         except AssertionError:
             # catches exception and re-raises 2 different exceptions depending if the problem is solvable with
             # current machine learning implementation.
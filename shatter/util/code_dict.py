@@ -8,52 +8,54 @@ from shatter.code import Code
 
 __author__ = 'Juan Pablo Isaza'
 
+# marks the keys of Code objects on the store, so that they never collide with a tuple key.
+CODE_KEY = object()
+
+
+def get_store_key(key):
+    """
+    :param key: any key of a CodeDict.
+    :return: the content key for Code objects, see Code.get_key(), otherwise the key itself.
+    """
+    if isinstance(key, Code):
+        return CODE_KEY, key.get_key()
+    return key
+
 
 class CodeDict(MutableMapping):
     """If type Code Compares pieces by their content(code_str)
-    else behaves like an standard dict."""
+    else behaves like an standard dict.
+    Code keys are hashed by their content key, so every operation is O(1). Keeps the insertion order and the first key
+    inserted of equal Code keys."""
 
     def __init__(self, *args, **kwargs):
-        self.store = dict()
+        self.store = dict()  # store key -> (key, value)
         self.update(dict(*args, **kwargs))  # use the free update to set keys
 
     def __getitem__(self, key):
-
-        if isinstance(key, Code):
-
-            for k, v in self.store.items():
-                if isinstance(k, Code) and key == k:  # the == is override on Code class, see code.py for details.
-                    return self.store[k]
-            raise KeyError
-        else:
-            return self.store[key]
+        try:
+            return self.store[get_store_key(key)][1]
+        except KeyError:
+            raise KeyError(key)
 
     def __setitem__(self, key, value):
+        store_key = get_store_key(key)
+        if store_key in self.store:
+            key = self.store[store_key][0]
 
-        if isinstance(key, Code):
-            for k, v in self.store.items():
-                if isinstance(k, Code) and key == k:
-                    self.store[k] = value
-                    return
-
-        self.store[key] = value
+        self.store[store_key] = (key, value)
 
     def __delitem__(self, key):
-        del self.store[key]
+        try:
+            del self.store[get_store_key(key)]
+        except KeyError:
+            raise KeyError(key)
 
     def __iter__(self):
-        return iter(self.store)
+        return (key for key, _ in self.store.values())
 
     def __len__(self):
         return len(self.store)
 
     def __contains__(self, item):
-        if isinstance(item, Code):
-
-            for value in self.store:
-                if isinstance(value, Code) and item == value:
-                    return True
-            return False
-
-        else:
-            return item in self.store
+        return get_store_key(item) in self.store
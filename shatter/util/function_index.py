@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+"""Locates the functions of a source file with ast, parsing each file once."""
+
+import ast
+import os
+import re
+
+__author__ = 'juan pablo isaza'
+
+COMMENT_OR_BLANK = re.compile(r"^\s*(#.*)?$")
+INDENT = re.compile(r"^\s*")
+DEF = re.compile(r"^\s*(async\s+)?def\s")
+
+# path -> ((mtime, size), FunctionIndex), see get_index().
+indexes = dict()
+
+
+def get_indent(line):
+    return len(INDENT.match(line).group())
+
+
+class FunctionIndex:
+    """
+    Line spans of all the functions of a file, including methods and nested functions.
+    Lines start at zero: a span is (first, last), where first is the def line and last the last line of the body that
+    is not blank nor a comment.
+    """
+
+    def __init__(self, file_code):
+        """
+        :param file_code: list with the lines of the file. Must be valid python, otherwise SyntaxError is raised.
+        """
+        self.file_code = file_code
+        self.spans = dict()  # name -> list of spans, in file order.
+        self.ends = dict()  # first line -> last line.
+
+        spans = []
+        self.add_spans(ast.parse('\n'.join(file_code)).body, len(file_code), spans)
+        for first, last, name in sorted(spans):
+            self.spans.setdefault(name, []).append((first, last))
+            self.ends[first] = last
+
+    def add_spans(self, statements, end, spans):
+        """
+        Finds the function definitions among the statements and inside them.
+        :param statements: list with ast statements, all on the same block.
+        :param end: line where the block ends (exclusive).
+        :param spans: list, where (first, last, name) are added.
+        """
+        starts = [statement.lineno - 1 for statement in statements] + [end]
+        for statement, next_start in zip(statements, starts[1:]):
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                first = self.get_def_line(statement.lineno - 1)
+                spans.append((first, self.get_last_line(first, next_start), statement.name))
+
+            # blocks inside the statement, in source order: bodies of functions, classes, ifs, loops, etc. A block ends
+            # where the next one starts.
+            blocks = [getattr(statement, field, None) for field in ('body', 'handlers', 'orelse', 'finalbody')]
+            blocks = [block for block in blocks
+                      if isinstance(block, list) and block and isinstance(block[0], (ast.stmt, ast.excepthandler))]
+            block_ends = [block[0].lineno - 1 for block in blocks[1:]] + [next_start]
+            for block, block_end in zip(blocks, block_ends):
+                self.add_spans(block, block_end, spans)
+
+    def get_def_line(self, line):
+        """
+        :param line: first line of a function definition, can be a decorator.
+        :return: line with the def keyword.
+        """
+        while not DEF.match(self.file_code[line]):
+            line += 1
+        return line
+
+    def get_last_line(self, first, end):
+        """
+        :param first: def line of a function.
+        :param end: first line after the block containing the function (exclusive).
+        :return: last line of the function, skipping blanks, comments and lines of the enclosing block (eg: else:).
+        """
+        indent = get_indent(self.file_code[first])
+        last = end - 1
+        while last > first and (COMMENT_OR_BLANK.match(self.file_code[last])
+                                or get_indent(self.file_code[last]) <= indent):
+            last -= 1
+        return last
+
+    def get_first_line(self, name):
+        """
+        :param name: function name.
+        :return: def line of the first function with that name, -1 if not found.
+        """
+        spans = self.spans.get(name)
+        return spans[0][0] if spans else -1
+
+    def get_lines(self, first):
+        """
+        :param first: def line of a function.
+        :return: list with the lines of the function, from the def line to the end of its body. None if no function
+        starts at first.
+        """
+        last = self.ends.get(first)
+        if last is None:
+            return None
+        return self.file_code[first:last + 1]
+
+
+def get_file_key(path):
+    """
+    :param path: file path.
+    :return: tuple that changes when the file is modified.
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_index(path, file_code):
+    """
+    Gets the index of a file, built only when the file changed since the last call.
+    :param path: file path.
+    :param file_code: list with the current lines of the file, to build the index if needed.
+    :return: FunctionIndex or None if the file is not valid python.
+    """
+    path = os.path.abspath(path)
+    key = get_file_key(path)
+    cached = indexes.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    try:
+        index = FunctionIndex(file_code)
+    except SyntaxError:
+        index = None
+
+    indexes[path] = (key, index)
+    return index
+
+
+def invalidate(path):
+    """
+    Drops the index of a file, called when shatter rewrites it: a rewrite can keep its modification time and size.
+    :param path: file path.
+    """
+    indexes.pop(os.path.abspath(path), None)
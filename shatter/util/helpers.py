@@ -1,15 +1,23 @@
 #!/usr/bin/env python
 
 """Utility and General purpose functions."""
-import inspect
+import sys
+import threading
 import warnings
 import os
 import re
+import shutil
+import tempfile
+from contextlib import contextmanager
 
 import shatter.constants as cts
+from shatter.util import function_index
 
 __author__ = 'juan pablo isaza'
 
+# holds the depth of internal_mode() of each thread.
+internal_state = threading.local()
+
 
 def read_file(absolute_path):
     """
@@ -44,13 +52,23 @@ def write_file(filename, the_list):
 
 def rewrite_file(filename, the_list):
     """
-    Delete and write again
+    Writes the new information on a temporary file of the same directory, then replaces the file with it. The
+    replacement is atomic: readers get the old or the new file, never half of it.
     :param filename: relative path to file.
     :param the_list: new file information.
     :return: void
     """
-    delete_file(filename)
-    write_file(filename, the_list)
+    descriptor, temp_filename = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w') as temp_file:
+            temp_file.writelines('{}\n'.format(item) for item in the_list)
+        if os.path.exists(filename):
+            shutil.copymode(filename, temp_filename)
+        os.replace(temp_filename, filename)
+        function_index.invalidate(filename)
+    except BaseException:
+        delete_file(temp_filename)
+        raise
 
 
 def bit_in_string(string):
@@ -113,16 +131,26 @@ def valid_function(f):
     return True
 
 
-def get_function_line_number(f, file_code):
+def get_function_line_number(f, file_code, path=None):
     """
     Returns first line number for decorated and un-decorated methods. -1 if not found.
     :param f: function.
     :param file_code: the code as a list where each element is a line.
+    :param path: optional, the file of file_code. When given the function is found on the index of the file, see
+    function_index.get_index(), which is only built when the file changes.
     :return: the line of the file(starting in zero), 0 if not found!
     """
+    pattern = re.compile(cts.PARTICULAR_DEFINITION.pattern.format(name=f.__name__))
+
+    file_index = function_index.get_index(path, file_code) if path is not None else None
+    if file_index is not None:
+        line_number = file_index.get_first_line(f.__name__)
+        if line_number >= 0 and re.search(pattern, file_code[line_number]):
+            return line_number
+        return -1
+
     for index, line in enumerate(file_code):
 
-        pattern = re.compile(cts.PARTICULAR_DEFINITION.pattern.format(name=f.__name__))
         definition = re.search(pattern, line)
         if definition:
             return index
@@ -143,14 +171,22 @@ def get_function_inputs(f):
         return f.__code__.co_varnames
 
 
-def get_function_code(start, file_code):
+def get_function_code(start, file_code, path=None):
     """
     Gets the source code of function. Opt for not using
     inspect package because it doesn't work with decorators
     :param start: the starting line number, of the function
     :param file_code: the source file lines
+    :param path: optional, the file of file_code. When given the end of the function comes from the index of the
+    file, see function_index.get_index().
     :return: code.
     """
+    file_index = function_index.get_index(path, file_code) if path is not None else None
+    if file_index is not None:
+        lines = file_index.get_lines(start)
+        if lines is not None:
+            return file_code[start:start + len(lines)]
+
     def not_space_nor_comment(line):
         return len(line.strip()) > 0 and line.strip()[0] != '#'
 
@@ -283,25 +319,53 @@ def remove_list_from_list(all_list, list_to_remove):
     return [value for value in all_list if value not in list_to_remove]
 
 
+@contextmanager
+def internal_mode():
+    """
+    Everything called inside the with statement (or the decorated function) is a private call, see is_private_call().
+    Entered by the entry points of the package, so that their comparisons do not look at the stack.
+    """
+    depth = getattr(internal_state, 'depth', 0)
+    internal_state.depth = depth + 1
+    try:
+        yield
+    finally:
+        internal_state.depth = depth
+
+
+def is_package_frame(frame):
+    """
+    :param frame: a python frame.
+    :return: boolean, True if the frame runs code of a module of the package.
+    """
+    name = frame.f_globals.get('__name__') or ''
+    return name == cts.PACKAGE_NAME or name.startswith(cts.PACKAGE_NAME + '.')
+
+
 def is_private_call():
     """
-    Searches in the stack for places where the package is. If there is something then the
-    function is being called privately from inside the package, otherwise it is called from outside the package.
+    True inside internal_mode(). Otherwise searches in the stack for modules of the package. If there is something then
+    the function is being called privately from inside the package, otherwise it is called from outside the package.
     :return: boolean
     """
-    p_name = '/{}/'.format(cts.PACKAGE_NAME)
-    p = re.match(r'^.*' + p_name, inspect.stack()[0].filename).group()
+    if getattr(internal_state, 'depth', 0) > 0:
+        return True
 
-    # the number 2 in 'inspect.stack()[2:]' is because we are not looking inside is_private_call() function nor one
-    # level above it, where its suppose to tell us if that function is being called privately or publicly.
-    return any(re.match(p, frame.filename) is not None for frame in inspect.stack()[2:])
+    # starts 2 frames above: we are not looking inside is_private_call() function nor one level above it, where its
+    # suppose to tell us if that function is being called privately or publicly.
+    frame = sys._getframe(2)
+    while frame is not None:
+        if is_package_frame(frame):
+            return True
+        frame = frame.f_back
+    return False
 
 
 def name_in_frame(var, frame):
     """
     Looks at the locals of the frame and searches in it for var.
     :param var: variable to get name from.
-    :param frame: a inspect frame
+    :param frame: a python frame
     :return: list with strings.
     """
     callers_local_vars = frame.f_locals.items()
@@ -314,7 +378,13 @@ def retrieve_name(var):
     :param var: variable to get name from.
     :return: string
     """
-    for fi in reversed(inspect.stack()):
-        names = name_in_frame(var, fi.frame)
+    frames = []
+    frame = sys._getframe()
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+
+    for frame in reversed(frames):
+        names = name_in_frame(var, frame)
         if len(names) > 0:
             return names[0]
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+
+"""Columnar storage of the rows of a Rules object."""
+
+import array
+import bisect
+
+__author__ = 'juan pablo isaza'
+
+# array type codes by exact python type of the values. Other types are kept on a list.
+TYPE_CODES = {bool: 'b', int: 'q', float: 'd'}
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def get_type_code(value):
+    """
+    :param value: anything.
+    :return: array type code able to hold value and give it back with the same type, or None.
+    """
+    code = TYPE_CODES.get(type(value))
+    if code == 'q' and not INT64_MIN <= value <= INT64_MAX:
+        return None
+    return code
+
+
+class Column:
+    """
+    Values of a key, on a typed array while they all are of the same type (bool, int or float), otherwise on a list.
+    Bools take 1 byte, ints and floats 8 bytes, instead of a reference plus the object.
+    """
+
+    def __init__(self, values=()):
+        """
+        :param values: iterable, converted in one shot when all the values have the same type.
+        """
+        values = list(values)
+        types = set(map(type, values))
+        self.type_code = TYPE_CODES.get(types.pop()) if len(types) == 1 else None
+        if self.type_code == 'q' and not (INT64_MIN <= min(values) and max(values) <= INT64_MAX):
+            self.type_code = None
+
+        self.values = values if self.type_code is None else array.array(self.type_code, values)
+
+    def append(self, value):
+        if self.type_code is not None and get_type_code(value) == self.type_code:
+            self.values.append(value)
+        elif self.type_code is None and isinstance(self.values, list) and not self.values \
+                and get_type_code(value) is not None:
+            self.type_code = get_type_code(value)
+            self.values = array.array(self.type_code, [value])
+        else:
+            if self.type_code is not None:  # promotes to a list, that can hold anything.
+                self.values = list(self)
+                self.type_code = None
+            self.values.append(value)
+
+    def extend(self, values):
+        """
+        :param values: iterable, converted in one shot as in __init__().
+        """
+        other = Column(values)
+        if not self.values:
+            self.type_code = other.type_code
+            self.values = other.values
+        elif self.type_code is not None and other.type_code == self.type_code:
+            self.values.extend(other.values)
+        else:
+            if self.type_code is not None:  # promotes to a list, that can hold anything.
+                self.values = list(self)
+                self.type_code = None
+            self.values.extend(other)
+
+    def get_values(self, start, stop):
+        """
+        :param start: int, first index.
+        :param stop: int, index after the last one.
+        :return: iterable (that can be iterated many times) with the values between start and stop.
+        """
+        if start == 0 and stop == len(self.values):
+            return self
+
+        values = self.values[start:stop]
+        if self.type_code == 'b':
+            return list(map(bool, values))
+        return values
+
+    def __setitem__(self, index, value):
+        if self.type_code is not None and get_type_code(value) != self.type_code:
+            self.values = list(self)  # promotes to a list, that can hold anything.
+            self.type_code = None
+        self.values[index] = value
+
+    def __getitem__(self, index):
+        value = self.values[index]
+        if self.type_code == 'b':
+            return bool(value)
+        return value
+
+    def __iter__(self):
+        if self.type_code == 'b':
+            return map(bool, self.values)
+        return iter(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class Block:
+    """
+    Rows with the same keys, stored as one column per key.
+    """
+
+    def __init__(self, keys, columns=None, size=0):
+        """
+        :param keys: tuple with the keys of every row.
+        :param columns: list with a Column per key. If None, empty columns.
+        :param size: number of rows, needed when there are no keys.
+        """
+        self.keys = keys
+        self.columns = [Column() for _ in keys] if columns is None else columns
+        self.size = len(self.columns[0]) if self.columns else size
+
+    def append(self, values):
+        """
+        :param values: sequence with a value per key.
+        """
+        for column, value in zip(self.columns, values):
+            column.append(value)
+        self.size += 1
+
+    def extend(self, columns, size):
+        """
+        :param columns: list with a Column per key.
+        :param size: number of rows of the columns.
+        """
+        for column, values in zip(self.columns, columns):
+            column.extend(values)
+        self.size += size
+
+    def get_row(self, index):
+        """
+        :param index: int, position inside the block.
+        :return: dict
+        """
+        return dict(zip(self.keys, (column[index] for column in self.columns)))
+
+    def set_row(self, index, row):
+        """
+        :param index: int, position inside the block.
+        :param row: dict with the same keys as the block.
+        """
+        for column, value in zip(self.columns, row.values()):
+            column[index] = value
+
+    def get_rows(self, start, stop):
+        """
+        :param start: int, position of the first row inside the block.
+        :param stop: int, position after the last row.
+        :return: iterator over the rows (dicts) between start and stop.
+        """
+        if not self.keys:
+            return (dict() for _ in range(start, stop))
+        columns = [column.get_values(start, stop) for column in self.columns]
+        return (dict(zip(self.keys, values)) for values in zip(*columns))
+
+    def __iter__(self):
+        return self.get_rows(0, self.size)
+
+    def get_column(self, key):
+        """
+        :param key: one of keys.
+        :return: Column
+        """
+        return self.columns[self.keys.index(key)]
+
+
+class RuleStore:
+    """
+    Rows (dicts) of a Rules object, stored on a block per key schema: all the rows with the same keys share a block,
+    with one Column per key. A whole table (eg: a pandas DataFrame) is added in one shot, and rows are only built as
+    dicts when iterated. The order of the rows is kept as runs: consecutive rows on the same block, so rows with
+    alternating keys cost a run each (3 integers) instead of a block each.
+    """
+
+    def __init__(self):
+        self.blocks = []
+        self.schemas = dict()  # keys of a block: position of the block.
+        self.size = 0
+
+        # runs, one entry each on these arrays.
+        self.starts = array.array('q')  # index of the first row of the run.
+        self.run_blocks = array.array('q')  # position of the block of the run.
+        self.offsets = array.array('q')  # index of the first row of the run inside its block.
+
+    def append(self, row):
+        """
+        Adds a row, on the block with the same keys.
+        :param row: dict
+        """
+        position = self.get_block_position(tuple(row.keys()))
+        self.add_run(position, 1)
+        self.blocks[position].append(tuple(row.values()))
+
+    def add_columns(self, keys, columns):
+        """
+        Adds as many rows as the columns have values.
+        :param keys: sequence with the keys.
+        :param columns: list with a column (any iterable) per key, all with the same length.
+        """
+        columns = [Column(column) for column in columns]
+        size = len(columns[0]) if columns else 0
+        if size > 0:
+            position = self.get_block_position(tuple(keys))
+            self.add_run(position, size)
+            self.blocks[position].extend(columns, size)
+
+    def get_block_position(self, keys):
+        """
+        :param keys: tuple
+        :return: position of the block with these keys, a new one if there is none.
+        """
+        position = self.schemas.get(keys)
+        if position is None:
+            position = len(self.blocks)
+            self.schemas[keys] = position
+            self.blocks.append(Block(keys))
+        return position
+
+    def add_run(self, position, size):
+        """
+        Continues the last run when it is on the same block, otherwise starts a new one. Call before adding the rows
+        to the block.
+        :param position: position of the block of the new rows.
+        :param size: number of new rows.
+        """
+        if not self.run_blocks or self.run_blocks[-1] != position:
+            self.starts.append(self.size)
+            self.run_blocks.append(position)
+            self.offsets.append(self.blocks[position].size)
+        self.size += size
+
+    def get_runs(self):
+        """
+        :return: iterator over the runs in order, as tuples with the block, the position of the first row inside the
+        block and the position after the last one.
+        """
+        for run, start in enumerate(self.starts):
+            stop = self.starts[run + 1] if run + 1 < len(self.starts) else self.size
+            offset = self.offsets[run]
+            yield self.blocks[self.run_blocks[run]], offset, offset + stop - start
+
+    def locate(self, index):
+        """
+        :param index: int, can be negative.
+        :return: tuple with the position of the block of the row and the index of the row inside the block.
+        """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('rule index out of range')
+
+        run = bisect.bisect_right(self.starts, index) - 1
+        return self.run_blocks[run], self.offsets[run] + index - self.starts[run]
+
+    def get_row(self, index):
+        """
+        :param index: int, can be negative.
+        :return: dict
+        """
+        position, index = self.locate(index)
+        return self.blocks[position].get_row(index)
+
+    def set_row(self, index, row):
+        """
+        Replaces a row in place, only when it has the same keys as the row it replaces.
+        :param index: int, can be negative.
+        :param row: dict
+        :return: True if replaced, False if the keys are different.
+        """
+        position, index = self.locate(index)
+        block = self.blocks[position]
+        if block.keys != tuple(row.keys()):
+            return False
+
+        block.set_row(index, row)
+        return True
+
+    def __iter__(self):
+        for block, start, stop in self.get_runs():
+            yield from block.get_rows(start, stop)
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+"""Persistent store of solved implementations, with least recently used eviction."""
+
+import contextlib
+import json
+import os
+import sqlite3
+
+__author__ = 'juan pablo isaza'
+
+# Default maximum size of the stored implementations, in bytes.
+MAX_BYTES = 64 * 1024 * 1024
+
+# Part of every key, increase it when a change on the solver gives different implementations for the same rules.
+CACHE_VERSION = 1
+
+# Environment variable with the path of the cache used when solve() gets no cache.
+CACHE_PATH_ENV = 'SHATTER_CACHE'
+
+
+@contextlib.contextmanager
+def transaction(connection):
+    """
+    A sqlite connection on a with statement commits (or rolls back) but stays open, this also closes it.
+    :param connection: sqlite3.Connection.
+    """
+    with contextlib.closing(connection):
+        with connection:
+            yield connection
+
+
+class SolutionCache:
+    """
+    Maps a content hash (see solver.get_cache_key) to the implementation found for it. Stored on a sqlite file, so
+    it is shared by processes and survives between runs. When the implementations take more than max_bytes, the least
+    recently used ones are evicted.
+    """
+
+    def __init__(self, path, max_bytes=MAX_BYTES):
+        """
+        :param path: sqlite file, created if it does not exist.
+        :param max_bytes: maximum size of the stored implementations.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+
+        with self.connect() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS solutions '
+                               '(key TEXT PRIMARY KEY, implementation TEXT, size INTEGER, last_used INTEGER)')
+
+    def connect(self):
+        """
+        :return: a new connection, to be used on a with statement: changes are committed and the connection is closed.
+        """
+        return transaction(sqlite3.connect(self.path, timeout=30))
+
+    def get(self, key):
+        """
+        :param key: string.
+        :return: the implementation (list of lines of code) or None if key is not stored.
+        """
+        with self.connect() as connection:
+            row = connection.execute('SELECT implementation FROM solutions WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+
+            connection.execute('UPDATE solutions SET last_used = '
+                               '(SELECT COALESCE(MAX(last_used), 0) + 1 FROM solutions) WHERE key = ?', (key,))
+            return json.loads(row[0])
+
+    def put(self, key, implementation):
+        """
+        Stores an implementation, then evicts the least recently used ones if there is no space left.
+        :param key: string.
+        :param implementation: list of lines of code.
+        """
+        value = json.dumps(implementation)
+        with self.connect() as connection:
+            connection.execute('INSERT OR REPLACE INTO solutions VALUES '
+                               '(?, ?, ?, (SELECT COALESCE(MAX(last_used), 0) + 1 FROM solutions))',
+                               (key, value, len(value)))
+
+            total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM solutions').fetchone()[0]
+            if total > self.max_bytes:
+                rows = connection.execute('SELECT key, size FROM solutions ORDER BY last_used').fetchall()
+                for old_key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    connection.execute('DELETE FROM solutions WHERE key = ?', (old_key,))
+                    total -= size
+
+    def __len__(self):
+        with self.connect() as connection:
+            return connection.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+
+def get_cache(cache):
+    """
+    :param cache: a SolutionCache, a path for one or None. When None uses the path on the SHATTER_CACHE environment
+    variable, if defined.
+    :return: SolutionCache or None when there is no cache.
+    """
+    if cache is None:
+        cache = os.environ.get(CACHE_PATH_ENV)
+
+    if cache is None or isinstance(cache, SolutionCache):
+        return cache
+
+    return SolutionCache(cache)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+"""Wall time, peak memory and size counters of a solve, attached to the Solution."""
+
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+__author__ = 'juan pablo isaza'
+
+# Phases of a solve, in the order they run.
+RULES_PHASE = 'rules'
+MINIMIZATION_PHASE = 'minimization'
+CODE_GENERATION_PHASE = 'code_generation'
+TESTING_PHASE = 'testing'
+ML_CORRECTION_PHASE = 'ml_correction'
+FILE_REWRITE_PHASE = 'file_rewrite'
+PHASES = [RULES_PHASE, MINIMIZATION_PHASE, CODE_GENERATION_PHASE, TESTING_PHASE, ML_CORRECTION_PHASE,
+          FILE_REWRITE_PHASE]
+
+# Size counters.
+ROWS = 'rows'                  # rows on the truth tables.
+OUTPUTS = 'outputs'            # different outputs.
+INPUTS = 'inputs'              # maximum number of inputs of an output.
+IMPLICANTS = 'implicants'      # prime implicants found by Quine McCluskey.
+COMPARISONS = 'comparisons'    # term comparisons made by Quine McCluskey.
+TERMS = 'terms'                # products on the generated code.
+CACHE_HITS = 'cache_hits'      # 1 if the implementation came from the solution cache.
+UNCHANGED = 'unchanged'        # 1 if the written function has the same fingerprint, so it was kept.
+COUNTERS = [ROWS, OUTPUTS, INPUTS, IMPLICANTS, COMPARISONS, TERMS, CACHE_HITS, UNCHANGED]
+
+# Set to True to measure the peak memory of each phase on every solve, tracing memory slows the solve down.
+TRACE_MEMORY = False
+
+
+class Stats:
+    """
+    Time spent on each phase and sizes of a solve.
+    peak_memory has the most memory (bytes) allocated at once by each phase, None when it was not measured. It is
+    measured when trace_memory is True (see TRACE_MEMORY): tracemalloc traces each phase, from its start to its end.
+    When the caller is already tracing (eg: PYTHONTRACEMALLOC=1 or tracemalloc.start()) its traces are kept, nothing
+    is started, stopped nor cleared: as the peak cannot be reset before python 3.9, the peak of a phase is then only
+    known when the phase raises the peak of the process, otherwise it is not recorded.
+    A phase can run several times (eg: minimization once per output), times are added and peaks are the maximum.
+    """
+
+    def __init__(self, trace_memory=None):
+        """
+        :param trace_memory: whether to measure the peak memory of the phases, if None TRACE_MEMORY.
+        """
+        self.times = OrderedDict((phase, 0.0) for phase in PHASES)
+        self.peak_memory = OrderedDict((phase, None) for phase in PHASES)
+        self.counters = OrderedDict((counter, 0) for counter in COUNTERS)
+        self.trace_memory = TRACE_MEMORY if trace_memory is None else trace_memory
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Measures the code inside the with statement, see the class docstring for the peak memory.
+        :param name: one of PHASES.
+        """
+        caller_tracing = tracemalloc.is_tracing()
+        tracing = self.trace_memory or caller_tracing
+        if tracing and not caller_tracing:
+            tracemalloc.start()
+        if tracing:
+            start_memory, start_peak = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] += time.perf_counter() - start
+            if tracing and tracemalloc.is_tracing():
+                memory, peak = tracemalloc.get_traced_memory()
+                if not caller_tracing:
+                    tracemalloc.stop()
+                if peak > start_peak or not caller_tracing:
+                    self.peak_memory[name] = max(self.peak_memory[name] or 0, peak - start_memory)
+
+    def add(self, counter, value=1):
+        """
+        :param counter: one of COUNTERS.
+        :param value: int to add.
+        """
+        self.counters[counter] += value
+
+    def set_max(self, counter, value):
+        """
+        :param counter: one of COUNTERS.
+        :param value: int, kept if bigger than the current one.
+        """
+        self.counters[counter] = max(self.counters[counter], value)
+
+    @property
+    def total_time(self):
+        return sum(self.times.values())
+
+    def as_dict(self):
+        """
+        :return: flat dict, eg: to write a row per solved function on a csv file.
+        """
+        result = OrderedDict()
+        for phase in PHASES:
+            result[phase + '_time'] = self.times[phase]
+            result[phase + '_peak_memory'] = self.peak_memory[phase]
+        result.update(self.counters)
+        return result
+
+    def __str__(self):
+        lines = []
+        for phase in PHASES:
+            memory = self.peak_memory[phase]
+            memory = '' if memory is None else ' {} KiB'.format(memory // 1024)
+            lines.append('{}: {:.4f} s{}'.format(phase, self.times[phase], memory))
+        lines.append(', '.join('{}: {}'.format(k, v) for k, v in self.counters.items()))
+        return '\n'.join(lines)
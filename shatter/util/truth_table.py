@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+"""Defines a truth table whose rows can leave inputs unspecified, expanded only when iterated."""
+
+import itertools
+
+__author__ = 'juan pablo isaza'
+
+
+class DontCare:
+    """
+    Type of DONT_CARE, an input not specified by a rule: the row holds when the input is True and when it is False.
+    """
+
+    def __repr__(self):
+        return '-'
+
+    def __reduce__(self):
+        return 'DONT_CARE'  # pickles as the module singleton, so that identity checks hold.
+
+
+DONT_CARE = DontCare()
+
+
+def expand_cube(cube):
+    """
+    Rows of a cube, in the order Rules used to generate them: the first unspecified input changes faster, and True
+    comes before False.
+    :param cube: tuple with inputs, some can be DONT_CARE.
+    :return: iterator over tuples without DONT_CARE.
+    """
+    positions = [i for i, e in enumerate(cube) if e is DONT_CARE]
+    if not positions:
+        yield cube
+        return
+
+    row = list(cube)
+    for values in itertools.product((True, False), repeat=len(positions)):
+        for position, value in zip(reversed(positions), values):
+            row[position] = value
+        yield tuple(row)
+
+
+def get_cubes(table):
+    """
+    :param table: TruthTable or list with rows.
+    :return: the rows without expanding them, ie rows can have DONT_CARE.
+    """
+    if isinstance(table, TruthTable):
+        return table.cubes
+    return table
+
+
+class TruthTable:
+    """
+    Rows of a truth table stored as cubes: tuples where the inputs not specified are DONT_CARE. A rule that names 2 of
+    20 inputs is a single cube instead of 2^18 rows.
+    Iterating gives the expanded rows, so it can be used as the list of tuples it replaces. Consumers that can handle
+    DONT_CARE should use the cubes attribute instead.
+    """
+
+    def __init__(self, cubes=()):
+        """
+        :param cubes: iterable with tuples.
+        """
+        self.cubes = [tuple(cube) for cube in cubes]
+
+    def append(self, cube):
+        self.cubes.append(tuple(cube))
+
+    def extend(self, rows):
+        """
+        :param rows: TruthTable or iterable with tuples.
+        """
+        self.cubes.extend([tuple(cube) for cube in get_cubes(rows)])  # a list, rows can be self.
+
+    def __iadd__(self, rows):
+        self.extend(rows)
+        return self
+
+    def __add__(self, rows):
+        table = TruthTable(self.cubes)
+        table.extend(rows)
+        return table
+
+    def __iter__(self):
+        for cube in self.cubes:
+            yield from expand_cube(cube)
+
+    def __len__(self):
+        """
+        :return: number of expanded rows, without expanding them.
+        """
+        return sum(2 ** sum(1 for e in cube if e is DONT_CARE) for cube in self.cubes)
+
+    def __bool__(self):
+        return len(self.cubes) > 0
+
+    def __eq__(self, other):
+        if isinstance(other, (TruthTable, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, self.cubes)
@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+
+"""Functions for package_solver.py tests"""
+
+from shatter import solver as s
+
+__author__ = 'juan pablo isaza'
+
+
+# Mock functions
+@s.solve(rules=s.Rules(a=True, b=True))
+def all_and(a, b):
+    pass
+
+
+@s.solve(rules=lambda: s.Rules(a=True, b=False))
+def all_and_not(a, b):
+    pass
+
+
+@s.solve()
+def without_rules(a, b):
+    pass
@@ -55,3 +55,43 @@ def and_missing_decorator(a, b):
 @s.solve()
 def identity(a):
     pass
+
+
+@s.solve()
+def dont_care_function(a, b, c):
+    pass
+
+
+@s.solve()
+def multi_output_function(a, b, c):
+    pass
+
+
+@s.solve()
+def cached_function(a, b):
+    pass
+
+
+@s.solve()
+def stats_function(a, b, c):
+    pass
+
+
+@s.solve()
+def batch_function1(a, b):
+    pass
+
+
+@s.solve()
+def batch_function2(a, b):
+    pass
+
+
+@s.solve(in_memory=True)
+def in_memory_function(a, b):
+    pass
+
+
+@s.solve()
+def fingerprint_function(a, b):
+    pass
@@ -2,9 +2,13 @@
 
 """Test for code.py"""
 
+import tracemalloc
 import unittest
 
 from shatter.code import Code
+from shatter.comparison import Comparison
+from shatter.custom_operator import CustomOperator
+from shatter.output import Output
 from tests.generated_code import code_functions as f
 from shatter.rules import Rules
 from tests.testing_helpers import common_testing_code
@@ -138,6 +142,78 @@ class CodeTest(unittest.TestCase):
         self.assertTrue(isinstance(code_object, Code))
         self.assertEqual(str(code_object), 'v == w')
 
+    def test_explicit_name(self):
+        """
+        A variable named on creation prints its name, regardless of the name it has on the stack.
+        """
+        v = Code(name='speed')
+        self.assertEqual(str(v > 3), 'speed > 3')
+
+    def test_name_is_cached(self):
+        """
+        The name is searched on the stack the first time the variable is printed, then kept.
+        """
+        v = Code()
+        self.assertEqual(str(v), 'v')
+
+        w = v
+        del v
+        self.assertEqual(str(w), 'v')
+
+    def test_no_instance_dict(self):
+        """
+        Objects created once per variable or comparison use __slots__ instead of a __dict__.
+        """
+        objects = [Code(), Code(code_str='a'), CustomOperator(Code.__lt__), Comparison('a', 1, '<='),
+                   Output(lambda a: a, {'a': 1})]
+        for obj in objects:
+            self.assertFalse(hasattr(obj, '__dict__'), type(obj).__name__)
+
+    def test_memory(self):
+        """
+        An equation with its operator takes less than 260 bytes, measured about 240 bytes on Python 3.6 and about 350
+        bytes with a __dict__.
+        """
+        namespace = {k: v for k, v in vars(Code).items() if k != '__slots__' and k not in Code.__slots__}
+        unslotted_code = type('UnslottedCode', (), namespace)
+
+        def get_memory(cls, n=10000):
+            tracemalloc.start()
+            try:
+                start = tracemalloc.get_traced_memory()[0]
+                equations = [cls(i, i, Code.__lt__) for i in range(n)]
+                memory = tracemalloc.get_traced_memory()[0] - start
+            finally:
+                tracemalloc.stop()
+
+            self.assertEqual(len(equations), n)
+            return memory
+
+        self.assertTrue(hasattr(unslotted_code(1, 1, Code.__lt__), '__dict__'))
+        n = 10000
+        memory = get_memory(Code, n)
+        self.assertLess(memory / n, 260)
+        self.assertLess(memory, get_memory(unslotted_code, n) * 0.8)
+
+    def test_hash(self):
+        """
+        Codes are hashed by content, consistently with private comparisons.
+        """
+        a, b = Code(), Code()
+        equation = Code(a, 1, Code.__lt__)
+        same = Code(a, 1, Code.__lt__)
+
+        self.assertEqual(hash(equation), hash(same))
+        self.assertEqual(hash(Code(code_str='x > 1')), hash(Code(code_str='x > 1')))
+        self.assertNotEqual(hash(a), hash(b))
+        self.assertEqual(equation._equals(same), hash(equation) == hash(same))
+
+        # not implemented cases, also as operands, are hashed by identity.
+        odd = Code(rho=a)
+        self.assertEqual(hash(odd), hash(odd))
+        self.assertNotEqual(hash(odd), hash(Code(rho=a)))
+        self.assertEqual(len({Code(odd, 1, Code.__lt__), Code(odd, 1, Code.__lt__)}), 2)
+
     def test_factoring_with_code_var(self):
         """This is a hard test from test_code_generator.py, but additionally here it is added Code instances :)"""
         function = f.factor_code_with_code
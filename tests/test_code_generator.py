@@ -529,6 +529,29 @@ class GeneratorTest(unittest.TestCase):
         self.assertEqual(solution.implementation[2], '    if {}:'.format(input1))
         self.assertEqual(solution.implementation[5], '    if {}:'.format(input2))
 
+    def test_get_literals(self):
+        self.assertTupleEqual(c.get_literals(['a', 'b', 'c'], '1-0'), ('a', 'not c'))
+        self.assertTupleEqual(c.get_literals(['a', 'b'], '--'), ())
+
+    def test_shared_products(self):
+        """
+        Shared prefixes are found and assigned to variables, the longer ones reuse the shorter ones.
+        """
+        products = [('a', 'b', 'c'), ('a', 'b', 'c', 'd'), ('a', 'b', 'not d'), ('e',)]
+        shared = c.get_shared_products(products)
+        self.assertListEqual(shared, [('a', 'b'), ('a', 'b', 'c')])
+
+        code, shared_names = c.get_shared_code(shared, 'def f(a, b, c, d, e):')
+        self.assertListEqual(code, ['    _shared_0 = a and b', '    _shared_1 = _shared_0 and c'])
+        self.assertEqual(c.print_products(products, shared_names),
+                         '_shared_1 or _shared_1 and d or _shared_0 and not d or e')
+
+        # assignments are done once, before their first use.
+        assigned = set()
+        self.assertListEqual(c.get_pending_shared_code([('e',)], shared, code, assigned), [])
+        self.assertListEqual(c.get_pending_shared_code([('a', 'b', 'c', 'd')], shared, code, assigned), code)
+        self.assertListEqual(c.get_pending_shared_code([('a', 'b', 'not d')], shared, code, assigned), [])
+
 
 if __name__ == '__main__':
     unittest.main()
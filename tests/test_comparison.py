@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+
+"""Test for comparison.py"""
+
+import unittest
+
+from shatter.comparison import Comparison
+
+__author__ = 'juan pablo isaza'
+
+
+class ComparisonTest(unittest.TestCase):
+
+    def test_identity(self):
+        """
+        Comparisons are DataFrame column keys: they are equal and hashed by identity.
+        """
+        low = Comparison('x', 1.5, '>=')
+        same = Comparison('x', 1.5, '>=')
+
+        self.assertEqual(low, low)
+        self.assertNotEqual(low, same)
+        self.assertEqual(len({low, same}), 2)
+
+    def test_simplify(self):
+        """
+        simplify() turns an interval of a single number into an equality, in place.
+        """
+        interval = Comparison(Comparison('x', 3.25, '>='), Comparison('x', 3.25, '<='), 'and')
+        interval.simplify()
+        self.assertEqual(str(interval), 'x == 3.25')
+
+        other = Comparison(Comparison('x', 1.5, '>='), Comparison('x', 3.25, '<='), 'and')
+        other.simplify()
+        self.assertEqual(str(other), '(x >= 1.5 and x <= 3.25)')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+"""Test for espresso.py"""
+
+import random
+import unittest
+
+from shatter import espresso, qm, QM_helper
+
+__author__ = 'juan pablo isaza'
+
+
+def get_minterms(cover, n_bits):
+    """
+    :param cover: list of cubes
+    :param n_bits: number of inputs.
+    :return: set with all the minterms covered.
+    """
+    minterms = set()
+    for cube in cover:
+        minterms |= set(qm.cube_minterms(cube, n_bits))
+    return minterms
+
+
+class EspressoTest(unittest.TestCase):
+
+    def test_supercube(self):
+        self.assertEqual(espresso.supercube([0b100, 0b110], 3), qm.str2cube('1-0'))
+        self.assertEqual(espresso.supercube([0b101], 3), qm.str2cube('101'))
+
+    def test_cover_is_exact(self):
+        """The cover has all the ones and nothing else."""
+        for seed in range(100):
+            rand = random.Random(seed)
+            n_bits = 1 + seed % 8
+            ones = list({rand.randrange(2 ** n_bits) for _ in range(rand.randint(1, 2 ** n_bits))})
+            cover = espresso.espresso(ones, n_bits)
+            self.assertSetEqual(get_minterms(cover, n_bits), set(ones))
+
+    def test_sum_of_products(self):
+        """A function made of a few products is found back, on 20 inputs."""
+        n_bits = 20
+        terms = ['1-01-0' + '-' * 10 + '01-1', '-' * 8 + '0110-110' + '-' * 4, '01' + '-' * 12 + '001101']
+        products = [qm.str2cube(t) for t in terms]
+        ones = [m for p in products for m in qm.cube_minterms(p, n_bits)]
+
+        cover = espresso.espresso(ones, n_bits)
+        self.assertSetEqual(set(cover), set(products))
+
+    def test_off_set(self):
+        """With an explicit off-set the rest of the inputs are don't cares."""
+        cover = espresso.espresso_los(['110', '111'], off=['000', '011'])
+        self.assertListEqual(list(cover), ['1--'])
+
+    def test_cubes(self):
+        """An on-set given as cubes gives a cover of exactly the same minterms, without expanding them."""
+        for seed in range(50):
+            rand = random.Random(seed)
+            n_bits = 2 + seed % 6
+            cubes = []
+            for _ in range(rand.randint(1, 6)):
+                mask = rand.randrange(2 ** n_bits)
+                cubes.append((rand.randrange(2 ** n_bits) & mask, mask))
+
+            cover = espresso.espresso_cubes(cubes, n_bits)
+            self.assertSetEqual(get_minterms(cover, n_bits), get_minterms(cubes, n_bits))
+            self.assertLessEqual(len(cover), len(set(cubes)))
+
+        n_bits = 40
+        cover = espresso.espresso_los(['1' + '-' * 39, '0' + '-' * 38 + '1'], off=['0' * 40])
+        self.assertSetEqual(set(cover), {'1' + '-' * 39, '-' * 39 + '1'})
+
+        cover = espresso.espresso_cubes([qm.str2cube('1' + '-' * 39), qm.str2cube('0' + '-' * 38 + '1')], n_bits)
+        self.assertSetEqual(set(cover), {qm.str2cube('1' + '-' * 39), qm.str2cube('-' * 39 + '1')})
+
+    def test_espresso_los(self):
+        self.assertListEqual(list(espresso.espresso_los(['11', '10', '01'])), ['1-', '-1'])
+        self.assertIsNone(espresso.espresso_los([]))
+        self.assertIsNone(espresso.espresso_los(['1', '10']))
+
+    def test_boolean_path_selects_espresso(self):
+        """Above max_exact_inputs QM_helper uses espresso, the result is the same on easy functions."""
+        ones = ['1100', '1101', '1110', '1111', '0011']
+        exact = QM_helper.execute_qm_algorithm(ones)
+        heuristic = QM_helper.execute_qm_algorithm(ones, max_exact_inputs=2)
+        self.assertListEqual(list(heuristic), list(exact))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+"""Test for package_solver.py"""
+
+import os
+import unittest
+
+from shatter import package_solver as ps
+from shatter.util import helpers as h
+from shatter.util import stats as st
+from tests.generated_code import package_solver_functions as f
+from tests.testing_helpers import common_testing_code
+
+__author__ = 'juan pablo isaza'
+
+
+class PackageSolverTest(unittest.TestCase):
+
+    def setUp(self):
+        common_testing_code.reset_functions_file(f.__file__, hard_reset=True)
+
+    def test_module_names(self):
+        self.assertEqual(ps.get_module_name(f.__file__), f.__name__)
+        self.assertEqual(ps.get_module_names(os.path.dirname(f.__file__))[0], 'tests.generated_code')
+        self.assertIn(f.__name__, ps.get_module_names('tests.generated_code'))
+        self.assertListEqual(ps.get_solvable_functions(f.__name__), ['all_and', 'all_and_not'])
+
+    def test_solve_all(self):
+        """
+        Functions with rules are solved on other processes, their file is written once with all of them.
+        """
+        report = ps.solve_all([f.__file__, f.__name__], workers=2)
+
+        self.assertListEqual(list(report), [f.__name__ + '.all_and', f.__name__ + '.all_and_not'])
+        for stats in report.values():
+            self.assertGreater(stats.times[st.MINIMIZATION_PHASE], 0)
+            self.assertGreater(stats.times[st.FILE_REWRITE_PHASE], 0)
+
+        file_code = h.read_file(f.__file__)
+        self.assertIn('    return a and b', file_code)
+        self.assertIn('    return a and not b', file_code)
+        self.assertEqual(file_code[file_code.index('def without_rules(a, b):') + 1], '    pass')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+
+"""Test for qm.py"""
+
+import random
+import unittest
+
+import numpy as np
+
+from shatter import qm
+
+__author__ = 'juan pablo isaza'
+
+
+def random_ones(n_bits, seed):
+    """
+    Random set of minterms encoded as strings.
+    :param n_bits: number of bits of each minterm.
+    :param seed: random seed, makes the test reproducible.
+    :return: list with strings.
+    """
+    rand = random.Random(seed)
+    size = rand.randint(1, 2 ** n_bits)
+    return list({format(rand.randrange(2 ** n_bits), '0{}b'.format(n_bits)) for _ in range(size)})
+
+
+class QMTest(unittest.TestCase):
+
+    def test_cube_conversion(self):
+        """str2cube and cube2str are inverses."""
+        self.assertEqual(qm.str2cube('1-0'), (0b100, 0b101))
+        for term in ['0', '1', '-', '10-1', '----', '0110']:
+            self.assertEqual(qm.cube2str(qm.str2cube(term), len(term)), term)
+
+    def test_cube_contains(self):
+        self.assertTrue(qm.cube_contains(qm.str2cube('1--'), qm.str2cube('1-0')))
+        self.assertTrue(qm.cube_contains(qm.str2cube('1-0'), qm.str2cube('110')))
+        self.assertFalse(qm.cube_contains(qm.str2cube('1-0'), qm.str2cube('1--')))
+        self.assertFalse(qm.cube_contains(qm.str2cube('0--'), qm.str2cube('1-0')))
+
+    def test_cube_minterms(self):
+        self.assertSetEqual(set(qm.cube_minterms(qm.str2cube('1-0'), 3)), {0b100, 0b110})
+        self.assertEqual(len(list(qm.cube_minterms(qm.str2cube('----'), 4))), 16)
+
+    def test_cube_sharp(self):
+        """The sharp gives disjoint cubes with exactly the minterms of a not in b."""
+        for a, b in [('1--', '1-0'), ('----', '01-1'), ('10-', '0--'), ('1-0', '---')]:
+            cubes = qm.cube_sharp(qm.str2cube(a), qm.str2cube(b))
+            minterms = [m for c in cubes for m in qm.cube_minterms(c, len(a))]
+            expected = set(qm.cube_minterms(qm.str2cube(a), len(a))) - set(qm.cube_minterms(qm.str2cube(b), len(a)))
+            self.assertEqual(len(minterms), len(set(minterms)))
+            self.assertSetEqual(set(minterms), expected)
+
+    def test_cube_covered(self):
+        cubes = [qm.str2cube(t) for t in ['0--', '11-', '1-0']]
+        self.assertTrue(qm.cube_covered(qm.str2cube('-1-'), cubes))
+        self.assertFalse(qm.cube_covered(qm.str2cube('--1'), cubes))
+        self.assertFalse(qm.cube_covered(qm.str2cube('1--'), []))
+
+    def test_wide_dont_care_terms(self):
+        """Terms with many dashes are filtered without expanding their minterms."""
+        n_bits = 64
+        ones = ['1' + '0' * (n_bits - 1), '1' + '0' * (n_bits - 2) + '1']
+        self.assertListEqual(list(qm.QuineMcCluskey(exact=False).simplify_los(ones)), ['1' + '0' * (n_bits - 2) + '-'])
+
+        m = qm.QuineMcCluskey()
+        m.n_bits = n_bits
+        terms = ['-' * (n_bits - 1) + '1', '-' * (n_bits - 1) + '0', '11' + '-' * (n_bits - 2)]
+        self.assertSetEqual(set(m._QuineMcCluskey__get_essential_implicants(terms)), set(terms[:2]))
+
+    def test_dont_cares(self):
+        """Don't cares give bigger terms, but only the ones have to be covered."""
+        for engine in qm.ENGINES:
+            m = qm.QuineMcCluskey(engine=engine)
+            self.assertListEqual(list(m.simplify_los(['001', '011'], dc=['101', '111', '110'])), ['--1'])
+            self.assertListEqual(list(m.simplify_los(['001', '011'])), ['0-1'])
+            self.assertListEqual(list(m.simplify([1, 3], dc=[5, 7])), ['--1'])
+
+        for seed in range(50):
+            n_bits = 1 + seed % 6
+            terms = random_ones(n_bits=n_bits, seed=seed)
+            ones, dc = terms[::2], terms[1::2]
+            expected = list(qm.QuineMcCluskey(engine=qm.STRING_ENGINE).simplify_los(ones, dc))
+            for engine in [qm.BITMASK_ENGINE, qm.NUMPY_ENGINE]:
+                self.assertListEqual(list(qm.QuineMcCluskey(engine=engine).simplify_los(ones, dc)), expected)
+
+            covered = set()
+            for term in expected:
+                covered |= set(qm.cube_minterms(qm.str2cube(term), n_bits))
+            self.assertTrue(covered >= set(int(o, 2) for o in ones))
+            self.assertTrue(covered <= set(int(t, 2) for t in terms))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            qm.QuineMcCluskey(engine='unknown')
+
+        with self.assertRaises(ValueError):
+            qm.QuineMcCluskey(use_xor=True, engine=qm.BITMASK_ENGINE)
+
+        with self.assertRaises(ValueError):
+            qm.QuineMcCluskey(engine=qm.STRING_ENGINE, workers=2)
+
+    def test_engines_match_string_engine(self):
+        """All representations should give exactly the same terms in the same order."""
+        for seed in range(100):
+            ones = random_ones(n_bits=1 + seed % 7, seed=seed)
+            expected = list(qm.QuineMcCluskey(engine=qm.STRING_ENGINE).simplify_los(ones))
+            for engine in [qm.BITMASK_ENGINE, qm.NUMPY_ENGINE]:
+                result = list(qm.QuineMcCluskey(engine=engine).simplify_los(ones))
+                self.assertListEqual(result, expected)
+
+    def test_merge_groups(self):
+        n_bits = 3
+        group = [qm.pack_cube(qm.str2cube(t), n_bits) for t in ['000', '0-0']]
+        group_next = [qm.pack_cube(qm.str2cube(t), n_bits) for t in ['100', '001', '1-0']]
+        merged, used, n_cmp = qm.merge_groups(group, group_next, n_bits)
+        self.assertListEqual([qm.cube2str(qm.unpack_cube(t, n_bits), n_bits) for t in merged], ['-00', '00-', '--0'])
+        self.assertEqual(len(set(used)), 5)
+        self.assertEqual(n_cmp, 5)
+
+    def test_workers(self):
+        """Merge rounds on a process pool give the same result."""
+        min_parallel_terms = qm.MIN_PARALLEL_TERMS
+        qm.MIN_PARALLEL_TERMS = 0
+        try:
+            for seed in range(5):
+                ones = random_ones(n_bits=6, seed=seed)
+                expected = list(qm.QuineMcCluskey(engine=qm.BITMASK_ENGINE).simplify_los(ones))
+                result = list(qm.QuineMcCluskey(engine=qm.BITMASK_ENGINE, workers=2).simplify_los(ones))
+                self.assertListEqual(result, expected)
+        finally:
+            qm.MIN_PARALLEL_TERMS = min_parallel_terms
+
+    def test_workers_shut_down(self):
+        """The process pool is shut down when a merge round raises."""
+        shutdowns = []
+
+        class RecordingExecutor(qm.ProcessPoolExecutor):
+            def shutdown(self, wait=True):
+                shutdowns.append(wait)
+                super(RecordingExecutor, self).shutdown(wait)
+
+        def failing_merge(*args):
+            raise RuntimeError('merge failed')
+
+        min_parallel_terms, executor = qm.MIN_PARALLEL_TERMS, qm.ProcessPoolExecutor
+        merge = qm.QuineMcCluskey._QuineMcCluskey__merge_in_pool
+        qm.MIN_PARALLEL_TERMS, qm.ProcessPoolExecutor = 0, RecordingExecutor
+        qm.QuineMcCluskey._QuineMcCluskey__merge_in_pool = failing_merge
+        try:
+            with self.assertRaises(RuntimeError):
+                qm.QuineMcCluskey(engine=qm.BITMASK_ENGINE, workers=2).simplify_los(random_ones(n_bits=4, seed=0))
+        finally:
+            qm.MIN_PARALLEL_TERMS, qm.ProcessPoolExecutor = min_parallel_terms, executor
+            qm.QuineMcCluskey._QuineMcCluskey__merge_in_pool = merge
+
+        self.assertEqual(len(shutdowns), 1)
+
+    def test_numpy_engine_wide_inputs(self):
+        """Cubes wider than 32 bits use 16 byte keys, wider than 64 bits the bitmask engine."""
+        for n_bits in [40, 64, 70]:
+            ones = ['1' * n_bits, '1' * (n_bits - 1) + '0', '0' + '1' * (n_bits - 1), '0' * n_bits]
+            expected = list(qm.QuineMcCluskey(engine=qm.STRING_ENGINE).simplify_los(ones))
+            result = list(qm.QuineMcCluskey(engine=qm.NUMPY_ENGINE).simplify_los(ones))
+            self.assertListEqual(result, expected)
+
+    def test_popcount_array(self):
+        x = np.array([0, 1, 0b1011, 2 ** 64 - 1], dtype=np.uint64)
+        self.assertListEqual(qm.popcount_array(x).tolist(), [0, 1, 3, 64])
+
+    def test_exact_cover_of_cyclic_chart(self):
+        """The greedy cover keeps redundant terms on cyclic charts, the exact one does not."""
+        ones = ['000', '001', '010', '101', '110', '111']
+
+        greedy = qm.QuineMcCluskey(engine=qm.BITMASK_ENGINE, exact=False)
+        self.assertEqual(len(greedy.simplify_los(ones)), 5)
+        self.assertFalse(greedy.optimal)
+
+        exact = qm.QuineMcCluskey(engine=qm.BITMASK_ENGINE)
+        self.assertListEqual(list(exact.simplify_los(ones)), ['11-', '0-0', '-01'])
+        self.assertTrue(exact.optimal)
+
+    def test_exact_cover_is_a_cover(self):
+        """The exact cover never has more terms than the greedy one and covers exactly the ones."""
+        for seed in range(50):
+            n_bits = 1 + seed % 8
+            ones = random_ones(n_bits=n_bits, seed=seed)
+            greedy = qm.QuineMcCluskey(engine=qm.BITMASK_ENGINE, exact=False).simplify_los(ones)
+            exact = qm.QuineMcCluskey(engine=qm.BITMASK_ENGINE).simplify_los(ones)
+
+            covered = set()
+            for term in exact:
+                covered |= set(qm.cube_minterms(qm.str2cube(term), n_bits))
+            self.assertSetEqual(covered, set(int(o, 2) for o in ones))
+            self.assertLessEqual(len(exact), len(greedy))
+
+    def test_minimum_cover(self):
+        # rows: 0, 1, 2. Column 2 is redundant.
+        covers = [0b011, 0b110, 0b010]
+        self.assertEqual(qm.minimum_cover(covers, [1, 1, 1], incumbent=[0, 1, 2]), ([0, 1], True))
+
+        # a tie with the incumbent keeps the incumbent.
+        self.assertEqual(qm.minimum_cover([0b01, 0b10, 0b11], [2, 2, 4], incumbent=[2]), ([2], True))
+
+    def test_branch_and_bound_budget(self):
+        """Without budget the greedy cover is returned and it is not proven optimal."""
+        covers = [0b0011, 0b0110, 0b1100, 0b1001]
+        cover, optimal, _ = qm.branch_and_bound(covers, [1, 1, 1, 1], max_nodes=0)
+        self.assertEqual(len(cover), 2)
+        self.assertFalse(optimal)
+
+        cover, optimal, _ = qm.branch_and_bound(covers, [1, 1, 1, 1], max_nodes=100)
+        self.assertEqual(len(cover), 2)
+        self.assertTrue(optimal)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,16 @@
 
 """Test for rules.py"""
 
+import json
+import pickle
 import unittest
+
+import numpy as np
+import pandas as pd
+
 from shatter.rules import *
+from shatter.code import Code
+from shatter.util.truth_table import DONT_CARE
 from tests.testing_helpers import constants as cts
 
 __author__ = 'juan pablo isaza'
@@ -33,6 +41,179 @@ class RulesTest(unittest.TestCase):
         self.assertEqual(r.get_truth_tables(['a', 'b']),
                          {3: [(False, True), (False, False)], True: [(True, True), (True, False)]})
 
+    def test_unspecified_inputs_are_not_expanded(self):
+        """
+        A rule is a single cube with the inputs it does not name as don't cares.
+        """
+        args = ['x{}'.format(i) for i in range(20)]
+        r = Rules(x3=True, x7=False)
+
+        table = r.get_truth_tables(args)[True]
+        self.assertEqual(table.cubes, [(DONT_CARE,) * 3 + (True,) + (DONT_CARE,) * 3 + (False,) + (DONT_CARE,) * 12])
+        self.assertEqual(len(table), 2 ** 18)
+
+    def test_data_frame_rows(self):
+        """
+        Each distinct row of a DataFrame is a rule, the args after it are not dropped.
+        """
+        df = pd.DataFrame({'a': [True, True, False, True], 'b': [True, True, False, False], 'output': [1, 1, 2, 3]},
+                          columns=['a', 'b', 'output'])
+        r = Rules(df, c=True)
+
+        self.assertEqual(len(r), 4)
+        self.assertEqual(r[0], {'a': True, 'b': True, 'output': 1})
+        self.assertEqual(r[-1], {'c': True})
+        self.assertIs(type(r[0]['a']), bool)  # python values, not numpy ones.
+        self.assertEqual(r.get_truth_tables(['a', 'b'])[3], [(True, False)])
+
+        # numpy structured arrays too.
+        array = np.array([(True, 1), (True, 1), (False, 2)], dtype=[('a', bool), ('output', int)])
+        r = Rules()
+        r.add(array)
+        self.assertEqual(r, [{'a': True, 'output': 1}, {'a': False, 'output': 2}])
+
+    def test_list_behaviour(self):
+        r = Rules(a=True)
+        r.add(b=False, output=2)
+        r.add(b=True, output=3)
+
+        self.assertEqual(r[1:], [{'b': False, 'output': 2}, {'b': True, 'output': 3}])
+        self.assertIn({'a': True}, r)
+        self.assertNotEqual(r, [])
+        self.assertEqual(pickle.loads(pickle.dumps(r)), r)
+        with self.assertRaises(IndexError):
+            r[3]
+        with self.assertRaises(IndexError):
+            r[-4]
+
+    def test_list_methods(self):
+        """
+        Every list method reads and changes the rows on the store.
+        """
+        a, b, c = {'a': True, 'output': 1}, {'b': False, 'output': 2}, {'c': True, 'output': 3}
+        r = Rules(a=True, output=1)
+        r.add(b=False, output=2)
+
+        self.assertEqual(list(reversed(r)), [b, a])
+        self.assertEqual(r + [c], [a, b, c])
+        self.assertEqual([c] + r, [c, a, b])
+        self.assertEqual(r * 2, [a, b, a, b])
+        self.assertEqual(r.count(a), 1)
+        self.assertEqual(r.index(b), 1)
+        self.assertEqual(r.copy(), r)
+        self.assertIsNot(r.copy().store, r.store)
+
+        r.insert(0, c)
+        self.assertEqual(r, [c, a, b])
+        self.assertEqual(r.pop(), b)
+        self.assertEqual(r, [c, a])
+        r.remove(c)
+        self.assertEqual(r, [a])
+
+        r[0] = b  # different keys: rebuilds the store.
+        self.assertEqual(r, [b])
+        r.append(c)
+        r[0] = {'b': True, 'output': 4}  # same keys: replaced in place.
+        self.assertEqual(r, [{'b': True, 'output': 4}, c])
+        self.assertEqual(r.get_input_keys([], 4), OrderedSet(['b']))
+        r[:1] = [a, b]
+        self.assertEqual(r, [a, b, c])
+        del r[1]
+        self.assertEqual(r, [a, c])
+
+        r.reverse()
+        self.assertEqual(r, [c, a])
+        r.sort(key=lambda row: row['output'])
+        self.assertEqual(r, [a, c])
+        r.clear()
+        self.assertEqual(r, [])
+        self.assertEqual(r, Rules())
+
+    def test_list_compatibility(self):
+        """
+        Rules is a MutableSequence, not a list: concatenations give lists and list() gives a list for json.
+        """
+        r = Rules(a=True, output=1)
+        r.add(b=False, output=2)
+
+        self.assertNotIsInstance(r, list)
+        self.assertIs(type(r + []), list)
+        self.assertIs(type([] + r), list)
+        self.assertEqual(json.loads(json.dumps(list(r))), [{'a': True, 'output': 1}, {'b': False, 'output': 2}])
+        with self.assertRaises(TypeError):
+            json.dumps(r)
+
+    def test_row_write_back(self):
+        """
+        Changes of a row given by the rules are written back to the rules, copies are plain dicts.
+        """
+        r = Rules(a=True, output=1)
+        r.add(b=True, output=1)
+
+        r[0]['a'] = False
+        self.assertEqual(r[0], {'a': False, 'output': 1})
+        for row in r:
+            row['output'] = 2
+        self.assertEqual(r, [{'a': False, 'output': 2}, {'b': True, 'output': 2}])
+        r[1].update(c=False)
+        self.assertEqual(r[1], {'b': True, 'output': 2, 'c': False})
+        del r[-1]['b']
+        self.assertEqual(r[1], {'output': 2, 'c': False})
+
+        self.assertIs(type(r[0].copy()), dict)
+        self.assertIs(type(pickle.loads(pickle.dumps(r[0]))), dict)
+
+    def test_indexes_after_replace(self):
+        """
+        A replaced value is no longer declared, see search_repeating_variable().
+        """
+        code = Code(code_str='x > 1')
+        r = Rules(code, a=True)
+        self.assertEqual(r.search_repeating_variable(code), POSITIONAL_ARGS_RULE + '0')
+
+        r[0] = {POSITIONAL_ARGS_RULE + '0': 1, 'a': True}
+        self.assertIsNone(r.search_repeating_variable(code))
+        self.assertEqual(r.search_repeating_variable(1), POSITIONAL_ARGS_RULE + '0')
+        self.assertEqual(r.get_max_positional_arg(), 1)
+
+    def test_extend(self):
+        """
+        Rows given as dicts are keyword args, as tuples positional args; the positional indexes keep growing and a
+        repeated value keeps its first key.
+        """
+        code = Code(code_str='x > 1')
+        other = Code(code_str='y > 1')
+
+        r = Rules(code, a=True)
+        r.extend([{'a': False, 'output': 2}, (other, code), (other,)])
+
+        self.assertEqual(len(r), 4)
+        self.assertEqual(list(r[0].keys()), [POSITIONAL_ARGS_RULE + '0', 'a'])
+        self.assertEqual(list(r[2].keys()), [POSITIONAL_ARGS_RULE + '1', POSITIONAL_ARGS_RULE + '0'])
+        self.assertEqual(list(r[3].keys()), [POSITIONAL_ARGS_RULE + '1'])
+        self.assertEqual(r.get_max_positional_arg(), 2)
+        self.assertEqual(r.search_repeating_variable(True), 'a')
+        self.assertIsNone(r.search_repeating_variable('missing'))
+
+    def test_input_keys_cache(self):
+        """
+        The keys of each output are computed once and recomputed after adding rows.
+        """
+        r = Rules(a=True, output=1)
+        r.add(b=True, output=True)
+        self.assertEqual(r.get_input_keys(['x'], 1), OrderedSet(['x', 'a', 'b']))  # 1 == True
+        self.assertIs(r.get_input_keys(['x'], 1), r.get_input_keys(['x'], 1))
+
+        r.add(c=False, output=1)
+        self.assertEqual(r.get_input_keys(['x'], 1), OrderedSet(['x', 'a', 'b', 'c']))
+        self.assertEqual(r.get_truth_tables(['x'])[1].cubes, [(DONT_CARE, True, DONT_CARE, DONT_CARE),
+                                                              (DONT_CARE, DONT_CARE, True, DONT_CARE),
+                                                              (DONT_CARE, DONT_CARE, DONT_CARE, False)])
+
+        # unhashable outputs are scanned every time.
+        r = Rules(a=True, output=[1])
+        self.assertEqual(r.get_input_keys([], [1]), OrderedSet(['a']))
+
     # case 0: empty dict.
     def test_empty_dict_max_positional_arg(self):
         self.assertEqual(Rules.gets_start_positional_idx({}), 0)
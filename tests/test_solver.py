@@ -2,6 +2,12 @@
 
 """Test for solver.py"""
 
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
 
 from shatter import solver as s, rules as c
@@ -10,7 +16,9 @@ from tests.generated_code import solver_functions as f
 from tests.testing_helpers import constants as cts
 from tests.testing_helpers import common_testing_code
 from shatter.rules import Rules
-from shatter import QM_helper
+from shatter import QM_helper, qm
+from shatter.util.solution_cache import SolutionCache
+from shatter.util import stats as st
 
 __author__ = 'juan pablo isaza'
 
@@ -30,8 +38,9 @@ class SolverTest(unittest.TestCase):
         :param expected_exp: the expected expression in python.
         :return: passes or not
         """
-        qm_ordered_set = QM_helper.execute_qm_algorithm(qm_input)
-        self.assertSetEqual(set(list(qm_ordered_set)), expected_qm_output)
+        for engine in qm.ENGINES:
+            qm_ordered_set = QM_helper.execute_qm_algorithm(qm_input, engine=engine)
+            self.assertSetEqual(set(list(qm_ordered_set)), expected_qm_output)
 
         exp = translate_to_python_expression(var_names, qm_ordered_set)
         self.assertEqual(exp, expected_exp)
@@ -68,6 +77,34 @@ class SolverTest(unittest.TestCase):
         expected_code = ["def " + signature + ":", "    return " + expression]
         self.assertListEqual(solution.implementation, expected_code)
 
+    def test_qm_algorithm_with_off_set(self):
+        """
+        Combinations that are neither ones nor in the off-set are don't cares, on both the exact and heuristic paths.
+        """
+        ones = ['110', '111']
+        off = ['000', '011']
+        self.assertListEqual(QM_helper.get_dont_cares(ones, off), ['001', '010', '100', '101'])
+        self.assertListEqual(list(QM_helper.execute_qm_algorithm(ones)), ['11-'])
+        self.assertListEqual(list(QM_helper.execute_qm_algorithm(ones, off=off)), ['1--'])
+        self.assertListEqual(list(QM_helper.execute_qm_algorithm(ones, off=off, max_exact_inputs=2)), ['1--'])
+
+    def test_qm_algorithm_with_cubes(self):
+        """
+        Rules with unspecified inputs reach the minimizer as terms with '-'. They are expanded for the exact algorithm
+        only, espresso takes them as they are.
+        """
+        self.assertListEqual(QM_helper.expand_terms(['1-0-', '011']), ['1101', '1001', '1100', '1000', '011'])
+        self.assertListEqual(list(QM_helper.execute_qm_algorithm(['1-0', '0-0', '111'])), ['11-', '--0'])
+
+        args = ['x{}'.format(i) for i in range(30)]
+        r = Rules(x0=True, x1=False)
+        r.add(x2=True, x3=True, x4=False)
+        r.add(x0=True, x1=True, x2=True, x3=True, x4=False)
+
+        tables = r.get_truth_tables(args)
+        self.assertEqual(QM_helper.get_boolean_expression(tables[True], args, True),
+                         'x0 and not x1 or x2 and x3 and not x4')
+
     def test_execute(self):
         """
         Important test: checking that it can solve simple functions.
@@ -158,5 +195,296 @@ class SolverTest(unittest.TestCase):
         solution = r.solve(f.identity)
         self.assertEqual(solution.implementation, code)
 
+    def test_dont_cares(self):
+        """
+        With dont_cares combinations that no rule mentions can return anything, giving shorter code.
+        """
+        r = Rules(a=True, b=True, c=True, output=True)
+        r.add(a=False, b=False, c=False, output=False)
+
+        solution = r.solve(f.dont_care_function, self)
+        self.assertEqual(solution.implementation[-1], '    return a and b and c')
+
+        solution = r.solve(f.dont_care_function, self, dont_cares=True)
+        self.assertEqual(solution.implementation, ['def {}(a, b, c):'.format(f.dont_care_function.__name__),
+                                                   '    return c'])
+
+        # a default output has to be returned for every combination not mentioned.
+        r.add(default=False)
+        solution = r.solve(f.dont_care_function, self, dont_cares=True)
+        self.assertEqual(solution.implementation[-1], '    return a and b and c')
+
+    def test_off_table(self):
+        """
+        The off table has the rows of the other outputs, outputs are compared by value and not by identity.
+        """
+        r = Rules(a=True, b=True, output=1000)
+        r.add(a=False, b=True, output=2)
+        tables = s.get_processed_rules(r, ('a', 'b'), dont_cares=True).tables
+
+        self.assertEqual(s.get_off_table(tables, r, ('a', 'b'), int('1000')).cubes, [(False, True)])
+
+    def test_multi_output(self):
+        """
+        Products shared by several outputs are assigned once to local variables.
+        """
+        r = Rules(a=True, b=True, c=True, output=1)
+        r.add(a=True, b=True, c=False, output=2)
+
+        solution = r.solve(f.multi_output_function, self, multi_output=True)
+        self.assertEqual(solution.implementation, ['def {}(a, b, c):'.format(f.multi_output_function.__name__),
+                                                   '',
+                                                   '    _shared_0 = a and b',
+                                                   '    if _shared_0 and c:',
+                                                   '        return 1',
+                                                   '',
+                                                   '    if _shared_0 and not c:',
+                                                   '        return 2',
+                                                   '',
+                                                   '    return False'])
+
+    def test_workers(self):
+        """
+        The number of processes of the minimization is given on solve().
+        """
+        namespace = dict()
+        exec('def parallel(a, b):\n    pass', namespace)
+
+        solution = Rules(a=True, b=False).solve(namespace['parallel'], self, in_memory=True, workers=2)
+        self.assertEqual(solution.processed_rules.workers, 2)
+        self.assertTrue(namespace['parallel'](True, False))
+
+    def test_multi_output_is_lazy(self):
+        """
+        A shared product is not evaluated when the function returns before its first use.
+        """
+        class Counted:
+            calls = 0
+
+            def __bool__(self):
+                Counted.calls += 1
+                return True
+
+        namespace = dict()
+        exec('def lazy(a, b, c, d):\n    pass', namespace)
+        lazy = namespace['lazy']
+
+        r = Rules(a=True, c=False, output=1)
+        r.add(b=True, c=True, d=True, output=2)
+        r.add(b=True, c=True, d=False, output=3)
+        solution = r.solve(lazy, self, multi_output=True, in_memory=True)
+        self.assertIn('    _shared_0 = b and c', solution.implementation)
+
+        self.assertEqual(lazy(True, Counted(), False, True), 1)
+        self.assertEqual(Counted.calls, 0)
+        self.assertEqual(lazy(False, Counted(), True, False), 3)
+        self.assertEqual(Counted.calls, 1)
+
+    def test_cache(self):
+        """
+        A cache hit writes the stored implementation, without minimizing nor testing.
+        """
+        directory = tempfile.mkdtemp()
+        try:
+            cache = SolutionCache(os.path.join(directory, 'cache.sqlite'))
+            r = Rules(a=True, b=True)
+
+            solution = r.solve(f.cached_function, self, cache=cache)
+            self.assertEqual(solution.implementation[-1], '    return a and b')
+            self.assertEqual(len(cache), 1)
+
+            # tamper the stored implementation to prove that it is used.
+            code = ['def {}(a, b):'.format(f.cached_function.__name__), '    return b and a']
+            with cache.connect() as connection:
+                connection.execute('UPDATE solutions SET implementation = ?', (json.dumps(code),))
+
+            # otherwise the written function has the fingerprint of the rules and is kept as it is.
+            common_testing_code.reset_functions_file(f.__file__, hard_reset=True)
+            solution = r.solve(f.cached_function, self, cache=cache)
+            self.assertEqual(solution.implementation, code)
+            self.assertEqual(solution.stats.counters[st.CACHE_HITS], 1)
+            self.assertEqual(solution.stats.times[st.TESTING_PHASE], 0)
+
+            # other rules are another key.
+            r.add(a=False, b=False)
+            self.assertEqual(r.solve(f.cached_function, self, cache=cache).implementation[-1],
+                             '    return a and b or not a and not b')
+            self.assertEqual(len(cache), 2)
+
+            # other minimizer settings are another key.
+            key = s.get_cache_key('def f(a, b):', s.get_processed_rules(r, ('a', 'b')), r, ('a', 'b'))
+            max_cover_nodes = s.QM_helper.qm.MAX_COVER_NODES
+            s.QM_helper.qm.MAX_COVER_NODES = 1
+            try:
+                self.assertNotEqual(s.get_cache_key('def f(a, b):', s.get_processed_rules(r, ('a', 'b')), r,
+                                                    ('a', 'b')), key)
+            finally:
+                s.QM_helper.qm.MAX_COVER_NODES = max_cover_nodes
+        finally:
+            shutil.rmtree(directory)
+
+    def test_stats(self):
+        """
+        The solution has the timings and peak memory of each phase and the sizes of the problem.
+        """
+        r = Rules(a=True, b=True, output=1)
+        r.add(a=True, b=False, c=True, output=1)
+        r.add(a=False, b=False, c=False, output=2)
+
+        trace_memory = st.TRACE_MEMORY
+        st.TRACE_MEMORY = True
+        try:
+            solution = r.solve(f.stats_function, self)
+        finally:
+            st.TRACE_MEMORY = trace_memory
+
+        for phase in [st.RULES_PHASE, st.MINIMIZATION_PHASE, st.CODE_GENERATION_PHASE, st.TESTING_PHASE,
+                      st.FILE_REWRITE_PHASE]:
+            self.assertGreater(solution.stats.times[phase], 0)
+            self.assertGreater(solution.stats.peak_memory[phase], 0)
+        self.assertEqual(solution.stats.times[st.ML_CORRECTION_PHASE], 0)
+        self.assertIsNone(solution.stats.peak_memory[st.ML_CORRECTION_PHASE])
+
+        counters = solution.stats.counters
+        self.assertEqual(counters[st.OUTPUTS], 2)
+        self.assertEqual(counters[st.ROWS], 4)  # the first rule has two rows, c is True or False.
+        self.assertEqual(counters[st.INPUTS], 3)
+        self.assertEqual(counters[st.TERMS], 3)  # a and b or a and c, not a and not b and not c
+        self.assertGreaterEqual(counters[st.IMPLICANTS], counters[st.TERMS])
+        self.assertEqual(counters[st.CACHE_HITS], 0)
+
+    def test_solve_many(self):
+        """
+        Functions of the same file are solved together, the file is written once with all of them.
+        """
+        writes = []
+        rewrite_file = s.h.rewrite_file
+        s.h.rewrite_file = lambda filename, the_list: writes.append(filename) or rewrite_file(filename, the_list)
+        try:
+            solutions = c.solve_many([(f.batch_function1, Rules(a=True, b=True)),
+                                      (f.batch_function2, Rules(a=True, b=False))], self)
+        finally:
+            s.h.rewrite_file = rewrite_file
+
+        self.assertListEqual(writes, [f.__file__])
+        self.assertEqual(solutions[0].implementation[-1], '    return a and b')
+        self.assertEqual(solutions[1].implementation[-1], '    return a and not b')
+
+        file_code = s.h.read_file(f.__file__)
+        for solution in solutions:
+            written = s.add_fingerprint(solution.implementation, solution.fingerprint)
+            start = file_code.index(written[0])
+            self.assertListEqual(file_code[start:start + len(written)], written)
+
+    def test_in_memory(self):
+        """
+        A function solved in memory runs the new code, its source file is not rewritten.
+        """
+        file_code = s.h.read_file(f.__file__)
+        solution = Rules(a=True, b=False).solve(f.in_memory_function, self)
+
+        self.assertListEqual(s.h.read_file(f.__file__), file_code)
+        self.assertEqual(solution.source, 'def in_memory_function(a, b):\n    return a and not b\n')
+        self.assertTrue(f.in_memory_function(True, False))
+        self.assertFalse(f.in_memory_function(True, True))
+
+    def test_in_memory_without_source(self):
+        """
+        Functions without a source file can be solved in memory.
+        """
+        namespace = dict()
+        exec('def no_source(a, b):\n    pass', namespace)
+        no_source = namespace['no_source']
+
+        c.solve(no_source, Rules(a=True, b=True), self, in_memory=True)
+        self.assertTrue(no_source(True, True))
+        self.assertFalse(no_source(False, True))
+
+    def test_in_memory_signature(self):
+        """
+        The definition has the parameters only, not the local variables. Defaults stay on the function, *args,
+        keyword-only args and **kwargs are rejected before solving.
+        """
+        namespace = dict()
+        exec('def defaults(a, b=True):\n    c = a\n'
+             'def varargs(a, *rest, **kw):\n    pass', namespace)
+        defaults = namespace['defaults']
+
+        self.assertEqual(s.get_in_memory_definition(defaults), 'def defaults(a, b):')
+        c.solve(defaults, Rules(a=True, b=True), self, in_memory=True)
+        self.assertTrue(defaults(True))
+        self.assertFalse(defaults(True, False))
+
+        with self.assertRaises(ValueError):
+            c.solve(namespace['varargs'], Rules(a=True), self, in_memory=True)
+
+    def test_in_memory_closure(self):
+        """
+        A closure cannot be solved in memory, it is rejected before solving.
+        """
+        y = True
+
+        def closure(a):
+            return a and y
+
+        with self.assertRaises(ValueError):
+            c.solve(closure, Rules(a=True), self, in_memory=True)
+        with self.assertRaises(ValueError):
+            s.load_implementation(closure, ['def closure(a):', '    return a'])
+
+    def test_fingerprint(self):
+        """
+        A written function has the fingerprint of its rules, solving it again with the same rules keeps it.
+        """
+        r = Rules(a=True, b=True)
+        solution = r.solve(f.fingerprint_function, self)
+        file_code = s.h.read_file(f.__file__)
+        stamped = s.add_fingerprint(solution.implementation, solution.fingerprint)[0]
+        self.assertTrue(stamped.startswith('def fingerprint_function(a, b):  # shatter: ' + solution.fingerprint))
+        self.assertIn(stamped, file_code)
+
+        unchanged = r.solve(f.fingerprint_function, self)
+        self.assertEqual(unchanged.stats.counters[st.UNCHANGED], 1)
+        self.assertEqual(unchanged.stats.times[st.MINIMIZATION_PHASE], 0)
+        self.assertEqual(unchanged.stats.times[st.FILE_REWRITE_PHASE], 0)
+        self.assertListEqual(unchanged.implementation, solution.implementation)
+        self.assertListEqual(s.h.read_file(f.__file__), file_code)
+
+        # a body edited by hand, with the stamp intact, is solved and written again.
+        edited = list(file_code)
+        edited[edited.index('    return a and b', file_code.index(stamped))] = '    return a'
+        s.h.rewrite_file(f.__file__, edited)
+        rewritten = r.solve(f.fingerprint_function, self)
+        self.assertEqual(rewritten.stats.counters[st.UNCHANGED], 0)
+        self.assertListEqual(s.h.read_file(f.__file__), file_code)
+
+        r.add(a=False, b=False)
+        changed = r.solve(f.fingerprint_function, self)
+        self.assertEqual(changed.stats.counters[st.UNCHANGED], 0)
+        self.assertNotEqual(changed.fingerprint, solution.fingerprint)
+        self.assertIn('def fingerprint_function(a, b):  # shatter: ' + changed.fingerprint + '-',
+                      s.h.read_file(f.__file__)[file_code.index(stamped)])
+
+    def test_lazy_imports(self):
+        """
+        Importing shatter and its solver does not load the float and machine learning backends, nor their
+        dependencies, they load only when used. Runs on a new interpreter.
+        """
+        heavy_modules = ('numpy', 'pandas', 'sympy', 'pyeda', 'keras', 'sklearn', 'scipy', 'shatter.float_input',
+                         'shatter.machine_learning.learner')
+        code = ('import sys\n'
+                'import shatter\n'
+                'from shatter import solver, rules, code\n'
+                'print(" ".join(m for m in {} if m in sys.modules))\n'
+                'from shatter import float_input\n'
+                'print(" ".join(m for m in {} if m in sys.modules))').format(heavy_modules, heavy_modules)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=root, universal_newlines=True)
+        loaded, loaded_when_used = output.split('\n')[:2]
+
+        self.assertEqual(loaded, '')
+        self.assertIn('pandas', loaded_when_used.split())  # the check sees a module once it is loaded.
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -6,9 +6,11 @@ import unittest
 
 from tests.generated_code import tester_functions as f
 from tests.testing_helpers import common_testing_code
+from shatter.processed_rules import ProcessedRules
 from shatter.rules import Rules
 from shatter import tester
 from shatter.solution import Solution
+from shatter.util.truth_table import DONT_CARE, TruthTable
 
 __author__ = 'juan pablo isaza'
 
@@ -39,6 +41,40 @@ class TesterTest(unittest.TestCase):
 
         r.solve(f.non_collision, self)
 
+    def test_get_test_rows(self):
+        """
+        Small cubes are fully expanded, bigger ones are tested on 4 rows.
+        """
+        self.assertListEqual(tester.get_test_rows((True, DONT_CARE)), [(True, True), (True, False)])
+        self.assertEqual(len(tester.get_test_rows((DONT_CARE,) * tester.MAX_EXPANDED_DONT_CARES)),
+                         2 ** tester.MAX_EXPANDED_DONT_CARES)
+
+        rows = tester.get_test_rows((False,) + (DONT_CARE,) * 20)
+        self.assertListEqual(rows, [(False,) + (True,) * 20,
+                                    (False,) + (False,) * 20,
+                                    (False,) + (True, False) * 10,
+                                    (False,) + (False, True) * 10])
+
+    def test_wide_contradiction(self):
+        """
+        Two wide rules of different outputs that overlap on a=True, c=False, d=True, e=False. The implementation agrees
+        with both on their sample rows, but not on the rows they share, where the rules contradict each other.
+        """
+        def contradiction(a, b, c, d, e, f, g):
+            pass
+
+        first = (True, DONT_CARE, False) + (DONT_CARE,) * 4  # a=True, c=False
+        second = (DONT_CARE,) * 3 + (True, False, DONT_CARE, DONT_CARE)  # d=True, e=False
+        tables = {1: TruthTable([first]), 2: TruthTable([second])}
+        code = ['def contradiction(a, b, c, d, e, f, g):',
+                '    if a and not c:',
+                '        return 1',
+                '    return 2']
+
+        solution = Solution(contradiction, None, ProcessedRules(tables=tables), code)
+        with self.assertRaises(tester.NotImplementedWithMLYet):
+            tester.test_implementation(None, solution)
+
     def test_unittest_validation(self):
         """
         Should raise exception if unittest is not of the correct class.
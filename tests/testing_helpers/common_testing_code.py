@@ -21,7 +21,7 @@ def line_has_solve(line):
 
 def reset_functions_file(path, hard_reset=False):
     """
-    All functions with @solver() decorator of a module are set to pass.
+    All functions with @solver() decorator of a module are set to pass, without fingerprint.
     :param path: of module
     :param hard_reset: if False will only reset the @solver() otherwise reset all functions
     :return: void
@@ -39,7 +39,8 @@ def reset_functions_file(path, hard_reset=False):
             indent = h.get_indent_from_definition(line)
             f_length = len(h.get_function_code(index, file_code))
             index = new_file_code.index(line)
-            new_file_code = new_file_code[:index+1] + [indent + '    pass'] + new_file_code[index + f_length:]
+            definition = re.sub(cts.FINGERPRINT_PATTERN, '', line)
+            new_file_code = new_file_code[:index] + [definition, indent + '    pass'] + new_file_code[index + f_length:]
 
         # if no white spaces assing a new last line. Because there can be line breaks between decorator and function.
         if line.strip() != '':
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+"""Test for code_dict.py"""
+
+import unittest
+
+from shatter.code import Code
+from shatter.util.code_dict import CodeDict
+
+__author__ = 'juan pablo isaza'
+
+
+class CodeDictTest(unittest.TestCase):
+
+    def test_equal_content_is_same_key(self):
+        """Equations and code strings with the same content are the same key, the first one inserted is kept."""
+        i = Code()
+        j = Code()
+        first = i + j
+        d = CodeDict()
+        d[first] = 1
+        d[i + j] = 2
+        d[Code(code_str='a')] = 3
+        d[Code(code_str='a')] = 4
+
+        self.assertEqual(len(d), 2)
+        self.assertEqual(d[i + j], 2)
+        self.assertEqual(d[Code(code_str='a')], 4)
+        self.assertIs(list(d)[0], first)
+        self.assertIn(i + j, d)
+        self.assertNotIn(j + i, d)  # no commutation
+        self.assertNotIn(i - j, d)
+
+    def test_variables_compare_by_identity(self):
+        i = Code()
+        d = CodeDict({i: 1})
+
+        self.assertIn(i, d)
+        self.assertNotIn(Code(), d)
+
+    def test_behaves_as_dict(self):
+        i = Code()
+        d = CodeDict()
+        d['b'] = 1
+        d[i > 1] = 2
+        d[1] = 3
+
+        self.assertListEqual([d[k] for k in d], [1, 2, 3])
+        del d[i > 1]
+        self.assertEqual(len(d), 2)
+        self.assertNotIn(i > 1, d)
+        with self.assertRaises(KeyError):
+            d[i > 1]
+        with self.assertRaises(KeyError):
+            del d['a']
+
+
+if __name__ == '__main__':
+    unittest.main()
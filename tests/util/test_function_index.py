@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+"""Test for function_index.py"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from shatter.util import function_index
+from shatter.util.function_index import FunctionIndex, get_index
+from shatter.util.helpers import rewrite_file
+
+__author__ = 'juan pablo isaza'
+
+FILE_CODE = ['import os',
+             '',
+             '',
+             '@decorator(',
+             '    1)',
+             'def f(a, b):',
+             '    """doc',
+             '    string"""',
+             '    return g(',
+             '        a)',
+             '    # trailing comment',
+             '',
+             '',
+             'class K:',
+             '    def method(self):',
+             '        def nested():',
+             '            return 1',
+             '        return nested',
+             '',
+             'if os:',
+             '    def g(a):',
+             '        return a',
+             'else:',
+             '    def h(): return 2']
+
+
+class FunctionIndexTest(unittest.TestCase):
+
+    def test_spans(self):
+        """Functions, methods and nested functions go from the def line to the last line of code of the body."""
+        index = FunctionIndex(FILE_CODE)
+
+        self.assertDictEqual(index.spans, {'f': [(5, 9)],
+                                           'method': [(14, 17)],
+                                           'nested': [(15, 16)],
+                                           'g': [(20, 21)],
+                                           'h': [(23, 23)]})
+        self.assertEqual(index.get_first_line('nested'), 15)
+        self.assertEqual(index.get_first_line('missing'), -1)
+        self.assertListEqual(index.get_lines(20), ['    def g(a):', '        return a'])
+        self.assertIsNone(index.get_lines(0))
+
+    def test_cache(self):
+        """The index is built once per version of the file, rewriting the file drops it."""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'module.py')
+            rewrite_file(path, FILE_CODE)
+
+            index = get_index(path, FILE_CODE)
+            self.assertIs(get_index(path, FILE_CODE), index)
+
+            new_file_code = FILE_CODE[:5] + ['def other(a, b):'] + FILE_CODE[6:]
+            rewrite_file(path, new_file_code)
+            self.assertNotIn(path, function_index.indexes)
+            self.assertEqual(get_index(path, new_file_code).get_first_line('other'), 5)
+            self.assertIs(get_index(path, ['def broken(:']), get_index(path, new_file_code))  # same version.
+
+            rewrite_file(path, ['def broken(:'])
+            self.assertIsNone(get_index(path, ['def broken(:']))  # not python, helpers scan the lines instead.
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@
 import unittest
 
 from shatter.util.helpers import get_function_path, read_file, get_function_code, get_function_line_number,\
-    is_private_call, retrieve_name
+    is_private_call, internal_mode, retrieve_name
 from shatter.code import Code
 
 __author__ = 'juan pablo isaza'
@@ -57,6 +57,19 @@ class UtilTest(unittest.TestCase):
         """
         self.assertFalse(is_private_call())
 
+    def test_internal_mode(self):
+        """
+        Inside internal mode every call is private, so Code comparisons give booleans.
+        """
+        i = Code()
+        with internal_mode():
+            self.assertTrue(is_private_call())
+            self.assertIs(i == i, True)
+            self.assertIs(i == Code(), False)
+
+        self.assertFalse(is_private_call())
+        self.assertIsInstance(i == i, Code)
+
     def test_variable_name_retrieval(self):
         """
         Should get the outer most name of the variable. although the call is nested.
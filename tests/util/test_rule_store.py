@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+"""Test for rule_store.py"""
+
+import array
+import tracemalloc
+import unittest
+
+from shatter.util.rule_store import Column, RuleStore
+
+__author__ = 'juan pablo isaza'
+
+
+def get_rows(n):
+    """
+    :param n: number of rows.
+    :return: list with dicts, all with the same keys.
+    """
+    return [dict(a=bool(i & 1), b=bool(i & 2), c=bool(i & 4), d=bool(i & 8), output=i % 3) for i in range(n)]
+
+
+def get_mixed_rows(n):
+    """
+    :param n: number of rows.
+    :return: list with dicts, each with other keys than the previous one.
+    """
+    return [dict(a=bool(i & 1), b=bool(i & 2), output=i % 3) if i % 2 else dict(c=bool(i & 4), output=i % 3)
+            for i in range(n)]
+
+
+def get_memory(function):
+    """
+    :param function: callable without args.
+    :return: tuple with what function returns and the memory it allocated that is still in use.
+    """
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        result = function()
+        return result, tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+
+
+def get_store(rows):
+    """
+    :param rows: list with dicts.
+    :return: RuleStore with the rows.
+    """
+    store = RuleStore()
+    for row in rows:
+        store.append(row)
+    return store
+
+
+class RuleStoreTest(unittest.TestCase):
+
+    def test_typed_columns(self):
+        """Values of the same type are on arrays and keep their type."""
+        column = Column([True, False])
+        self.assertIsInstance(column.values, array.array)
+        self.assertListEqual(list(column), [True, False])
+        self.assertIs(column[0], True)
+
+        column.append(False)
+        self.assertIsInstance(column.values, array.array)
+
+        # 1 is not True, the column becomes a list.
+        column.append(1)
+        self.assertIsInstance(column.values, list)
+        self.assertListEqual([type(v) for v in column], [bool, bool, bool, int])
+
+        self.assertIsInstance(Column([2 ** 70]).values, list)
+        self.assertIsInstance(Column([1.5, 2.0]).values, array.array)
+        self.assertIsInstance(Column(['a']).values, list)
+
+    def test_blocks(self):
+        """Rows with the same keys share a block, consecutive rows of a block share a run."""
+        store = RuleStore()
+        store.append({'a': True, 'output': 1})
+        store.append({'a': False, 'output': 2})
+        store.append({'b': True})
+        store.add_columns(['a', 'output'], [[True], [3]])
+        store.append({})
+
+        self.assertEqual(len(store.blocks), 3)
+        self.assertEqual(len(store.starts), 4)
+        self.assertEqual(len(store), 5)
+        self.assertListEqual(list(store), [{'a': True, 'output': 1}, {'a': False, 'output': 2}, {'b': True},
+                                           {'a': True, 'output': 3}, {}])
+        self.assertEqual(store.get_row(1), {'a': False, 'output': 2})
+        self.assertEqual(store.get_row(3), {'a': True, 'output': 3})
+        self.assertEqual(store.get_row(-1), {})
+
+    def test_mixed_keys(self):
+        """Rows with alternating keys keep their order, and still take much less memory than dicts."""
+        rows = get_mixed_rows(10000)
+
+        dicts, dicts_memory = get_memory(lambda: [dict(row) for row in rows])
+        store, store_memory = get_memory(lambda: get_store(rows))
+
+        self.assertEqual(len(store.blocks), 2)
+        self.assertListEqual(list(store), dicts)
+        self.assertEqual(store.get_row(-2), dicts[-2])
+        self.assertLess(store_memory * 5, dicts_memory)
+
+    def test_set_row(self):
+        """Rows are replaced in place only with the same keys, a value of another type promotes the column."""
+        store = RuleStore()
+        store.add_columns(['a', 'output'], [[True, False], [1, 2]])
+
+        self.assertTrue(store.set_row(-1, {'a': True, 'output': 'x'}))
+        self.assertEqual(list(store), [{'a': True, 'output': 1}, {'a': True, 'output': 'x'}])
+        self.assertEqual(store.blocks[0].columns[0].type_code, 'b')
+        self.assertIsNone(store.blocks[0].columns[1].type_code)
+
+        self.assertFalse(store.set_row(0, {'output': 1, 'a': True}))
+        with self.assertRaises(IndexError):
+            store.set_row(2, {'a': True, 'output': 1})
+
+    def test_memory(self):
+        """A row takes an order of magnitude less memory than a dict."""
+        rows = get_rows(10000)
+
+        dicts, dicts_memory = get_memory(lambda: [dict(row) for row in rows])
+        store, store_memory = get_memory(lambda: get_store(rows))
+
+        self.assertEqual(len(store), len(dicts))
+        self.assertLess(store_memory * 10, dicts_memory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+"""Test for util/solution_cache.py"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from shatter.util.solution_cache import SolutionCache, get_cache
+
+__author__ = 'juan pablo isaza'
+
+
+class SolutionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_and_put(self):
+        cache = SolutionCache(self.path)
+        self.assertIsNone(cache.get('key'))
+
+        cache.put('key', ['def f(a):', '    return a'])
+        self.assertListEqual(cache.get('key'), ['def f(a):', '    return a'])
+
+        # persists on disk.
+        self.assertListEqual(SolutionCache(self.path).get('key'), ['def f(a):', '    return a'])
+
+    def test_connections_are_closed(self):
+        cache = SolutionCache(self.path)
+        with cache.connect() as connection:
+            connection.execute('SELECT COUNT(*) FROM solutions')
+
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connection.execute('SELECT COUNT(*) FROM solutions')
+
+    def test_least_recently_used_eviction(self):
+        """When full, the least recently used implementations are evicted first."""
+        implementation = ['x' * 10]
+        cache = SolutionCache(self.path, max_bytes=3 * len('["{}"]'.format(implementation[0])))
+
+        for key in ['a', 'b', 'c']:
+            cache.put(key, implementation)
+        cache.get('a')
+        cache.put('d', implementation)
+
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get('b'))
+        for key in ['a', 'c', 'd']:
+            self.assertIsNotNone(cache.get(key))
+
+    def test_get_cache(self):
+        cache = SolutionCache(self.path)
+        self.assertIs(get_cache(cache), cache)
+        self.assertEqual(get_cache(self.path).path, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+"""Test for stats.py"""
+
+import tracemalloc
+import unittest
+
+from shatter.util import stats as st
+
+__author__ = 'juan pablo isaza'
+
+
+class StatsTest(unittest.TestCase):
+
+    def test_phases_add_up(self):
+        stats = st.Stats()
+        with stats.phase(st.MINIMIZATION_PHASE):
+            pass
+        first = stats.times[st.MINIMIZATION_PHASE]
+        with stats.phase(st.MINIMIZATION_PHASE):
+            sum(range(10000))
+
+        self.assertGreater(stats.times[st.MINIMIZATION_PHASE], first)
+        self.assertEqual(stats.times[st.TESTING_PHASE], 0)
+        self.assertAlmostEqual(stats.total_time, stats.times[st.MINIMIZATION_PHASE])
+
+    def test_phase_measures_on_exceptions(self):
+        stats = st.Stats()
+        with self.assertRaises(ValueError):
+            with stats.phase(st.TESTING_PHASE):
+                raise ValueError
+        self.assertGreater(stats.times[st.TESTING_PHASE], 0)
+
+    def test_peak_memory(self):
+        """Only measured when asked, the peak counts memory freed before the end of the phase."""
+        stats = st.Stats()
+        with stats.phase(st.RULES_PHASE):
+            pass
+        self.assertIsNone(stats.peak_memory[st.RULES_PHASE])
+
+        stats = st.Stats(trace_memory=True)
+        with stats.phase(st.RULES_PHASE):
+            data = [0] * 100000
+            del data
+        with stats.phase(st.MINIMIZATION_PHASE):
+            pass
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreaterEqual(stats.peak_memory[st.RULES_PHASE], 100000 * 8)
+        self.assertLess(stats.peak_memory[st.MINIMIZATION_PHASE], 100000)
+
+    def test_caller_traces_are_kept(self):
+        """The traces and the peak of the caller survive a phase."""
+        stats = st.Stats()
+        tracemalloc.start()
+        try:
+            before = [0] * 100000
+            del before
+            peak = tracemalloc.get_traced_memory()[1]
+            kept = b'x' * 100000
+
+            with stats.phase(st.MINIMIZATION_PHASE):
+                data = [0] * 10000
+            with stats.phase(st.TESTING_PHASE):
+                data = [0] * 1000000
+
+            self.assertIsNotNone(tracemalloc.get_object_traceback(kept))
+            self.assertGreaterEqual(tracemalloc.get_traced_memory()[1], peak)
+        finally:
+            tracemalloc.stop()
+
+        # the first phase did not raise the peak, so its peak is unknown.
+        self.assertIsNone(stats.peak_memory[st.MINIMIZATION_PHASE])
+        self.assertGreaterEqual(stats.peak_memory[st.TESTING_PHASE], len(data) * 8)
+
+    def test_counters(self):
+        stats = st.Stats()
+        stats.add(st.TERMS, 3)
+        stats.add(st.TERMS)
+        stats.set_max(st.INPUTS, 5)
+        stats.set_max(st.INPUTS, 2)
+        self.assertEqual(stats.counters[st.TERMS], 4)
+        self.assertEqual(stats.counters[st.INPUTS], 5)
+
+        row = stats.as_dict()
+        self.assertEqual(row['terms'], 4)
+        self.assertIn('minimization_time', row)
+        self.assertIn('terms: 4', str(stats))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+"""Test for truth_table.py"""
+
+import pickle
+import unittest
+
+from shatter.util.truth_table import TruthTable, DONT_CARE, expand_cube, get_cubes
+
+__author__ = 'juan pablo isaza'
+
+
+class TruthTableTest(unittest.TestCase):
+
+    def test_expand_cube(self):
+        """The first unspecified input changes faster and True comes first."""
+        self.assertListEqual(list(expand_cube((DONT_CARE, 1, DONT_CARE))),
+                             [(True, 1, True), (False, 1, True), (True, 1, False), (False, 1, False)])
+        self.assertListEqual(list(expand_cube((True, False))), [(True, False)])
+
+    def test_table_behaves_as_expanded_list(self):
+        table = TruthTable([(True, DONT_CARE)])
+        table.append((False, False))
+
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table, [(True, True), (True, False), (False, False)])
+        self.assertEqual([(True, True), (True, False), (False, False)], table)
+        self.assertNotEqual(table, [(True, True)])
+        self.assertEqual(list(table + [(False, True)])[-1], (False, True))
+        self.assertEqual(len(table.cubes), 2)
+
+    def test_get_cubes(self):
+        table = TruthTable([(DONT_CARE,)])
+        self.assertListEqual(get_cubes(table), [(DONT_CARE,)])
+        self.assertListEqual(get_cubes([(True,)]), [(True,)])
+
+        table += table
+        self.assertListEqual(table.cubes, [(DONT_CARE,), (DONT_CARE,)])
+        self.assertFalse(TruthTable())
+
+    def test_dont_care_is_a_singleton(self):
+        self.assertIs(pickle.loads(pickle.dumps(DONT_CARE)), DONT_CARE)
+
+
+if __name__ == '__main__':
+    unittest.main()